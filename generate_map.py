@@ -8,14 +8,75 @@
 #     --heat-radius 20 --heat-blur 15
 from __future__ import annotations
 import argparse
+import functools
+import gzip
+import hashlib
 import json
 import re
+import struct
+import unicodedata
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from pyproj import Transformer
 
+try:
+    import brotli  # optional: only needed for the .br outputs of --precompress
+except ImportError:
+    brotli = None
+
+
+NAN_TOKENS = {"nan", "n/a", "na", "none", "null", "-", "--"}
+NUM_TOKEN_RE = r"[-+]?\d+(?:\.\d+)?"
+
+
+def parse_num(x) -> float:
+  """Parse a single mixed numeric string into a float (scalar reference of `to_num_series`, see tests/test_parsing.py)."""
+  if pd.isna(x):
+    return np.nan
+  t = str(x).strip()
+  if t == "":
+    return np.nan
+
+  low = t.lower()
+  if low in NAN_TOKENS:
+    return np.nan
+
+  # Normalize spaces, NBSP, decimal comma, and dash variants
+  t = (
+    t.replace("\xa0", "")
+     .replace(" ", "")
+     .replace(",", ".")
+  )
+  # Normalize different dash characters and French range separator
+  t = re.sub(r"[–—−]", "-", t)  # en/em/minus dashes → hyphen-minus
+  t = t.replace("à", "-")
+
+  # Extract numeric tokens (keep sign and decimal part)
+  nums = re.findall(NUM_TOKEN_RE, t)
+  if not nums:
+    return np.nan
+
+  vals = []
+  for n in nums:
+    try:
+      vals.append(float(n))
+    except ValueError:
+      continue
+
+  if not vals:
+    return np.nan
+
+  # If appears to be an explicit range (contains '-' between digits), take the mean
+  if len(vals) >= 2 and '-' in t:
+    return float(np.mean(vals[:2]))
+
+  # Otherwise return the first parsed number
+  return float(vals[0])
+
 
 def to_num_series(s: pd.Series) -> pd.Series:
   """Coerce a pandas Series of mixed numeric strings into floats.
@@ -25,62 +86,54 @@ def to_num_series(s: pd.Series) -> pd.Series:
   - Ranges like "370-450" or with en/em dashes or "à" → returns the mean
   - Prefix/suffix noise (e.g., ">450", "~450", "450+", units)
   - Common NaN-like tokens ("", "nan", "n/a", "na", "--")
-  """
-
-  def parse_one(x) -> float:
-    if pd.isna(x):
-      return np.nan
-    t = str(x).strip()
-    if t == "":
-      return np.nan
-
-    low = t.lower()
-    if low in {"nan", "n/a", "na", "none", "null", "-", "--"}:
-      return np.nan
-
-    # Normalize spaces, NBSP, decimal comma, and dash variants
-    t = (
-      t.replace("\xa0", "")
-       .replace(" ", "")
-       .replace(",", ".")
-    )
-    # Normalize different dash characters and French range separator
-    t = re.sub(r"[–—−]", "-", t)  # en/em/minus dashes → hyphen-minus
-    t = t.replace("à", "-")
-
-    # Extract numeric tokens (keep sign and decimal part)
-    nums = re.findall(r"[-+]?\d+(?:\.\d+)?", t)
-    if not nums:
-      return np.nan
 
-    vals = []
-    for n in nums:
-      try:
-        vals.append(float(n))
-      except ValueError:
-        continue
-
-    if not vals:
-      return np.nan
+  Column-wise equivalent of `parse_num`: each distinct raw string is parsed
+  once with pandas `.str` operations and the results are mapped back by code.
+  """
+  out = np.full(len(s), np.nan)
+  present = s.notna().to_numpy()
+  if not present.any():
+    return pd.Series(out, index=s.index, dtype=float)
 
-    # If appears to be an explicit range (contains '-' between digits), take the mean
-    if len(vals) >= 2 and '-' in t:
-      return float(np.mean(vals[:2]))
+  # Memo table: factorize the raw strings so repeated values are parsed once
+  codes, uniques = pd.factorize(s[present].astype(str))
+  t = pd.Series(uniques, dtype=object).str.strip()
+  is_nan_token = (t == "") | t.str.lower().isin(NAN_TOKENS)
 
-    # Otherwise return the first parsed number
-    return float(vals[0])
+  # Normalize spaces, NBSP, decimal comma, dash variants and French range separator
+  t = (
+    t.str.replace("\xa0", "", regex=False)
+     .str.replace(" ", "", regex=False)
+     .str.replace(",", ".", regex=False)
+     .str.replace(r"[–—−]", "-", regex=True)
+     .str.replace("à", "-", regex=False)
+  )
 
-  return s.apply(parse_one).astype(float)
+  # First and second numeric tokens per unique string
+  nums = t.str.extractall(f"({NUM_TOKEN_RE})")[0].astype(float)
+  match_no = nums.index.get_level_values("match")
+  first = nums[match_no == 0].droplevel("match").reindex(t.index)
+  second = nums[match_no == 1].droplevel("match").reindex(t.index)
 
+  # Explicit ranges (two numbers and a '-') take the mean, otherwise the first number
+  is_range = second.notna() & t.str.contains("-", regex=False)
+  parsed = first.where(~is_range, (first + second) / 2.0)
+  parsed[is_nan_token] = np.nan
 
-def norm(s: str) -> str:
-    return re.sub(r"[^a-z0-9]", "", str(s).lower())
+  out[present] = parsed.to_numpy(dtype=float)[codes]
+  return pd.Series(out, index=s.index, dtype=float)
 
 
 def make_scaler(values, r_min=5, r_max=16):
+    """Build a radius scaler from the 5th-95th percentile range of `values`.
+
+    The returned function maps a scalar or an array to radii in
+    [r_min, r_max]; NaN and non-numeric inputs get the mid radius.
+    """
+    mid = (r_min + r_max) / 2.0
     vals = pd.Series(values, dtype="float").replace([np.inf, -np.inf], np.nan).dropna()
     if vals.empty:
-        return lambda v: (r_min + r_max) / 2.0
+        return lambda v: np.full(np.shape(v), mid) if np.ndim(v) else mid
     v_min = float(vals.quantile(0.05))
     v_max = float(vals.quantile(0.95))
     if v_max <= v_min:
@@ -88,46 +141,1456 @@ def make_scaler(values, r_min=5, r_max=16):
         v_max = float(vals.max()) if float(vals.max()) > v_min else v_min + 1.0
 
     def scale(v):
-        try:
-            x = float(v)
-        except (TypeError, ValueError):
-            return (r_min + r_max) / 2.0
-        if np.isnan(x):
-            return (r_min + r_max) / 2.0
-        x_clamped = max(min(x, v_max), v_min)
-        return r_min + (x_clamped - v_min) * (r_max - r_min) / (v_max - v_min)
+        scalar = np.ndim(v) == 0
+        x = pd.to_numeric(pd.Series(np.atleast_1d(v), dtype=object), errors="coerce").to_numpy(dtype=float)
+        out = np.where(np.isnan(x), mid, r_min + (np.clip(x, v_min, v_max) - v_min) * (r_max - r_min) / (v_max - v_min))
+        return float(out[0]) if scalar else out
 
     return scale
 
 
+def to_float_column(col: pd.Series) -> pd.Series:
+    """Convert a column that may use decimal commas (e.g. '75,07') into floats."""
+    if pd.api.types.is_numeric_dtype(col):
+        return col.astype(float)
+    return col.astype(str).str.replace(",", ".", regex=False).astype(float)
+
+
+@functools.lru_cache(maxsize=None)
+def get_transformer(src_crs: str, dst_crs: str) -> Transformer:
+    """Return an always_xy Transformer between two CRS, built once per process.
+
+    The cache lives for one run only: building a transformer takes tens of
+    milliseconds, and the PROJ pipeline it picks is only resolved on first
+    use, so it is not persisted between runs.
+    """
+    return Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+
+# Greenhouse color classes on normalized prob_mean (light yellow → dark red)
+GREENHOUSE_CLASS_EDGES = [0.25, 0.5, 0.75]
+GREENHOUSE_COLORS = ['#FFEB3B', '#FFA726', '#FF5722', '#B71C1C']
+
+
+def load_greenhouses(path="ghg_intensity.csv") -> pd.DataFrame:
+    """Load the greenhouse probability grid with lat, lon, prob_mean and color columns.
+
+    The EPSG:3035 cell extents are kept as x_min_m, y_min_m, x_max_m and y_max_m.
+    Cell centers are reprojected from EPSG:3035 (ETRS89 / LAEA Europe) to WGS84
+    in a single array-level transform, so the loader scales to full-resolution
+    rasters without per-row Python work.
+    """
+    extent_cols = ["x_min_m", "y_min_m", "x_max_m", "y_max_m"]
+    raw = pd.read_csv(path, sep=";", encoding="latin-1", usecols=["x_center_m", "y_center_m", "prob_mean"] + extent_cols)
+    x_center = to_float_column(raw["x_center_m"]).to_numpy()
+    y_center = to_float_column(raw["y_center_m"]).to_numpy()
+    prob_mean = to_float_column(raw["prob_mean"]).to_numpy()
+
+    lon, lat = get_transformer("EPSG:3035", "EPSG:4326").transform(x_center, y_center)
+
+    # Color class from prob_mean normalized to 0-1 (higher = darker)
+    if len(prob_mean) == 0:
+        normalized = prob_mean
+    else:
+        min_prob, max_prob = prob_mean.min(), prob_mean.max()
+        if max_prob > min_prob:
+            normalized = (prob_mean - min_prob) / (max_prob - min_prob)
+        else:
+            normalized = np.full(len(prob_mean), 0.5)
+    color_idx = np.digitize(normalized, GREENHOUSE_CLASS_EDGES)
+
+    return pd.DataFrame({
+        "lat": np.asarray(lat, dtype=float),
+        "lon": np.asarray(lon, dtype=float),
+        "prob_mean": prob_mean,
+        "color": np.asarray(GREENHOUSE_COLORS, dtype=object)[color_idx],
+        **{col: to_float_column(raw[col]).to_numpy() for col in extent_cols},
+    })
+
+
+def build_site_index(layer, category, techno) -> dict:
+    """Group row positions by (layer, category, techno) in a single pass.
+
+    Keys are ordered by first occurrence and NaN labels are kept as keys;
+    each value is an ascending array of row positions.
+    """
+    keys = pd.DataFrame({"layer": layer, "category": category, "techno": techno})
+    groups = keys.groupby(["layer", "category", "techno"], sort=False, dropna=False).indices
+    return dict(sorted(groups.items(), key=lambda kv: kv[1][0]))
+
+
+def select_rows(site_index, predicate) -> np.ndarray:
+    """Ascending row positions of every (layer, category, techno) key accepted by `predicate`."""
+    parts = [rows for key, rows in site_index.items() if predicate(*key)]
+    if not parts:
+        return np.zeros(0, dtype=np.intp)
+    return np.sort(np.concatenate(parts))
+
+
+def layer_category_tree(site_index) -> dict:
+    """Build {layer: {category: sorted technos}} from the site index.
+
+    Layers and categories keep their order of first appearance; NaN layers
+    and categories are skipped and NaN technos are left out of the lists.
+    """
+    tree = {}
+    for (layer, category, techno) in site_index:
+        if pd.isna(layer) or pd.isna(category):
+            continue
+        technos = tree.setdefault(layer, {}).setdefault(category, [])
+        if not pd.isna(techno) and techno not in technos:
+            technos.append(techno)
+    for categories in tree.values():
+        for category, technos in categories.items():
+            categories[category] = sorted(technos)
+    return tree
+
+
+def concat_columns(a: dict, b: dict) -> dict:
+    """Append the rows of column dict `b` to column dict `a` (same keys), as object arrays."""
+    return {k: np.concatenate([np.asarray(a[k], dtype=object), np.asarray(b[k], dtype=object)]) for k in a}
+
+
+def heat_points(lat, lon, rows) -> np.ndarray:
+    """[lat, lon, 1] heat points for the given row positions."""
+    return np.column_stack([lat[rows], lon[rows], np.ones(len(rows))])
+
+
+# Technos filtered by the capacity checkboxes, and the bucket bounds in GWh/year
+CAPACITY_FILTER_TECHNOS = ("Bio-CNG", "Bio-LNG", "Biomethane", "Biogas")
+CAPACITY_SMALL_MAX = 20
+CAPACITY_MEDIUM_MAX = 40
+
+
+def capacity_buckets(techno, capacity) -> np.ndarray:
+    """Capacity filter bucket per site.
+
+    Sites of CAPACITY_FILTER_TECHNOS get "small", "medium", "large", or "na"
+    when the capacity is missing or 0; every other site gets "".
+    """
+    cap = pd.to_numeric(pd.Series(capacity), errors="coerce").to_numpy(dtype=float)
+    bucket = np.select(
+        [np.isnan(cap) | (cap == 0), cap < CAPACITY_SMALL_MAX, cap <= CAPACITY_MEDIUM_MAX],
+        ["na", "small", "medium"],
+        default="large",
+    )
+    return np.where(np.isin(techno, CAPACITY_FILTER_TECHNOS), bucket, "").astype(object)
+
+
+SITE_COORD_COLUMNS = ("lat", "lon")
+SITE_METRIC_COLUMNS = ("capacity_gwh_year", "capacity_kt_per_year", "co2_injection_potential_tpy", "radius", "size_metric_value")
+SITE_FLAG_COLUMNS = ("is_eiffel",)
+SITE_COORD_DECIMALS = 6
+
+
+def nan_to_none(values: np.ndarray, missing) -> list:
+    """`values.tolist()` with the entries flagged in `missing` replaced by None (JSON null)."""
+    out = values.astype(object)
+    out[missing] = None
+    return out.tolist()
+
+
+def encode_site_column(name, values) -> dict:
+    """Compact JSON encoding of one site column.
+
+    Coordinates become integers in units of 10**-SITE_COORD_DECIMALS degrees,
+    metrics are rounded to float32 and written with their shortest decimal
+    form, flags become 0/1 and every other column is dictionary-coded.
+    NaN is written as null; metric rows that were None are listed in "none".
+    """
+    values = np.asarray(values, dtype=object)
+    if name in SITE_COORD_COLUMNS:
+        scale = 10 ** SITE_COORD_DECIMALS
+        coords = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+        missing = ~np.isfinite(coords)
+        ints = np.round(np.where(missing, 0, coords) * scale).astype(np.int64)
+        return {"type": "coord", "scale": scale, "values": nan_to_none(ints, missing)}
+    if name in SITE_METRIC_COLUMNS:
+        none = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+        metric = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+        with np.errstate(over="ignore"):
+            metric32 = metric.astype(np.float32)
+        missing = ~np.isfinite(metric32)
+        # float32 -> shortest repr -> float64 keeps the digits float32 can tell apart
+        shortest = np.where(missing, np.float32(0), metric32).astype(str).astype(float)
+        column = {"type": "float32", "values": nan_to_none(shortest, missing)}
+        if none.any():
+            column["none"] = np.flatnonzero(none).tolist()
+        return column
+    if name in SITE_FLAG_COLUMNS:
+        return {"type": "flag", "values": values.astype(bool).astype(np.int8).tolist()}
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=False)
+    uniques = np.asarray(uniques, dtype=object)
+    return {"type": "dict", "values": nan_to_none(uniques, pd.isna(uniques)), "codes": codes.tolist()}
+
+
+def encode_site_columns(columns: dict) -> dict:
+    """Column-wise SITES payload: {"n": rows, "columns": {name: encoded column}}."""
+    n = len(next(iter(columns.values()))) if columns else 0
+    return {"n": n, "columns": {name: encode_site_column(name, values) for name, values in columns.items()}}
+
+
+SEARCH_FIELDS = ("operator", "municipality", "site_info", "eiffel_project_name")
+
+
+def search_key(text: str) -> str:
+    """Lowercase `text` and strip its accents, as the map's search box does."""
+    return re.sub("[\u0300-\u036f]", "", unicodedata.normalize("NFD", text.lower()))
+
+
+def build_search_index(site_data: dict, fields=SEARCH_FIELDS) -> dict:
+    """Trigram index over the distinct values of the searchable site columns.
+
+    Values are numbered field after field in the order of each column's
+    dictionary ("values" in the site payload), so the browser maps a value
+    back to its sites through the column codes. Each trigram of a value's
+    search key lists the values holding it, ascending and delta-encoded.
+    """
+    fields = [f for f in fields if f in site_data["columns"]]
+    postings = {}
+    value_id = 0
+    for field in fields:
+        for value in site_data["columns"][field]["values"]:
+            if isinstance(value, str):
+                key = search_key(value)
+                for gram in {key[i:i + 3] for i in range(len(key) - 2)}:
+                    postings.setdefault(gram, []).append(value_id)
+            value_id += 1
+    trigrams = {gram: np.diff(ids, prepend=0).tolist() for gram, ids in postings.items()}
+    return {"fields": fields, "trigrams": trigrams}
+
+
+# Site clusters are precomputed for these map zooms (below the first, its clusters
+# are reused); above the last zoom every site is drawn on its own.
+SITE_CLUSTER_ZOOMS = list(range(3, 10))
+SITE_CLUSTER_RADIUS = 40  # px
+SITE_CLUSTER_METRICS = ("capacity_gwh_year", "co2_injection_potential_tpy")
+
+
+def greedy_clusters(xy: np.ndarray, weight: np.ndarray, group: np.ndarray, radius: float) -> np.ndarray:
+    """Cluster label per point, as in supercluster: points are visited heaviest first and
+    each unclaimed point claims the unclaimed points of its group within `radius`."""
+    cells = np.floor(xy / radius).astype(np.int64)
+    buckets = {}
+    for i, key in enumerate(zip(group.tolist(), cells[:, 0].tolist(), cells[:, 1].tolist())):
+        buckets.setdefault(key, []).append(i)
+    labels = np.full(len(xy), -1, dtype=np.int64)
+    n_clusters = 0
+    for i in np.argsort(-weight, kind="stable").tolist():
+        if labels[i] >= 0:
+            continue
+        g, cx, cy = group[i], cells[i, 0], cells[i, 1]
+        near = np.asarray([j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in buckets.get((g, cx + dx, cy + dy), ())])
+        near = near[labels[near] < 0]
+        d = xy[near] - xy[i]
+        labels[near[(d * d).sum(axis=1) <= radius * radius]] = n_clusters
+        n_clusters += 1
+    return labels
+
+
+def build_site_clusters(lat, lon, group, metrics: dict, zooms=SITE_CLUSTER_ZOOMS, radius=SITE_CLUSTER_RADIUS) -> dict:
+    """Hierarchical site clusters, one level per zoom in `zooms`.
+
+    Sites only cluster with sites of the same `group` (layer/category code).
+    The top level is built from the sites, every lower level from the clusters
+    of the level above, so clusters nest: "site" maps each site to its top
+    level cluster (-1 without coordinates) and each level's "parent" maps its
+    clusters to the level below. Clusters of several sites are numbered first
+    and only they get a centroid, site count and summed `metrics` (NaN counts
+    as 0); every cluster past the end of "count" holds a single site.
+    """
+    valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+    site = np.full(len(lat), -1, dtype=np.int64)
+    if len(valid) == 0:
+        empty = dict.fromkeys(("lat", "lon", "count", *metrics), [])
+        return {"zooms": sorted(zooms), "site": site.tolist(), "levels": [{"zoom": z, **empty} for z in sorted(zooms)]}
+    # Cluster properties at the current level, starting from single sites
+    xy = mercator_xy(np.column_stack([lat[valid], lon[valid]]))
+    points = {
+        "lat": lat[valid],
+        "lon": lon[valid],
+        "count": np.ones(len(valid)),
+        "group": np.asarray(group)[valid],
+        **{k: np.nan_to_num(np.asarray(v, dtype=float)[valid]) for k, v in metrics.items()},
+    }
+    levels = []
+    labels = None
+    for z in sorted(zooms, reverse=True):
+        labels = greedy_clusters(xy, points["count"], points["group"], radius * pixel_size_deg(z))
+        n = labels.max() + 1
+        order = np.argsort(np.bincount(labels, weights=points["count"], minlength=n) == 1, kind="stable")
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n)
+        labels = rank[labels]
+        if levels:
+            levels[-1]["parent"] = labels.tolist()
+        else:
+            site[valid] = labels
+        count = np.bincount(labels, weights=points["count"], minlength=n)
+        xy = np.column_stack([np.bincount(labels, weights=xy[:, k] * points["count"], minlength=n) / count for k in (0, 1)])
+        group_of = np.zeros(n, dtype=points["group"].dtype)
+        group_of[labels] = points["group"]
+        points = {
+            "lat": np.bincount(labels, weights=points["lat"] * points["count"], minlength=n) / count,
+            "lon": np.bincount(labels, weights=points["lon"] * points["count"], minlength=n) / count,
+            "count": count,
+            "group": group_of,
+            **{k: np.bincount(labels, weights=points[k], minlength=n) for k in metrics},
+        }
+        multi = int((count > 1).sum())
+        levels.append({
+            "zoom": z,
+            "lat": np.round(points["lat"][:multi], 4).tolist(),
+            "lon": np.round(points["lon"][:multi], 4).tolist(),
+            "count": count[:multi].astype(np.int64).tolist(),
+            **{k: np.round(points[k][:multi]).astype(np.int64).tolist() for k in metrics},
+        })
+    return {"zooms": sorted(zooms), "site": site.tolist(), "levels": levels[::-1]}
+
+
+def json_default(o):
+    """`json.dumps` hook for NumPy arrays and scalars."""
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+### >>> ELECTRICITY NETWORK ADDITION <<<
+GRID_NODE_COLUMNS = ["lat", "lon"]
+GRID_EDGE_COLUMNS = ["start_lat", "start_lon", "end_lat", "end_lon"]
+
+
+def load_grid_table(path, coord_columns, default_symbol) -> dict:
+    """Load an ENTSO-E CSV as columnar arrays.
+
+    Returns a dict with one float64 array per coordinate column, plus the
+    distinct `Symbol` strings in `symbols` and a per-row integer code into
+    that list in `symbol`. No per-row Python objects are created. Rows with
+    missing coordinates cannot be drawn and are dropped.
+    """
+    wanted = set(coord_columns) | {"Symbol"}
+    df = pd.read_csv(
+        path,
+        encoding="latin-1",
+        usecols=lambda c: c in wanted,
+        dtype={c: "float64" for c in coord_columns},
+    ).dropna(subset=coord_columns)
+    if "Symbol" in df.columns:
+        symbol = df["Symbol"].fillna(default_symbol).astype("category")
+    else:
+        symbol = pd.Series(default_symbol, index=df.index, dtype="category")
+
+    table = {c: df[c].to_numpy(dtype=float) for c in coord_columns}
+    table["symbols"] = symbol.cat.categories.astype(str).tolist()
+    table["symbol"] = symbol.cat.codes.to_numpy()
+    return table
+
+
+def empty_grid_table(coord_columns) -> dict:
+    """Columnar grid table without rows, shaped like load_grid_table's result."""
+    table = {c: np.zeros(0) for c in coord_columns}
+    table["symbols"] = []
+    table["symbol"] = np.zeros(0, dtype=np.int8)
+    return table
+
+
+GRID_HIGH_VOLTAGE_KV = 380  # edges from this voltage up are drawn in the high-voltage style
+# Node color by the first substring found in its symbol, else GRID_NODE_DEFAULT_COLOR
+GRID_NODE_COLORS = [
+    (("Hydro",), "#2196F3"),  # Blue for hydro
+    (("Wind",), "#006660"),  # Cyan for wind
+    (("Solar",), "#FF69B4"),  # Pink for solar
+    (("Nuclear",), "#9C27B0"),  # Purple for nuclear
+    (("Thermal", "Gas", "Coal"), "#F44336"),  # Red for thermal
+    (("Substation",), "#FF9800"),  # Orange for substations
+]
+GRID_NODE_DEFAULT_COLOR = "#9E9E9E"  # Gray for other/unknown
+GRID_NODE_LARGE = ("Hydro", "Nuclear")  # drawn with radius 5 instead of 3
+
+
+def grid_edge_voltage(symbol) -> int:
+    """Voltage in kV of a line symbol: its first "<n> kV" figure, else 400 for
+    symbols naming a 380-700 kV level and 150 (medium voltage) otherwise."""
+    match = re.search(r"(\d+)-(\d+)\s*kV", symbol, re.I) or re.search(r"(\d+)\s*kV", symbol, re.I)
+    if match:
+        return int(match.group(1))
+    if any(level in symbol for level in ("380", "400", "500", "700")):
+        return 400
+    return 150
+
+
+def grid_edge_styles(symbols) -> dict:
+    """Per-symbol "voltages" (kV) and "voltage_class" (1 from GRID_HIGH_VOLTAGE_KV up, else 0)."""
+    voltages = [grid_edge_voltage(symbol) for symbol in symbols]
+    return {"voltages": voltages, "voltage_class": [int(v >= GRID_HIGH_VOLTAGE_KV) for v in voltages]}
+
+
+def grid_node_styles(symbols) -> dict:
+    """Per-symbol node "colors" and "sizes" (marker radius in pixels)."""
+    colors = [
+        next((color for names, color in GRID_NODE_COLORS if any(n in symbol for n in names)), GRID_NODE_DEFAULT_COLOR)
+        for symbol in symbols
+    ]
+    sizes = [5 if any(n in symbol for n in GRID_NODE_LARGE) else 3 for symbol in symbols]
+    return {"colors": colors, "sizes": sizes}
+
+
+def columns_to_json(table) -> str:
+    """Serialize a dict of NumPy columns (and plain lists) to JSON."""
+    return json.dumps(table, default=json_default)
+### <<< END ELECTRICITY NETWORK ADDITION <<<
+
+
+### >>> GAS NETWORK ADDITION <<<
+GEOJSON_FEATURES_RE = re.compile(r'"features"\s*:\s*\[')
+
+# Output key -> (GeoJSON property, fallback) for each pipeline segment
+GAS_PIPELINE_PROPS = {
+    "name": ("PipelineName", "N/A"),
+    "segment": ("SegmentName", "N/A"),
+    "status": ("Status", "N/A"),
+    "fuel": ("Fuel", "N/A"),
+    "countries": ("Countries", "N/A"),
+    "owner": ("Owner", "N/A"),
+    "parent": ("Parent", "N/A"),
+    "start_year": ("StartYear1", "N/A"),
+    "capacity": ("Capacity", "N/A"),
+    "capacity_units": ("CapacityUnits", ""),
+    "length": ("LengthMergedKm", "N/A"),
+    "diameter": ("Diameter", "N/A"),
+    "diameter_units": ("DiameterUnits", ""),
+    "fuel_source": ("FuelSource", "N/A"),
+    "start_location": ("StartLocation", "N/A"),
+    "start_country": ("StartCountry", "N/A"),
+    "end_location": ("EndLocation", "N/A"),
+    "end_country": ("EndCountry", "N/A"),
+}
+
+
+def iter_geojson_features(path, chunk_size=1 << 16):
+    """Yield the features of a GeoJSON FeatureCollection one at a time.
+
+    The file is read in chunks and each feature object is decoded on its own,
+    so only the current feature (plus one read buffer) is held in memory. While
+    a feature is incomplete the read size doubles, so a feature longer than
+    the buffer is re-decoded O(log size) times rather than once per chunk.
+    A "features" key nested in another member before the top-level one is
+    skipped.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        # Locate the opening bracket of the top-level "features" array, tracking
+        # the nesting depth (outside strings) of the text before each match
+        depth, in_string, escaped, scanned, search_from = 0, False, False, 0, 0
+        while True:
+            m = GEOJSON_FEATURES_RE.search(buf, search_from)
+            if m:
+                for ch in buf[scanned:m.start()]:
+                    if in_string:
+                        if escaped:
+                            escaped = False
+                        elif ch == "\\":
+                            escaped = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = True
+                    elif ch in "{[":
+                        depth += 1
+                    elif ch in "}]":
+                        depth -= 1
+                scanned = m.start()
+                if depth == 1 and not in_string:
+                    pos = m.end()
+                    break
+                search_from = m.start() + 1
+                continue
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buf += chunk
+
+        eof = False
+        read_size = chunk_size
+        while True:
+            # Skip whitespace and separators between features
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            if pos < len(buf):
+                try:
+                    feature, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield feature
+                    pos = end
+                    read_size = chunk_size
+                    continue
+            elif eof:
+                raise ValueError(f"Unterminated features array in {path}")
+            # Need more input: drop consumed text, then append the next chunk
+            if pos:
+                buf = buf[pos:]
+                pos = 0
+            chunk = f.read(read_size)
+            if chunk:
+                buf += chunk
+                read_size *= 2
+            else:
+                eof = True
+
+
+def iter_line_coords(geom):
+    """Yield the coordinate lists of every line in a (Multi)LineString or GeometryCollection."""
+    if not geom:
+        return
+    geom_type = geom.get("type")
+    if geom_type == "LineString":
+        yield geom["coordinates"]
+    elif geom_type == "MultiLineString":
+        yield from geom["coordinates"]
+    elif geom_type == "GeometryCollection":
+        for sub_geom in geom.get("geometries") or []:
+            if sub_geom["type"] == "LineString":
+                yield sub_geom["coordinates"]
+            elif sub_geom["type"] == "MultiLineString":
+                yield from sub_geom["coordinates"]
+
+
+def load_gas_pipelines(path) -> list:
+    """Stream pipeline segments from a GEM GeoJSON file.
+
+    Each segment holds its vertices as a compact (N, 2) float64 array in
+    [lat, lon] order, plus the popup properties listed in GAS_PIPELINE_PROPS.
+    """
+    gas_pipelines = []
+    for feature in iter_geojson_features(path):
+        props = feature.get("properties") or {}
+        meta = None
+        for coords in iter_line_coords(feature.get("geometry")):
+            if not coords or len(coords) <= 1:
+                continue
+            if meta is None:
+                meta = {key: props.get(src, fallback) for key, (src, fallback) in GAS_PIPELINE_PROPS.items()}
+            lonlat = np.asarray(coords, dtype=float)[:, :2]
+            gas_pipelines.append({"coordinates": lonlat[:, ::-1].copy(), **meta})  # Swap to [lat, lon]
+    return gas_pipelines
+
+
+# Zoom bands for simplified pipeline geometry: level i is drawn up to zoom
+# GAS_LEVEL_ZOOMS[i]; above the last band the full geometry is drawn.
+GAS_LEVEL_ZOOMS = [4, 6, 8, 10]
+GAS_COORD_DECIMALS = 5  # ~1 m, below what the map can resolve
+
+# Zoom bands for binned site heatmaps: band i is drawn up to zoom HEAT_BAND_ZOOMS[i]
+# from cells of half the heat radius at that zoom; above the last band (and the
+# heat layers' maxZoom of 12) every site is its own point.
+HEAT_BAND_ZOOMS = [5, 7, 9, 11]
+
+# Site heatmaps, shared by the page and the --raster-tiles pyramid: the layer,
+# category and techno values of the sites feeding each one, its gradient, and
+# optional point weight, radius/blur factors and max intensity
+HEAT_GRADIENTS = {
+    "supply": {0.4: "lime", 0.6: "yellow", 0.8: "orange", 1.0: "red"},
+    "offtake": {0.4: "yellow", 0.6: "gold", 0.8: "orange", 1.0: "darkorange"},
+    "competitors": {0.2: "cyan", 0.4: "deepskyblue", 0.6: "blue", 0.8: "darkblue", 1.0: "purple"},
+}
+HEATMAP_DEFS = {
+    "biomethane": {"match": {"layer": ["Supply"], "techno": ["Bio-CNG", "Bio-LNG", "Biomethane"]}, "gradient": "supply"},
+    "biogas": {"match": {"category": ["Biogas"]}, "gradient": "supply"},
+    "feedstock": {"match": {"category": ["Feedstock"]}, "gradient": "supply"},
+    "foodprocessing": {"match": {"category": ["Food processing"]}, "gradient": "offtake"},
+    "efuels": {"match": {"techno": ["E-methanol", "E-SAF"]}, "gradient": "offtake"},
+    # Storage: higher intensity and radius for better visibility
+    "storage": {"match": {"category": ["Storage"]}, "gradient": "offtake",
+                "weight": 5, "radius_scale": 1.5, "blur_scale": 1.2, "max": 10},
+    "greenhouses": {"match": {"techno": ["Greenhouses"]}, "gradient": "offtake"},
+    "bioco2": {"match": {"techno": ["BioCO2"]}, "gradient": "competitors", "max": 3.0},
+    "fossilco2": {"match": {"techno": ["FossilCO2"]}, "gradient": "competitors", "max": 3.0},
+    "capture": {"match": {"category": ["Capture"]}, "gradient": "competitors", "max": 3.0},
+    "papeterie": {"match": {"category": ["Papeterie"]}, "gradient": "competitors", "max": 3.0},
+}
+HEAT_MAX_ZOOM = 12  # the heat layers' maxZoom: points weigh 1 / 2^(HEAT_MAX_ZOOM - zoom) below it
+
+
+def pixel_size_deg(zoom: int) -> float:
+    """Size of one 256 px tile pixel at `zoom`, in Web Mercator degrees."""
+    return 360.0 / (256 * 2 ** zoom)
+
+
+def mercator_xy(latlon: np.ndarray) -> np.ndarray:
+    """Project [lat, lon] rows to Web Mercator x/y expressed in degrees."""
+    lat = np.clip(latlon[:, 0], -85.0, 85.0)
+    y = np.degrees(np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)))
+    return np.column_stack([latlon[:, 1], y])
+
+
+def douglas_peucker_mask(xy: np.ndarray, tolerance: float) -> np.ndarray:
+    """Return a boolean mask of the vertices kept by Douglas–Peucker at `tolerance`."""
+    n = len(xy)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        a, b = xy[i], xy[j]
+        seg = xy[i + 1:j]
+        ab = b - a
+        length = np.hypot(ab[0], ab[1])
+        if length == 0:
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(ab[0] * (seg[:, 1] - a[1]) - ab[1] * (seg[:, 0] - a[0])) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            idx = i + 1 + k
+            keep[idx] = True
+            stack.append((i, idx))
+            stack.append((idx, j))
+    return keep
+
+
+def simplification_levels(latlon: np.ndarray, zooms=GAS_LEVEL_ZOOMS) -> np.ndarray:
+    """Assign each vertex the coarsest zoom band at which it must be drawn.
+
+    Bands are simplified from fine to coarse, each one from the previous
+    result, so levels are nested: the geometry for band `i` is the vertices
+    whose level is <= i. Vertices only needed at full resolution get
+    `len(zooms)`. The tolerance of a band is one pixel at its highest zoom.
+    """
+    levels = np.full(len(latlon), len(zooms), dtype=np.int8)
+    xy = mercator_xy(latlon)
+    idx = np.arange(len(latlon))
+    for level in range(len(zooms) - 1, -1, -1):
+        idx = idx[douglas_peucker_mask(xy[idx], pixel_size_deg(zooms[level]))]
+        levels[idx] = level
+    return levels
+
+
+def simplify_gas_pipelines(gas_pipelines) -> None:
+    """Round pipeline vertices and attach per-vertex zoom levels in place.
+
+    Levels are stored as a digit string ("levels": "0443...") with one
+    character per vertex, which is about half the size of a JSON list.
+    """
+    for pipeline in gas_pipelines:
+        coords = np.round(pipeline["coordinates"], GAS_COORD_DECIMALS)
+        pipeline["coordinates"] = coords
+        levels = simplification_levels(coords)
+        pipeline["levels"] = (levels + ord("0")).astype(np.uint8).tobytes().decode("ascii")
+### <<< END GAS NETWORK ADDITION <<<
+
+
+# Binary column files (--data-format binary): a JSON header followed by typed columns
+BINARY_TYPES = {"float32": "<f4", "int32": "<i4", "uint8": "u1"}
+BINARY_ALIGN = 4  # bytes; every column starts on this boundary so the page can view it in place
+
+
+def pack_binary(columns: dict, header: dict | None = None, table=True) -> bytes:
+    """Pack {name: (type, values)} columns behind a JSON header, as the page's unpackBinary reads them.
+
+    The file is the header length (little-endian uint32), the UTF-8 JSON
+    header padded to BINARY_ALIGN, then each column as little-endian
+    BINARY_TYPES. The header is `header` plus "columns": {name: {"type",
+    "offset", "length"}}, with offsets in bytes from the first column; without
+    `table` it is left out for readers that know the columns (site tiles).
+    """
+    layout, chunks, offset = {}, [], 0
+    for name, (kind, values) in columns.items():
+        data = np.ascontiguousarray(values, dtype=BINARY_TYPES[kind]).tobytes()
+        pad = -offset % BINARY_ALIGN
+        chunks.append(b"\0" * pad + data)
+        offset += pad
+        layout[name] = {"type": kind, "offset": offset, "length": len(values)}
+        offset += len(data)
+    head = {**(header or {}), "columns": layout} if table else header or {}
+    head = json.dumps(head, separators=(",", ":"), default=json_default).encode("utf-8")
+    return struct.pack("<I", len(head)) + head + b"\0" * (-(4 + len(head)) % BINARY_ALIGN) + b"".join(chunks)
+
+
+def gas_pipelines_binary(gas_pipelines) -> bytes:
+    """pack_binary form of GAS_PIPELINES.
+
+    The vertices of all pipelines share float32 "lat"/"lon" and uint8
+    "levels" columns, split by the int32 "offsets" (one more than there are
+    pipelines); the header lists each pipeline's other fields in "pipelines".
+    """
+    coords = [np.asarray(p["coordinates"], dtype=float).reshape(-1, 2) for p in gas_pipelines]
+    levels = [
+        np.frombuffer(p["levels"].encode("ascii"), dtype=np.uint8) - ord("0") if "levels" in p
+        else np.zeros(len(c), dtype=np.uint8)
+        for p, c in zip(gas_pipelines, coords)
+    ]
+    vertices = np.concatenate(coords) if coords else np.zeros((0, 2))
+    columns = {
+        "lat": ("float32", vertices[:, 0]),
+        "lon": ("float32", vertices[:, 1]),
+        "levels": ("uint8", np.concatenate(levels) if levels else np.zeros(0)),
+        "offsets": ("int32", np.concatenate([[0], np.cumsum([len(c) for c in coords])])),
+    }
+    pipelines = [{k: v for k, v in p.items() if k not in ("coordinates", "levels")} for p in gas_pipelines]
+    return pack_binary(columns, {"pipelines": pipelines})
+
+
+# Network layers (grid nodes/edges, gas pipelines) as JSON, keyed by their JS constant
+NETWORK_CONSTANTS = ("GRID_NODES", "GRID_EDGES", "GAS_PIPELINES")
+
+
+def network_payloads(grid_nodes, grid_edges, gas_pipelines, names=NETWORK_CONSTANTS, binary=False) -> dict:
+    """Serialize the requested network layers to JSON strings keyed by JS constant name.
+
+    Grid tables carry their per-symbol styles (see grid_edge_styles and grid_node_styles).
+    With `binary`, they are pack_binary bytes instead: grid coordinates are
+    float32 and symbol codes int32 columns, the per-symbol lists are in the header.
+    """
+    grid_nodes = grid_nodes or empty_grid_table(GRID_NODE_COLUMNS)
+    grid_edges = grid_edges or empty_grid_table(GRID_EDGE_COLUMNS)
+    grid_tables = {
+        "GRID_NODES": (grid_nodes, GRID_NODE_COLUMNS, lambda: grid_node_styles(grid_nodes["symbols"])),
+        "GRID_EDGES": (grid_edges, GRID_EDGE_COLUMNS, lambda: grid_edge_styles(grid_edges["symbols"])),
+    }
+
+    def grid_payload(name):
+        table, coord_columns, styles = grid_tables[name]
+        if not binary:
+            return columns_to_json({**table, **styles()})
+        columns = {c: ("float32", table[c]) for c in coord_columns}
+        columns["symbol"] = ("int32", table["symbol"])
+        return pack_binary(columns, {"symbols": table["symbols"], **styles()})
+
+    def gas_payload():
+        if binary:
+            return gas_pipelines_binary(gas_pipelines or [])
+        return json.dumps(gas_pipelines or [], default=json_default)
+
+    return {name: gas_payload() if name == "GAS_PIPELINES" else grid_payload(name) for name in names}
+
+
+SIDECAR_HASH_LENGTH = 16
+
+
+def write_sidecar(out_dir: Path, stem: str, payload: str | bytes) -> str:
+    """Write `payload` to `<stem>.<content hash>.json` (`.bin` for bytes) in `out_dir` and return the file name.
+
+    Earlier sidecars of the same stem (and their .gz/.br variants) are removed
+    so stale hashes do not pile up; callers put the page name in `stem` so
+    this never touches another page's sidecars.
+    """
+    data = payload if isinstance(payload, bytes) else payload.encode("utf-8")
+    suffix = "bin" if isinstance(payload, bytes) else "json"
+    digest = hashlib.sha256(data).hexdigest()[:SIDECAR_HASH_LENGTH]
+    filename = f"{stem}.{digest}.{suffix}"
+    sidecar_re = re.compile(rf"{re.escape(stem)}\.([0-9a-f]{{{SIDECAR_HASH_LENGTH}}})\.(json|bin)(\.gz|\.br)?")
+    for old in out_dir.glob(f"{stem}.*"):
+        match = sidecar_re.fullmatch(old.name)
+        if match and (match.group(1), match.group(2)) != (digest, suffix):
+            old.unlink()
+    path = out_dir / filename
+    if not path.exists():
+        path.write_bytes(data)
+    return filename
+
+
+# Network tile pyramid: z/x/y JSON tiles of clipped, quantized network geometry
+NETWORK_TILE_DIR = "network_tiles"
+NETWORK_TILE_ZOOMS = GAS_LEVEL_ZOOMS  # a tile zoom serves map zooms up to the next one
+NETWORK_TILE_EXTENT = 4096  # tile-local integer coordinates per tile side
+
+
+def tile_pixels(latlon: np.ndarray, zoom: int) -> np.ndarray:
+    """Project [lat, lon] rows to global Web Mercator tile pixels (NETWORK_TILE_EXTENT per tile)."""
+    lat = np.radians(np.clip(latlon[:, 0], -85.0511, 85.0511))
+    scale = NETWORK_TILE_EXTENT * 2 ** zoom
+    x = (latlon[:, 1] + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * scale
+    return np.column_stack([x, y])
+
+
+def clip_segment(p0, p1, x0, y0, x1, y1):
+    """Liang–Barsky clip of segment p0-p1 to a box; returns the clipped endpoints or None."""
+    d = p1 - p0
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-d[0], p0[0] - x0), (d[0], x1 - p0[0]), (-d[1], p0[1] - y0), (d[1], y1 - p0[1])):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return None
+    return p0 + t0 * d, p0 + t1 * d
+
+
+def split_polyline_by_tile(px: np.ndarray) -> dict:
+    """Cut a polyline in global tile pixels into per-tile pieces.
+
+    Returns {(x, y): [piece, ...]} where each piece is an (N, 2) array of
+    global tile pixels clipped to that tile. Runs of vertices inside one
+    tile are kept whole; only segments crossing a tile edge are clipped.
+    """
+    extent = NETWORK_TILE_EXTENT
+    tiles = np.floor(px / extent).astype(np.int64)
+    change = np.flatnonzero(np.any(tiles[1:] != tiles[:-1], axis=1)) + 1
+    starts = np.concatenate([[0], change])
+    ends = np.concatenate([change, [len(px)]])
+    pieces = {}
+    entry = None
+    for a, b in zip(starts, ends):
+        key = (int(tiles[a, 0]), int(tiles[a, 1]))
+        run = [px[a:b]] if entry is None else [entry[None], px[a:b]]
+        entry = None
+        if b < len(px):
+            p0, p1 = px[b - 1], px[b]
+            next_key = (int(tiles[b, 0]), int(tiles[b, 1]))
+            (tx0, tx1), (ty0, ty1) = sorted((key[0], next_key[0])), sorted((key[1], next_key[1]))
+            for tx in range(tx0, tx1 + 1):
+                for ty in range(ty0, ty1 + 1):
+                    seg = clip_segment(p0, p1, tx * extent, ty * extent, (tx + 1) * extent, (ty + 1) * extent)
+                    if seg is None:
+                        continue
+                    if (tx, ty) == key:
+                        run.append(seg[1][None])
+                    elif (tx, ty) == next_key:
+                        entry = seg[0]
+                    else:
+                        pieces.setdefault((tx, ty), []).append(np.vstack(seg))
+        pieces.setdefault(key, []).append(np.vstack(run))
+    return pieces
+
+
+def quantize_piece(piece: np.ndarray, tile) -> list:
+    """Tile-local integer coordinates [x0, y0, x1, y1, ...] of a piece, minus repeated points."""
+    local = np.round(piece - np.asarray(tile) * NETWORK_TILE_EXTENT).astype(np.int64)
+    keep = np.ones(len(local), dtype=bool)
+    keep[1:] = np.any(local[1:] != local[:-1], axis=1)
+    local = local[keep]
+    return local.ravel().tolist() if len(local) > 1 else []
+
+
+def network_tile_files(grid_nodes, grid_edges, gas_pipelines) -> dict:
+    """Cut the networks into a tile pyramid; returns {relative path: JSON payload}.
+
+    Tiles are `grid/{z}/{x}/{y}.json` with flat "edges" ([symbol, x0, y0, x1,
+    y1] repeated) and "nodes" ([symbol, x, y] repeated), and
+    `gas/{z}/{x}/{y}.json` with "lines" ([pipeline, x0, y0, ...] per piece).
+    Below the top zoom, gas lines use the simplification level of the next
+    zoom band and nodes sharing a screen pixel and symbol are drawn once.
+    Each dataset's `index.json` lists its existing tiles and holds the
+    symbols (with their styles) or pipeline properties its tiles refer to
+    by index.
+    """
+    grid_nodes = grid_nodes or empty_grid_table(GRID_NODE_COLUMNS)
+    grid_edges = grid_edges or empty_grid_table(GRID_EDGE_COLUMNS)
+    gas_pipelines = gas_pipelines or []
+    tiles = {"grid": {}, "gas": {}}
+    pixels_per_unit = NETWORK_TILE_EXTENT // 256
+
+    for band, zoom in enumerate(NETWORK_TILE_ZOOMS):
+        top = band == len(NETWORK_TILE_ZOOMS) - 1
+
+        starts = tile_pixels(np.column_stack([grid_edges["start_lat"], grid_edges["start_lon"]]), zoom)
+        ends = tile_pixels(np.column_stack([grid_edges["end_lat"], grid_edges["end_lon"]]), zoom)
+        for code, p0, p1 in zip(np.asarray(grid_edges["symbol"]).tolist(), starts, ends):
+            for tile, pieces in split_polyline_by_tile(np.vstack([p0, p1])).items():
+                grid_tile = tiles["grid"].setdefault((zoom, *tile), {"edges": [], "nodes": []})
+                for piece in pieces:
+                    coords = quantize_piece(piece, tile)
+                    if coords:
+                        grid_tile["edges"].extend([code, *coords[:2], *coords[-2:]])
+
+        px = tile_pixels(np.column_stack([grid_nodes["lat"], grid_nodes["lon"]]), zoom)
+        node_tiles = np.floor(px / NETWORK_TILE_EXTENT).astype(np.int64)
+        local = np.round(px - node_tiles * NETWORK_TILE_EXTENT).astype(np.int64)
+        nodes = pd.DataFrame({
+            "tx": node_tiles[:, 0], "ty": node_tiles[:, 1], "code": np.asarray(grid_nodes["symbol"]),
+            "x": local[:, 0], "y": local[:, 1],
+        })
+        if not top:
+            nodes = nodes.assign(sx=nodes["x"] // pixels_per_unit, sy=nodes["y"] // pixels_per_unit)
+            nodes = nodes.drop_duplicates(["tx", "ty", "code", "sx", "sy"])
+        for (tx, ty), group in nodes.groupby(["tx", "ty"], sort=False):
+            grid_tile = tiles["grid"].setdefault((zoom, int(tx), int(ty)), {"edges": [], "nodes": []})
+            grid_tile["nodes"] = group[["code", "x", "y"]].to_numpy().ravel().tolist()
+
+        level = len(NETWORK_TILE_ZOOMS) if top else band + 1
+        for index, pipeline in enumerate(gas_pipelines):
+            coords = np.asarray(pipeline["coordinates"], dtype=float)
+            if "levels" in pipeline:
+                coords = coords[np.frombuffer(pipeline["levels"].encode("ascii"), dtype=np.uint8) - ord("0") <= level]
+            for tile, pieces in split_polyline_by_tile(tile_pixels(coords, zoom)).items():
+                gas_tile = tiles["gas"].setdefault((zoom, *tile), {"lines": []})
+                for piece in pieces:
+                    coords_q = quantize_piece(piece, tile)
+                    if coords_q:
+                        gas_tile["lines"].append([index, *coords_q])
+
+    files = {}
+    for dataset, dataset_tiles in tiles.items():
+        for (z, x, y), content in dataset_tiles.items():
+            if any(content.values()):
+                files[f"{dataset}/{z}/{x}/{y}.json"] = json.dumps(content, separators=(",", ":"))
+    indexes = {
+        "grid": {
+            "edge_symbols": grid_edges["symbols"],
+            **{f"edge_{k}": v for k, v in grid_edge_styles(grid_edges["symbols"]).items()},
+            "node_symbols": grid_nodes["symbols"],
+            **{f"node_{k}": v for k, v in grid_node_styles(grid_nodes["symbols"]).items()},
+        },
+        "gas": {
+            "pipelines": [
+                {k: v for k, v in pipeline.items() if k not in ("coordinates", "levels")} for pipeline in gas_pipelines
+            ],
+        },
+    }
+    for dataset, index in indexes.items():
+        prefix = dataset + "/"
+        index.update({
+            "zooms": NETWORK_TILE_ZOOMS,
+            "extent": NETWORK_TILE_EXTENT,
+            "tiles": sorted(path[len(prefix):-len(".json")] for path in files if path.startswith(prefix)),
+        })
+        files[prefix + "index.json"] = json.dumps(index, separators=(",", ":"), default=json_default)
+    return files
+
+
+def page_tree_dir(out: Path, tree: str) -> str:
+    """Name of the `tree` directory of the page written to `out`, e.g. `index.network_tiles`.
+
+    write_file_tree prunes whatever its root holds beyond the current build, so
+    each page gets its own root and pages built into one directory keep their files.
+    """
+    return f"{Path(out).stem}.{tree}"
+
+
+def write_file_tree(root: Path, files: dict) -> list:
+    """Write {relative path: text or bytes} under `root`, rewriting only changed files.
+
+    Files under `root` that are no longer part of the tree (and their .gz/.br
+    variants) are removed. Returns the paths of the tree's files.
+    """
+    paths = []
+    for rel, payload in files.items():
+        path = root / rel
+        data = payload if isinstance(payload, bytes) else payload.encode("utf-8")
+        if not path.exists() or path.read_bytes() != data:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        paths.append(path)
+    current = {path.as_posix() for path in paths}
+    for old in root.rglob("*"):
+        base = old.as_posix()
+        for ext in (".gz", ".br"):
+            base = base.removesuffix(ext)
+        if old.is_file() and base not in current:
+            old.unlink()
+    return paths
+
+
+# Site tiles (--site-data tiles): the sites cut by quadkey at SITE_TILE_ZOOM into tiles
+# that the page fetches by viewport, listed in an index inlined in the page
+SITE_TILE_DIR = "site_tiles"
+SITE_TILE_ZOOM = 8
+SITE_TILE_FACETS = ("techno", "status", "capacity_bucket")
+SITE_TILE_UNPLACED = "unplaced"  # tile of the sites without coordinates, fetched with the page
+SITE_TILE_SEARCH = "search.json"  # search index with the dictionaries of its fields, fetched on first search
+SITE_TILE_SHARED_VALUES = 64  # larger dictionaries (and those of SEARCH_FIELDS) ship in each tile
+SITE_BINARY_TYPES = {"dict": "int32", "coord": "int32", "float32": "float32", "flag": "uint8"}  # by column type
+
+
+def site_quadkeys(lat, lon, zoom=SITE_TILE_ZOOM) -> np.ndarray:
+    """Quadkey of the tile at `zoom` holding each site, SITE_TILE_UNPLACED without coordinates.
+
+    Quadkeys sort in Z-order, so sorting sites by them keeps nearby tiles together.
+    """
+    lat = pd.to_numeric(pd.Series(lat), errors="coerce").to_numpy(dtype=float)
+    lon = pd.to_numeric(pd.Series(lon), errors="coerce").to_numpy(dtype=float)
+    located = np.isfinite(lat) & np.isfinite(lon)
+    px = tile_pixels(np.column_stack([np.where(located, lat, 0.0), np.where(located, lon, 0.0)]), zoom)
+    tiles = np.clip(np.floor(px / NETWORK_TILE_EXTENT).astype(np.int64), 0, 2 ** zoom - 1)
+    keys = np.full(len(lat), "", dtype=object)
+    for bit in range(zoom - 1, -1, -1):
+        digit = ((tiles[:, 0] >> bit) & 1) + 2 * ((tiles[:, 1] >> bit) & 1)
+        keys = keys + digit.astype(str).astype(object)
+    keys[~located] = SITE_TILE_UNPLACED
+    return keys
+
+
+def site_tile_binary(tile: dict, columns: dict) -> bytes:
+    """pack_binary form of a JSON site tile (see site_tile_files).
+
+    Each column is packed as its SITE_BINARY_TYPES type (coordinates in their
+    scaled units, null metrics as NaN) without a column table: the page lays
+    the columns out from the tile index. The header has the tile's own
+    dictionaries ("dicts"), the "none" rows of each column and the null rows
+    of coordinates ("null"), if any.
+    """
+    packed, header = {}, {}
+    for name, part in tile.items():
+        kind = columns[name]["type"]
+        if kind == "dict":
+            packed[name] = (SITE_BINARY_TYPES[kind], part["codes"])
+            if "values" in part:
+                header.setdefault("dicts", {})[name] = {k: v for k, v in part.items() if k != "codes"}
+            continue
+        values = np.array(part["values"], dtype=float)  # None -> NaN
+        if kind == "coord":
+            null = np.isnan(values)
+            if null.any():
+                header.setdefault("null", {})[name] = np.flatnonzero(null).tolist()
+            values = np.where(null, 0, values)
+        if "none" in part:
+            header.setdefault("none", {})[name] = part["none"]
+        packed[name] = (SITE_BINARY_TYPES[kind], values)
+    return pack_binary(packed, header, table=False)
+
+
+def site_tile_files(site_data: dict, quadkeys, lat, lon, binary=False):
+    """Cut the encoded site columns into {relative path: JSON tile}, their dictionaries and the tile list.
+
+    Sites must be ordered by quadkey (see site_quadkeys), so tile `<quadkey>.json`
+    holds the sites start..start + count - 1 with the per-row part of each column:
+    "codes" of dictionary columns, "values" (and "none", relative to start) of
+    the others; with `binary`, tiles are `<quadkey>.bin` (see site_tile_binary).
+    Dictionaries that grow with the sites (SEARCH_FIELDS and those over
+    SITE_TILE_SHARED_VALUES values, facets excepted) are cut too: such a column
+    of a tile codes its rows into the tile's own "values", whose codes in the
+    full dictionary are its "ids" for SEARCH_FIELDS. The search index of these
+    fields, with their full dictionaries as "values", is the SITE_TILE_SEARCH file.
+    The returned columns keep each column's type, scale and shared dictionary
+    ("local" instead for cut ones) for the page; each tile of the list gives its
+    quadkey, first site, site count, centroid (placed tiles only) and its site
+    count per combination of SITE_TILE_FACETS codes, as [code, ..., count] rows.
+    """
+    columns = site_data["columns"]
+    local = {
+        name for name, col in columns.items()
+        if col["type"] == "dict" and name not in SITE_TILE_FACETS
+        and (name in SEARCH_FIELDS or len(col["values"]) > SITE_TILE_SHARED_VALUES)
+    }
+    meta = {}
+    for name, col in columns.items():
+        meta[name] = {k: v for k, v in col.items() if k in ("type", "scale") or (k == "values" and col["type"] == "dict")}
+        if name in local:
+            meta[name] = {"type": "dict", "local": True}
+    none = {name: np.asarray(col["none"]) for name, col in columns.items() if "none" in col}
+    facet_codes = np.column_stack([np.asarray(columns[name]["codes"]) for name in SITE_TILE_FACETS])
+    lat = pd.to_numeric(pd.Series(lat), errors="coerce").to_numpy(dtype=float)
+    lon = pd.to_numeric(pd.Series(lon), errors="coerce").to_numpy(dtype=float)
+
+    files, tiles = {}, []
+    keys, starts, counts = np.unique(np.asarray(quadkeys, dtype=str), return_index=True, return_counts=True)
+    for key, start, count in zip(keys.tolist(), starts.tolist(), counts.tolist()):
+        end = start + count
+        tile = {}
+        for name, col in columns.items():
+            if name in local:
+                ids, codes = np.unique(np.asarray(col["codes"][start:end]), return_inverse=True)
+                tile[name] = {"codes": codes.tolist(), "values": [col["values"][k] for k in ids.tolist()]}
+                if name in SEARCH_FIELDS:
+                    tile[name]["ids"] = ids.tolist()
+            elif col["type"] == "dict":
+                tile[name] = {"codes": col["codes"][start:end]}
+            else:
+                tile[name] = {"values": col["values"][start:end]}
+                if name in none:
+                    rows = none[name][np.searchsorted(none[name], start):np.searchsorted(none[name], end)]
+                    if len(rows):
+                        tile[name]["none"] = (rows - start).tolist()
+        if binary:
+            files[f"{key}.bin"] = site_tile_binary(tile, columns)
+        else:
+            files[f"{key}.json"] = json.dumps({"columns": tile}, separators=(",", ":"))
+        record = {"key": key, "start": start, "count": count}
+        if key != SITE_TILE_UNPLACED:
+            record["lat"] = round(float(lat[start:end].mean()), 4)
+            record["lon"] = round(float(lon[start:end].mean()), 4)
+        combos, combo_counts = np.unique(facet_codes[start:end], axis=0, return_counts=True)
+        record["facets"] = np.column_stack([combos, combo_counts]).tolist()
+        tiles.append(record)
+    search = build_search_index(site_data)
+    search["values"] = {field: columns[field]["values"] for field in search["fields"]}
+    files[SITE_TILE_SEARCH] = json.dumps(search, separators=(",", ":"), default=json_default)
+    return files, meta, tiles
+
+
+# Raster tile pyramids (--raster-tiles): z/x/y PNG overlays of the site heatmaps and greenhouse grid
+RASTER_TILE_DIR = "raster_tiles"
+RASTER_HEAT_ZOOMS = list(range(3, 11))  # above the last zoom the page draws the heat layer instead
+RASTER_GRID_ZOOMS = list(range(3, 9))  # 30 km greenhouse cells stay sharp when scaled up
+RASTER_HEAT_MIN_OPACITY = 0.05  # leaflet.heat's minOpacity
+GREENHOUSE_GRID_OPACITY = 0.7
+GREENHOUSE_GRID_SAMPLE = 16  # tile pixels between exactly reprojected grid samples
+CSS_COLORS = {
+    "lime": "#00FF00", "yellow": "#FFFF00", "orange": "#FFA500", "red": "#FF0000",
+    "gold": "#FFD700", "darkorange": "#FF8C00", "cyan": "#00FFFF", "deepskyblue": "#00BFFF",
+    "blue": "#0000FF", "darkblue": "#00008B", "purple": "#800080",
+}
+
+
+def css_rgb(color: str) -> tuple:
+    """(r, g, b) of a `#RRGGBB` color or one of the CSS_COLORS names."""
+    color = CSS_COLORS.get(color, color)
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (height, width, 4) uint8 array as an 8-bit RGBA PNG.
+
+    Rows use the Sub filter (each byte minus the one a pixel to its left),
+    which packs the flat areas of heat and grid tiles far better than none.
+    """
+    height, width, _ = rgba.shape
+    pixels = rgba.reshape(height, -1)
+    rows = np.ones((height, 1 + width * 4), dtype=np.uint8)  # filter type 1 (Sub) per row
+    rows[:, 1:5] = pixels[:, :4]
+    rows[:, 5:] = pixels[:, 4:] - pixels[:, :-4]
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows.tobytes()))
+            + chunk(b"IEND", b""))
+
+
+def gradient_palette(stops: dict) -> np.ndarray:
+    """(256, 3) colors of a {position: color} gradient, as leaflet.heat samples it."""
+    positions = sorted(stops)
+    rgb = np.array([css_rgb(stops[pos]) for pos in positions], dtype=float)
+    t = (np.arange(256) + 0.5) / 256
+    return np.column_stack([np.interp(t, positions, rgb[:, c]) for c in range(3)]).round().astype(np.uint8)
+
+
+def heat_kernel(radius: int, blur: int, supersample: int = 4) -> np.ndarray:
+    """Opacity stamp of one heat point: a disc of `radius` px blurred like a canvas shadow of `blur` px.
+
+    The stamp is 2 * (radius + blur) px wide, centered on the point.
+    """
+    r2 = radius + blur
+    c = (np.arange(2 * r2 * supersample) + 0.5) / supersample - r2
+    disc = (c[:, None] ** 2 + c[None, :] ** 2 <= radius ** 2).astype(float)
+    disc = disc.reshape(2 * r2, supersample, 2 * r2, supersample).mean(axis=(1, 3))
+    if blur > 0:
+        sigma = blur / 2  # a canvas shadowBlur is a Gaussian of half its value
+        k = np.arange(-int(3 * sigma), int(3 * sigma) + 1)
+        g = np.exp(-k ** 2 / (2 * sigma ** 2))
+        g /= g.sum()
+        disc = np.apply_along_axis(np.convolve, 0, disc, g, mode="same")
+        disc = np.apply_along_axis(np.convolve, 1, disc, g, mode="same")
+    return np.clip(disc, 0.0, 1.0)
+
+
+def heat_tiles(lat, lon, weight, zoom: int, radius: int, blur: int, max_value: float, palette) -> dict:
+    """Render heat points as {(x, y): PNG} 256 px tiles at `zoom`, skipping empty tiles.
+
+    Follows leaflet.heat: points are merged per cell of (radius + blur) / 2 px
+    into their weighted mean, each cell stamps heat_kernel() with an opacity of
+    its weight over `max_value`, and the stamps' combined opacity picks the
+    palette color. Cells sit on a global pixel grid so tiles join seamlessly.
+    """
+    r2 = radius + blur
+    size = 2 * r2
+    xy = tile_pixels(np.column_stack([lat, lon]), zoom) * (256 / NETWORK_TILE_EXTENT)
+    w = np.asarray(weight, dtype=float) / 2 ** max(0, min(HEAT_MAX_ZOOM - zoom, 12))
+    _, cell = np.unique(np.floor(xy / (r2 / 2)).astype(np.int64), axis=0, return_inverse=True)
+    cell = cell.ravel()
+    total = np.bincount(cell, weights=w)
+    cx = np.round(np.bincount(cell, weights=w * xy[:, 0]) / total).astype(np.int64) - r2
+    cy = np.round(np.bincount(cell, weights=w * xy[:, 1]) / total).astype(np.int64) - r2
+    alpha = np.clip(np.minimum(total, max_value) / max_value, RASTER_HEAT_MIN_OPACITY, 1.0)
+
+    # log(1 - opacity * kernel) per 8-bit opacity, as a canvas stores globalAlpha
+    opacity = np.round(alpha * 255).astype(int)
+    kernel = heat_kernel(radius, blur)
+    log_clear = np.log1p(-np.minimum(np.arange(256)[:, None, None] / 255 * kernel, 1.0 - 1e-9))
+    # Each stamp covers at most 2 x 2 tiles; list every (tile, stamp) pair once
+    pairs = set()
+    for dx in (0, size - 1):
+        for dy in (0, size - 1):
+            pairs.update(zip((cx + dx) // 256, (cy + dy) // 256, range(len(cx))))
+    by_tile = {}
+    for tx, ty, i in pairs:
+        by_tile.setdefault((int(tx), int(ty)), []).append(i)
+
+    # RGBA per 8-bit combined opacity: the palette color with that alpha, transparent at 0
+    rgba_lut = np.column_stack([palette, np.arange(256)]).astype(np.uint8)
+    rgba_lut[0] = 0
+    rgba_lut = rgba_lut.view(np.uint32).ravel()
+    width = 256 + 2 * size  # tile plus a stamp-wide margin on each side
+    tiles = {}
+    for (tx, ty), stamps in by_tile.items():
+        # Combined opacity 1 - prod(1 - opacity * kernel), summed as logs
+        acc = np.zeros((width, width))
+        for i in stamps:
+            x, y = cx[i] - tx * 256 + size, cy[i] - ty * 256 + size
+            acc[y:y + size, x:x + size] += log_clear[opacity[i]]
+        a = np.round((1.0 - np.exp(acc[size:size + 256, size:size + 256])) * 255).astype(np.uint8)
+        if not a.any():
+            continue
+        tiles[(tx, ty)] = encode_png(rgba_lut[a].view(np.uint8).reshape(256, 256, 4))
+    return tiles
+
+
+def tile_lonlat(x, y, zoom: int):
+    """Global 256 px Web Mercator pixel coordinates at `zoom` to (lon, lat) degrees."""
+    scale = 256 * 2 ** zoom
+    lon = np.asarray(x) / scale * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * np.asarray(y) / scale))))
+    return lon, lat
+
+
+def greenhouse_grid_tiles(cells: pd.DataFrame, zoom: int) -> dict:
+    """Render the greenhouse grid cells as {(x, y): PNG} 256 px tiles at `zoom`.
+
+    Pixels take the color of the EPSG:3035 cell holding their center. Centers
+    are reprojected exactly every GREENHOUSE_GRID_SAMPLE px and interpolated
+    in between.
+    """
+    cell_size = float((cells["x_max_m"] - cells["x_min_m"]).iloc[0])
+    x0, y0 = cells["x_min_m"].min(), cells["y_min_m"].min()
+    ix = np.round((cells["x_min_m"].to_numpy() - x0) / cell_size).astype(int)
+    iy = np.round((cells["y_min_m"].to_numpy() - y0) / cell_size).astype(int)
+    lookup = np.full((iy.max() + 1, ix.max() + 1), -1)
+    lookup[iy, ix] = np.arange(len(cells))
+    colors = np.array([css_rgb(c) + (round(GREENHOUSE_GRID_OPACITY * 255),) for c in cells["color"]], dtype=np.uint8)
+
+    # Tiles touched by each cell, from its reprojected corners
+    corners_x = np.concatenate([cells["x_min_m"], cells["x_max_m"], cells["x_min_m"], cells["x_max_m"]])
+    corners_y = np.concatenate([cells["y_min_m"], cells["y_min_m"], cells["y_max_m"], cells["y_max_m"]])
+    lon, lat = get_transformer("EPSG:3035", "EPSG:4326").transform(corners_x, corners_y)
+    px = tile_pixels(np.column_stack([lat, lon]), zoom).reshape(4, len(cells), 2) // NETWORK_TILE_EXTENT
+    lo, hi = px.min(axis=0).astype(int), px.max(axis=0).astype(int)
+    tile_keys = {(tx, ty) for (lo_x, lo_y), (hi_x, hi_y) in zip(lo, hi)
+                 for tx in range(lo_x, hi_x + 1) for ty in range(lo_y, hi_y + 1)}
+
+    to_laea = get_transformer("EPSG:4326", "EPSG:3035")
+    step = GREENHOUSE_GRID_SAMPLE
+    samples = np.arange(0, 257, step)
+    u = (np.arange(256) + 0.5) / step
+    i0 = np.minimum(u.astype(int), len(samples) - 2)
+    f = u - i0
+    tiles = {}
+    for tx, ty in sorted(tile_keys):
+        lon, lat = tile_lonlat(tx * 256 + samples[None, :], ty * 256 + samples[:, None], zoom)
+        gx, gy = to_laea.transform(*np.broadcast_arrays(lon, lat))
+        # Bilinear interpolation of the samples at every pixel center (rows, then columns)
+        gx = gx[i0] * (1 - f)[:, None] + gx[i0 + 1] * f[:, None]
+        gy = gy[i0] * (1 - f)[:, None] + gy[i0 + 1] * f[:, None]
+        gx = gx[:, i0] * (1 - f) + gx[:, i0 + 1] * f
+        gy = gy[:, i0] * (1 - f) + gy[:, i0 + 1] * f
+        cx = np.floor((gx - x0) / cell_size).astype(int)
+        cy = np.floor((gy - y0) / cell_size).astype(int)
+        inside = (cx >= 0) & (cx < lookup.shape[1]) & (cy >= 0) & (cy < lookup.shape[0])
+        idx = np.full(cx.shape, -1)
+        idx[inside] = lookup[cy[inside], cx[inside]]
+        if not (idx >= 0).any():
+            continue
+        rgba = np.zeros((256, 256, 4), dtype=np.uint8)
+        rgba[idx >= 0] = colors[idx[idx >= 0]]
+        tiles[(tx, ty)] = encode_png(rgba)
+    return tiles
+
+
+def tiles_bounds(keys, zoom: int) -> list:
+    """[[south, west], [north, east]] covering the (x, y) tiles at `zoom`."""
+    xs, ys = zip(*keys)
+    west, north = tile_lonlat(min(xs) * 256, min(ys) * 256, zoom)
+    east, south = tile_lonlat((max(xs) + 1) * 256, (max(ys) + 1) * 256, zoom)
+    return [[round(float(south), 4), round(float(west), 4)], [round(float(north), 4), round(float(east), 4)]]
+
+
+def raster_tile_files(site_columns: dict, greenhouse_cells, heat_radius: int, heat_blur: int):
+    """Render the site heatmaps and greenhouse grid into {relative path: PNG} and their layer manifest.
+
+    Paths are `<layer>/<z>/<x>/<y>.png`; the manifest gives each layer with
+    tiles its [first, last] zoom and bounds. Heat tiles use every matching
+    site, like the page's heatmaps before any techno filter is selected.
+    """
+    files, layers = {}, {}
+    lat = pd.to_numeric(pd.Series(site_columns["lat"]), errors="coerce").to_numpy(dtype=float)
+    lon = pd.to_numeric(pd.Series(site_columns["lon"]), errors="coerce").to_numpy(dtype=float)
+    located = np.isfinite(lat) & np.isfinite(lon)
+    pyramids = {}
+    for name, heat in HEATMAP_DEFS.items():
+        rows = located.copy()
+        for key, values in heat["match"].items():
+            rows &= np.isin(site_columns[key], values)
+        if not rows.any():
+            continue
+        radius = round(heat_radius * heat.get("radius_scale", 1))
+        blur = round(heat_blur * heat.get("blur_scale", 1))
+        weight = np.full(int(rows.sum()), heat.get("weight", 1), dtype=float)
+        palette = gradient_palette(HEAT_GRADIENTS[heat["gradient"]])
+        pyramids[name] = {z: heat_tiles(lat[rows], lon[rows], weight, z, radius, blur, heat.get("max", 1.0), palette)
+                          for z in RASTER_HEAT_ZOOMS}
+    if greenhouse_cells is not None and len(greenhouse_cells):
+        pyramids["greenhouse_grid"] = {z: greenhouse_grid_tiles(greenhouse_cells, z) for z in RASTER_GRID_ZOOMS}
+    for name, pyramid in pyramids.items():
+        zooms = sorted(z for z, tiles in pyramid.items() if tiles)
+        if not zooms:
+            continue
+        for z in zooms:
+            for (x, y), png in pyramid[z].items():
+                files[f"{name}/{z}/{x}/{y}.png"] = png
+        # The lowest zoom's tiles cover the heat's widest spread
+        layers[name] = {"zooms": [zooms[0], zooms[-1]], "bounds": tiles_bounds(pyramid[zooms[0]], zooms[0])}
+    return files, layers
+
+
+# Precompressed outputs for static hosting
+PRECOMPRESS_MANIFEST = ".precompressed.json"
+PRECOMPRESS_MIN_BYTES = 1024  # smaller files gain nothing from compression
+
+
+def compress_output(path: Path) -> list:
+    """Write `<path>.gz` and, when brotli is available, `<path>.br`; return the written paths.
+
+    Without brotli any existing `.br` is removed rather than left stale.
+    """
+    data = path.read_bytes()
+    gz_path = path.with_name(path.name + ".gz")
+    br_path = path.with_name(path.name + ".br")
+    gz_path.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is None:
+        br_path.unlink(missing_ok=True)
+        return [gz_path]
+    br_path.write_bytes(brotli.compress(data, quality=11))
+    return [gz_path, br_path]
+
+
+def remove_precompressed(paths) -> int:
+    """Delete the `.gz`/`.br` variants of `paths` and return how many there were.
+
+    Hosts serve a variant in place of its file, so variants must not outlive
+    the content they were compressed from.
+    """
+    removed = 0
+    for path in map(Path, paths):
+        for ext in (".gz", ".br"):
+            variant = path.with_name(path.name + ext)
+            if variant.exists():
+                variant.unlink()
+                removed += 1
+    return removed
+
+
+def precompress_outputs(paths, max_workers=None) -> None:
+    """Compress output files in a thread pool, skipping files whose content hash is unchanged.
+
+    The hash of the content last compressed is kept in PRECOMPRESS_MANIFEST
+    in the directory of the first path, keyed by path relative to it. Files
+    under PRECOMPRESS_MIN_BYTES are left uncompressed, and variants of them
+    left by an earlier build are removed.
+    """
+    paths = [Path(p) for p in paths]
+    if not paths:
+        return
+    base = paths[0].parent
+    manifest_path = base / PRECOMPRESS_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    manifest = {key: digest for key, digest in manifest.items() if (base / key).exists()}
+
+    def manifest_key(path):
+        return path.relative_to(base).as_posix() if path.is_relative_to(base) else path.name
+
+    def is_current(path, digest):
+        variants = [".gz"] + ([".br"] if brotli is not None else [])
+        return manifest.get(manifest_key(path)) == digest and all(
+            path.with_name(path.name + ext).exists() for ext in variants
+        )
+
+    small = [path for path in paths if path.stat().st_size < PRECOMPRESS_MIN_BYTES]
+    paths = [path for path in paths if path.stat().st_size >= PRECOMPRESS_MIN_BYTES]
+    remove_precompressed(small)
+    for path in small:
+        manifest.pop(manifest_key(path), None)
+    digests = {path: hashlib.sha256(path.read_bytes()).hexdigest() for path in paths}
+    todo = [path for path in paths if not is_current(path, digests[path])]
+    raw_size, packed_size = 0, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for path, written in zip(todo, pool.map(compress_output, todo)):
+            manifest[manifest_key(path)] = digests[path]
+            raw_size += path.stat().st_size
+            for w in written:
+                packed_size[w.suffix] = packed_size.get(w.suffix, 0) + w.stat().st_size
+    sizes = ", ".join(f"{ext} {size / 1e6:.2f} MB" for ext, size in packed_size.items())
+    print(f"Precompressed {len(todo)} file(s) ({raw_size / 1e6:.2f} MB -> {sizes or 'nothing'}), "
+          f"{len(paths) - len(todo)} unchanged, {len(small)} under {PRECOMPRESS_MIN_BYTES} bytes skipped")
+    if brotli is None:
+        print("Warning: brotli is not installed; wrote .gz only")
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+
+
 ### >>> OPPORTUNITY HEATMAP ADDITION <<<
+def as_weighted_points(points) -> np.ndarray:
+    """Return points as a float array of shape (N, 3) holding lat, lon, weight."""
+    arr = np.asarray(points, dtype=float)
+    return arr.reshape(-1, 3)
+
+
+def bin_points(points: np.ndarray, min_lat: float, min_lon: float, grid_size: float, shape) -> np.ndarray:
+    """Sum point weights into a (n_lat, n_lon) grid anchored at (min_lat, min_lon).
+
+    Points falling outside the grid are dropped. Weights are accumulated with
+    `np.bincount` over flattened cell indices, so the work stays in NumPy
+    regardless of the number of points.
+    """
+    n_lat, n_lon = shape
+    if len(points) == 0 or n_lat <= 0 or n_lon <= 0:
+        return np.zeros((max(n_lat, 0), max(n_lon, 0)))
+    # Truncate toward zero like int() so cell assignment matches a scalar loop
+    lat_idx = np.trunc((points[:, 0] - min_lat) / grid_size)
+    lon_idx = np.trunc((points[:, 1] - min_lon) / grid_size)
+    inside = (lat_idx >= 0) & (lat_idx < n_lat) & (lon_idx >= 0) & (lon_idx < n_lon)
+    flat = lat_idx[inside].astype(np.intp) * n_lon + lon_idx[inside].astype(np.intp)
+    grid = np.bincount(flat, weights=points[inside, 2], minlength=n_lat * n_lon)
+    return grid.reshape(n_lat, n_lon)
+
+
 def compute_opportunity_points(supply_points, offtake_points, competitors_points):
     """
     Compute opportunity heatmap points based on supply + offtake - competitors density.
     
     Args:
-        supply_points: List of [lat, lon, weight] for supply sites
-        offtake_points: List of [lat, lon, weight] for offtake sites
-        competitors_points: List of [lat, lon, weight] for competitor sites
+        supply_points: Array of shape (N, 3) with lat, lon, weight for supply sites
+        offtake_points: Array of shape (N, 3) with lat, lon, weight for offtake sites
+        competitors_points: Array of shape (N, 3) with lat, lon, weight for competitor sites
     
     Returns:
         List of [lat_center, lon_center, value] for non-zero opportunity cells
     """
-    if not supply_points and not offtake_points:
+    supply_points = as_weighted_points(supply_points)
+    offtake_points = as_weighted_points(offtake_points)
+    competitors_points = as_weighted_points(competitors_points)
+    if len(supply_points) == 0 and len(offtake_points) == 0:
         return []
     
     # Grid resolution: ~0.15 degrees (~15 km at mid-latitudes) - denser grid for more detail
     GRID_SIZE = 0.15
     
     # Combine all points to determine bounds
-    all_points = supply_points + offtake_points + competitors_points
-    if not all_points:
-        return []
+    all_points = np.concatenate([supply_points, offtake_points, competitors_points])
     
-    lats = [p[0] for p in all_points]
-    lons = [p[1] for p in all_points]
-    min_lat, max_lat = min(lats), max(lats)
-    min_lon, max_lon = min(lons), max(lons)
+    min_lat, max_lat = float(all_points[:, 0].min()), float(all_points[:, 0].max())
+    min_lon, max_lon = float(all_points[:, 1].min()), float(all_points[:, 1].max())
     
     # Add padding
     min_lat -= GRID_SIZE
@@ -138,24 +1601,12 @@ def compute_opportunity_points(supply_points, offtake_points, competitors_points
     # Create grid
     lat_bins = np.arange(min_lat, max_lat + GRID_SIZE, GRID_SIZE)
     lon_bins = np.arange(min_lon, max_lon + GRID_SIZE, GRID_SIZE)
+    shape = (len(lat_bins) - 1, len(lon_bins) - 1)
     
-    # Initialize density grids
-    supply_grid = np.zeros((len(lat_bins)-1, len(lon_bins)-1))
-    offtake_grid = np.zeros((len(lat_bins)-1, len(lon_bins)-1))
-    competitors_grid = np.zeros((len(lat_bins)-1, len(lon_bins)-1))
-    
-    # Helper to bin points into grid
-    def bin_points(points, grid):
-        for lat, lon, weight in points:
-            lat_idx = int((lat - min_lat) / GRID_SIZE)
-            lon_idx = int((lon - min_lon) / GRID_SIZE)
-            if 0 <= lat_idx < grid.shape[0] and 0 <= lon_idx < grid.shape[1]:
-                grid[lat_idx, lon_idx] += weight
-    
-    # Bin all point sets
-    bin_points(supply_points, supply_grid)
-    bin_points(offtake_points, offtake_grid)
-    bin_points(competitors_points, competitors_grid)
+    # Bin all point sets into density grids
+    supply_grid = bin_points(supply_points, min_lat, min_lon, GRID_SIZE, shape)
+    offtake_grid = bin_points(offtake_points, min_lat, min_lon, GRID_SIZE, shape)
+    competitors_grid = bin_points(competitors_points, min_lat, min_lon, GRID_SIZE, shape)
     
     # Normalize each grid to 0-1 range
     def normalize_grid(grid):
@@ -212,16 +1663,13 @@ def compute_opportunity_points(supply_points, offtake_points, competitors_points
     # --- END FINAL BOOST ---
     # >>> END CONTRAST ENHANCEMENT <<<
     
-    # Convert to list of [lat, lon, value] for non-zero cells
-    result = []
-    for i in range(opportunity_grid.shape[0]):
-        for j in range(opportunity_grid.shape[1]):
-            value = opportunity_grid[i, j]
-            if value > 0:
-                # Cell center coordinates
-                lat_center = min_lat + (i + 0.5) * GRID_SIZE
-                lon_center = min_lon + (j + 0.5) * GRID_SIZE
-                result.append([lat_center, lon_center, float(value)])
+    # Convert to list of [lat, lon, value] for non-zero cells (row-major order)
+    rows, cols = np.nonzero(opportunity_grid > 0)
+    result = np.column_stack([
+        min_lat + (rows + 0.5) * GRID_SIZE,  # Cell center coordinates
+        min_lon + (cols + 0.5) * GRID_SIZE,
+        opportunity_grid[rows, cols],
+    ]).tolist()
     
     return result
 ### <<< END OPPORTUNITY HEATMAP ADDITION <<<
@@ -232,10 +1680,6 @@ def build_html(
     color_map,
     layer_category_map,
     bounds,
-    biogaz_points,
-    biomethane_points,
-    feedstock_points,  # >>> NEW FEEDSTOCK HEATMAP <<<
-    papeterie_points,  # >>> NEW PAPETERIE HEATMAP <<<
     supply_points,
     offtake_points,
     competitors_points,
@@ -249,14 +1693,28 @@ def build_html(
     heat_radius: int,
     heat_blur: int,
     ors_api_key: str = "",
+    marker_renderer: str = "canvas",
+    site_clusters: dict | None = None,
+    search_index: dict | None = None,
+    network_files: dict | None = None,
+    network_tiles: dict | None = None,
+    raster_tiles: dict | None = None,
+    site_tiles: dict | None = None,
 ) -> str:
     (min_lat, min_lon, max_lat, max_lon) = bounds
+    # Network layers listed in network_files are fetched from those sidecars and
+    # with network_tiles all of them come from the tile pyramid; the rest are inlined
+    network_files = network_files or {}
+    inline = [] if network_tiles else [name for name in NETWORK_CONSTANTS if name not in network_files]
+    network_data = dict.fromkeys(NETWORK_CONSTANTS, "null")
+    network_data.update(network_payloads(grid_nodes, grid_edges, gas_pipelines, inline))
+    site_payload = json.dumps(site_data, separators=(",", ":"))
     # Visibility predicate JS based on mode
     vis_logic = {
-        "both": "const show = technoOk && statusOk;",
-        "techno": "const show = technoOk;",
-        "status": "const show = statusOk;",
-        "either": "const show = technoOk || statusOk;",
+        "both": "const show = technoOk[w] & statusOk[w];",
+        "techno": "const show = technoOk[w];",
+        "status": "const show = statusOk[w];",
+        "either": "const show = technoOk[w] | statusOk[w];",
     }[visibility_mode]
 
     html = f"""<!DOCTYPE html>
@@ -335,6 +1793,8 @@ def build_html(
   #operator-search:focus {{ border-color: #1a73e8; box-shadow: 0 0 8px rgba(66, 133, 244, 0.3); }}
   #search-results-info {{ margin-top: 6px; font-size: 12px; color: #1967d2; font-weight: 500; min-height: 18px; }}
   .search-highlight {{ animation: pulse 0.5s ease-in-out; }}
+  /* Precomputed site cluster (DivIcon) */
+  .site-cluster {{ display:flex; align-items:center; justify-content:center; width:100%; height:100%; border-radius:50%; border:3px solid #333; background:rgba(255,255,255,0.85); box-sizing:border-box; font:600 11px/1 sans-serif; color:#222; cursor:pointer; }}
   @keyframes pulse {{ 0%, 100% {{ transform: scale(1); }} 50% {{ transform: scale(1.15); }} }}
   /* Demand sector diamond marker (DivIcon) */
   .diamond-wrap {{ position: relative; width: 16px; height: 16px; }}
@@ -392,7 +1852,7 @@ def build_html(
   
   <!-- Search Bar -->
   <div class="search-container">
-    <input type="text" id="operator-search" placeholder="🔍 Search by operator name..." autocomplete="off">
+    <input type="text" id="operator-search" placeholder="🔍 Search operator, municipality, project..." autocomplete="off">
     <div id="search-results-info"></div>
   </div>
   
@@ -661,7 +2121,7 @@ def build_html(
   <div class="divider"></div>
 
   <div class="counter"><span id="visible-count">0</span> site(s) visible</div>
-  <div class="note">Tip: Visibility rule = <b>{visibility_mode}</b>. Heatmaps are independent overlays.</div>
+  <div class="note">Tip: Visibility rule = <b>{visibility_mode}</b>. Heatmaps follow the techno and status filters; while no techno is selected they show every site.</div>
   </div>
 </div>
 
@@ -669,15 +2129,572 @@ def build_html(
   integrity="sha256-20nQCchB9co0qIjJZRGuk2/Z9VM+kNiyxNV1lvTlZBo=" crossorigin=""></script>
 <script src="https://unpkg.com/leaflet.heat@0.2.0/dist/leaflet-heat.js"></script>
 <script>
-  const SITES = {json.dumps(site_data)};
+  const SITE_COLUMNS = {site_payload};
+  // With --site-data tiles, the site tiles (see site_tile_files): SITE_COLUMNS then only holds
+  // the column types and shared dictionaries, and each tile's rows arrive when it is fetched
+  const SITE_TILES = {json.dumps(site_tiles, separators=(",", ":"))};
+  // Site rows are stored in chunks of consecutive sites: all of SITE_COLUMNS inline, one per
+  // merged site tile. A chunk's dictionary columns use the shared dictionary of SITE_COLUMNS
+  // unless they carry their own "values"; "none" rows are relative to the chunk's start.
+  const siteChunks = [];
+  function siteChunk(start, count, columns) {{
+    const get = {{}};  // column -> row in chunk -> field value
+    Object.entries(columns).forEach(([name, col]) => {{
+      const type = SITE_COLUMNS.columns[name].type;
+      if (type === 'dict') {{
+        const values = (col.values || SITE_COLUMNS.columns[name].values).map(v => v === null ? NaN : v);
+        const codes = col.codes;
+        get[name] = k => values[codes[k]];
+      }} else if (type === 'coord') {{
+        const scale = SITE_COLUMNS.columns[name].scale;
+        get[name] = k => (col.values[k] ?? NaN) / scale;
+      }} else if (type === 'float32') {{
+        const none = new Set(col.none || []);
+        get[name] = k => none.has(k) ? null : (col.values[k] ?? NaN);
+      }} else {{
+        get[name] = k => col.values[k] === 1;
+      }}
+    }});
+    const chunk = {{ start, count, columns, get }};
+    siteChunks.push(chunk);
+    return chunk;
+  }}
+  // Each SITES entry is a row view whose fields are decoded from its chunk on access
+  const siteProto = {{}};
+  Object.keys(SITE_COLUMNS.columns).forEach(name => {{
+    Object.defineProperty(siteProto, name, {{
+      get() {{ return this._chunk.get[name](this._i - this._chunk.start); }},
+      enumerable: true,
+    }});
+  }});
+  const siteRow = (chunk, i) => Object.create(siteProto, {{ _i: {{ value: i }}, _chunk: {{ value: chunk }} }});
+  // Tiled sites get their row view when their tile is merged; SITES has holes until then
+  const inlineChunk = SITE_TILES ? null : siteChunk(0, SITE_COLUMNS.n, SITE_COLUMNS.columns);
+  const SITES = SITE_TILES ? new Array(SITE_COLUMNS.n) : Array.from({{ length: SITE_COLUMNS.n }}, (_, i) => siteRow(inlineChunk, i));
+
+  // Facet index for the filters: one bitset per techno, status and capacity bucket
+  // (bit i of word i >>> 5 is site i), filled from the dictionary-coded columns
+  const SITE_WORDS = (SITE_COLUMNS.n + 31) >>> 5;
+  const FACET_NAMES = ['techno', 'status', 'capacity_bucket'];
+  const facetSets = {{}};  // facet -> bitset per dictionary code
+  const FACETS = {{}};  // facet -> value -> bitset
+  FACET_NAMES.forEach(name => {{
+    const col = SITE_COLUMNS.columns[name];
+    facetSets[name] = col.values.map(() => new Uint32Array(SITE_WORDS));
+    FACETS[name] = new Map(col.values.map((v, k) => [v, facetSets[name][k]]));
+  }});
+
+  // Set the facet bits of the sites of a chunk: every site at load, or a merged site tile
+  function addFacetSites(chunk) {{
+    FACET_NAMES.forEach(name => {{
+      const codes = chunk.columns[name].codes;
+      const sets = facetSets[name];
+      for (let k = 0; k < chunk.count; k++) {{
+        const i = chunk.start + k;
+        sets[codes[k]][i >>> 5] |= 1 << (i & 31);
+      }}
+    }});
+  }}
+  if (!SITE_TILES) addFacetSites(inlineChunk);
+
+  // Union of the bitsets of `values` in `facet`; values without sites are skipped
+  function facetUnion(facet, values) {{
+    const out = new Uint32Array(SITE_WORDS);
+    values.forEach(v => {{
+      const bits = facet.get(v);
+      if (!bits) return;
+      for (let w = 0; w < SITE_WORDS; w++) out[w] |= bits[w];
+    }});
+    return out;
+  }}
   const TECHNO_COLORS = {json.dumps(color_map)};
   const LAYER_CATEGORY_MAP = {json.dumps(layer_category_map)};
   const OPPORTUNITY_POINTS = {json.dumps(opportunity_points or [])};  // >>> OPPORTUNITY HEATMAP ADDITION <<<
-  const GRID_NODES = {json.dumps(grid_nodes or [])};  // >>> ELECTRICITY NETWORK ADDITION <<<
-  const GRID_EDGES = {json.dumps(grid_edges or [])};  // >>> ELECTRICITY NETWORK ADDITION <<<
-  const GAS_PIPELINES = {json.dumps(gas_pipelines or [])};  // >>> GAS NETWORK ADDITION <<<
-  const FEEDSTOCK_HEAT = {json.dumps(feedstock_points or [])};  // >>> NEW FEEDSTOCK HEATMAP <<<
-  const PAPETERIE_HEAT = {json.dumps(papeterie_points or [])};  // >>> NEW PAPETERIE HEATMAP <<<
+  let GRID_NODES = {network_data['GRID_NODES']};  // >>> ELECTRICITY NETWORK ADDITION <<<
+  let GRID_EDGES = {network_data['GRID_EDGES']};  // >>> ELECTRICITY NETWORK ADDITION <<<
+  let GAS_PIPELINES = {network_data['GAS_PIPELINES']};  // >>> GAS NETWORK ADDITION <<<
+  const NETWORK_FILES = {json.dumps(network_files)};  // sidecar file per network constant left null above
+  const NETWORK_TILES = {json.dumps(network_tiles)};  // tile pyramid location when built with --network-data tiles
+  const RASTER_TILES = {json.dumps(raster_tiles)};  // PNG heat/greenhouse pyramids when built with --raster-tiles
+  const GAS_LEVEL_ZOOMS = {json.dumps(GAS_LEVEL_ZOOMS)};  // >>> GAS NETWORK ADDITION <<<
+
+  // Fetch a file once, read it with `read(response)` and share the pending/settled result;
+  // failed requests can be retried, and forgetFile() drops a result that is no longer needed
+  const fileRequests = {{}};
+  function fetchOnce(url, read) {{
+    if (!fileRequests[url]) {{
+      fileRequests[url] = fetch(url)
+        .then(response => {{
+          if (!response.ok) throw new Error(`HTTP ${{response.status}} for ${{url}}`);
+          return read(response);
+        }})
+        .catch(error => {{
+          delete fileRequests[url];
+          throw error;
+        }});
+    }}
+    return fileRequests[url];
+  }}
+
+  function forgetFile(url) {{
+    delete fileRequests[url];
+  }}
+
+  function fetchJsonOnce(url) {{
+    return fetchOnce(url, response => response.json());
+  }}
+
+  // A binary file of pack_binary (--data-format binary), passed once through `decode`
+  function fetchBinaryOnce(url, decode = unpackBinary) {{
+    return fetchOnce(url, response => response.arrayBuffer().then(decode));
+  }}
+
+  // The JSON header of a pack_binary buffer, with "columns" mapped to typed-array views of the
+  // columns themselves (no copy; the columns are little-endian like every browser platform).
+  // Files without a column table are read with the `layout` of binaryLayout.
+  const BINARY_TYPES = {{ float32: Float32Array, int32: Int32Array, uint8: Uint8Array }};
+  function unpackBinary(buffer, layout = null) {{
+    const headerLength = new DataView(buffer).getUint32(0, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)));
+    const start = Math.ceil((4 + headerLength) / 4) * 4;
+    const columns = {{}};
+    Object.entries(layout || header.columns).forEach(([name, col]) => {{
+      columns[name] = new BINARY_TYPES[col.type](buffer, start + col.offset, col.length);
+    }});
+    return {{ ...header, columns }};
+  }}
+
+  // Column table of [name, type] columns of `length` rows each, laid out as pack_binary does
+  function binaryLayout(columns, length) {{
+    const layout = {{}};
+    let offset = 0;
+    columns.forEach(([name, type]) => {{
+      offset = Math.ceil(offset / 4) * 4;
+      layout[name] = {{ type, offset, length }};
+      offset += length * BINARY_TYPES[type].BYTES_PER_ELEMENT;
+    }});
+    return layout;
+  }}
+
+  // Binary network sidecars as the layers use them: grid tables get their columns as fields,
+  // gas pipelines get lat/lon/levels views over their own vertices
+  function decodeNetworkBinary(name, {{ columns, ...header }}) {{
+    if (name !== 'GAS_PIPELINES') return {{ ...header, ...columns }};
+    const {{ lat, lon, levels, offsets }} = columns;
+    return header.pipelines.map((pipeline, i) => {{
+      const [start, end] = [offsets[i], offsets[i + 1]];
+      return {{ ...pipeline, lat: lat.subarray(start, end), lon: lon.subarray(start, end), levels: levels.subarray(start, end) }};
+    }});
+  }}
+
+  // Resolve a network dataset: inlined data as-is, otherwise fetch its sidecar once and reuse it
+  function loadNetworkData(name, current) {{
+    if (current !== null) return Promise.resolve(current);
+    console.log(`📥 Fetching ${{name}} from ${{NETWORK_FILES[name]}}...`);
+    if (NETWORK_FILES[name].endsWith('.bin')) {{
+      return fetchBinaryOnce(NETWORK_FILES[name], buffer => decodeNetworkBinary(name, unpackBinary(buffer)));
+    }}
+    return fetchJsonOnce(NETWORK_FILES[name]);
+  }}
+
+  function networkTileUrl(path) {{
+    return `${{NETWORK_TILES.url}}${{path}}.json?v=${{NETWORK_TILES.version}}`;
+  }}
+
+  // Overlay of a prerendered PNG pyramid, scaled outside its zooms up to `maxZoom` (hidden
+  // above it); tiles without data were never written, so missing tiles stay transparent
+  function rasterTileLayer(name, maxZoom = undefined) {{
+    const layer = RASTER_TILES.layers[name];
+    return L.tileLayer(`${{RASTER_TILES.url}}${{name}}/{{z}}/{{x}}/{{y}}.png?v=${{RASTER_TILES.version}}`, {{
+      minNativeZoom: layer.zooms[0],
+      maxNativeZoom: layer.zooms[1],
+      maxZoom: maxZoom,
+      bounds: layer.bounds,
+      errorTileUrl: 'data:image/gif;base64,R0lGODlhAQABAAAAACH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=='
+    }});
+  }}
+
+  // Tile-local integer coordinates to [lat, lon]
+  function tileLatLng(z, x, y, extent, lx, ly) {{
+    const n = 2 ** z;
+    const lon = (x + lx / extent) / n * 360 - 180;
+    const lat = Math.atan(Math.sinh(Math.PI * (1 - 2 * (y + ly / extent) / n))) * 180 / Math.PI;
+    return [lat, lon];
+  }}
+
+  // [lat, lon] to Web Mercator world units (0..1 across the world at any zoom; as tileLatLng at z 0)
+  function mercatorUnits(lat, lon) {{
+    const r = Math.max(-85.0511, Math.min(85.0511, lat)) * Math.PI / 180;
+    return [(lon + 180) / 360, (1 - Math.log(Math.tan(r) + 1 / Math.cos(r)) / Math.PI) / 2];
+  }}
+  
+  // Polyline [[lat, lon], ...] as flat world units [x0, y0, x1, y1, ...]
+  function mercatorLine(latlngs) {{
+    const coords = new Float64Array(latlngs.length * 2);
+    latlngs.forEach(([lat, lon], i) => {{
+      [coords[2 * i], coords[2 * i + 1]] = mercatorUnits(lat, lon);
+    }});
+    return coords;
+  }}
+  
+  // Network lines and nodes drawn on one canvas. Features sharing a style object form a batch
+  // that is stroked (nodes: filled and stroked) as a single path, so a redraw costs one canvas
+  // call per style instead of one per feature. Coordinates are world units, scaled to the view
+  // on each redraw. Clicks are hit-tested against a grid of world-unit cells holding the
+  // features crossing them; the nearest feature within NETWORK_HIT_TOLERANCE pixels of its
+  // stroke opens its popup. Features can carry an owner (a network tile, a pipeline) so tiles
+  // are dropped together with removeOwner(). Hover is only hit-tested from
+  // NETWORK_HOVER_MIN_ZOOM, where the cells within reach of the pointer stay few.
+  const NETWORK_HIT_TOLERANCE = 4;
+  const NETWORK_INDEX_CELLS = 4096;  // index cells across the world (~10 km at the equator)
+  const NETWORK_HOVER_MIN_ZOOM = 6;
+  const networkCanvases = new Set();  // layers on the map, hit-tested together
+  
+  function lineBounds(coords) {{
+    let minX = Infinity, minY = Infinity, maxX = -Infinity, maxY = -Infinity;
+    for (let i = 0; i < coords.length; i += 2) {{
+      minX = Math.min(minX, coords[i]);
+      maxX = Math.max(maxX, coords[i]);
+      minY = Math.min(minY, coords[i + 1]);
+      maxY = Math.max(maxY, coords[i + 1]);
+    }}
+    return [minX, minY, maxX, maxY];
+  }}
+  
+  const NetworkCanvas = L.Layer.extend({{
+    initialize() {{
+      this._lines = new Map();  // style -> line features
+      this._nodes = new Map();  // style -> node features
+      this._owners = new Map();  // owner -> its features
+      this._index = null;  // cell -> features, built on the first hit test after a change
+      this._frame = null;
+    }},
+    
+    addLine(coords, style, popup, owner) {{
+      const feature = {{ coords, bounds: lineBounds(coords), style, popup, owner }};
+      if (!this._lines.has(style)) this._lines.set(style, []);
+      this._lines.get(style).push(feature);
+      this._own(feature);
+      return feature;
+    }},
+    
+    addNode(x, y, style, popup, owner) {{
+      const feature = {{ x, y, style, popup, owner }};
+      if (!this._nodes.has(style)) this._nodes.set(style, []);
+      this._nodes.get(style).push(feature);
+      this._own(feature);
+      return feature;
+    }},
+    
+    setLineCoords(feature, coords) {{
+      feature.coords = coords;
+      feature.bounds = lineBounds(coords);
+      this._index = null;
+    }},
+    
+    eachLine(fn) {{
+      this._lines.forEach(features => features.forEach(fn));
+    }},
+    
+    _own(feature) {{
+      if (feature.owner !== undefined) {{
+        if (!this._owners.has(feature.owner)) this._owners.set(feature.owner, []);
+        this._owners.get(feature.owner).push(feature);
+      }}
+      this._index = null;
+    }},
+    
+    // Only the batches holding the owner's features are filtered, each once
+    removeOwner(owner) {{
+      const owned = this._owners.get(owner);
+      if (!owned) return;
+      this._owners.delete(owner);
+      const doomed = new Map();  // batch map -> styles to filter
+      owned.forEach(f => {{
+        const batches = f.coords === undefined ? this._nodes : this._lines;
+        if (!doomed.has(batches)) doomed.set(batches, new Set());
+        doomed.get(batches).add(f.style);
+      }});
+      const gone = new Set(owned);
+      doomed.forEach((styles, batches) => styles.forEach(style => {{
+        const kept = batches.get(style).filter(f => !gone.has(f));
+        if (kept.length) batches.set(style, kept);
+        else batches.delete(style);
+      }}));
+      this._index = null;
+    }},
+    
+    // Redraw on the next frame; changes made meanwhile share it
+    redraw() {{
+      if (this._map && !this._frame) {{
+        this._frame = requestAnimationFrame(() => {{
+          this._frame = null;
+          if (this._map) this._draw();
+        }});
+      }}
+      return this;
+    }},
+    
+    onAdd(map) {{
+      if (!this._canvas) {{
+        this._canvas = L.DomUtil.create('canvas', 'leaflet-layer leaflet-zoom-animated');
+        this._canvas.style.pointerEvents = 'none';
+      }}
+      map.getPane('overlayPane').appendChild(this._canvas);
+      map.on('moveend', this._reset, this);
+      map.on('zoomanim', this._animateZoom, this);
+      if (!networkCanvases.size) map.on('click', onNetworkClick).on('mousemove', onNetworkHover);
+      networkCanvases.add(this);
+      this._reset();
+    }},
+    
+    onRemove(map) {{
+      L.DomUtil.remove(this._canvas);
+      map.off('moveend', this._reset, this);
+      map.off('zoomanim', this._animateZoom, this);
+      networkCanvases.delete(this);
+      if (!networkCanvases.size) {{
+        map.off('click', onNetworkClick).off('mousemove', onNetworkHover);
+        map.getContainer().style.cursor = '';
+      }}
+    }},
+    
+    // Cover the viewport again; also ends a zoom animation
+    _reset() {{
+      const map = this._map;
+      const size = map.getSize();
+      const ratio = window.devicePixelRatio || 1;
+      L.DomUtil.setPosition(this._canvas, map.containerPointToLayerPoint([0, 0]));
+      this._canvas.width = size.x * ratio;
+      this._canvas.height = size.y * ratio;
+      this._canvas.style.width = `${{size.x}}px`;
+      this._canvas.style.height = `${{size.y}}px`;
+      this._bounds = map.getBounds();
+      this._origin = map.getPixelBounds().min;  // world pixel of the canvas' top-left corner
+      this._scale = 256 * 2 ** map.getZoom();  // world pixels per world unit
+      this._draw();
+    }},
+    
+    _animateZoom(e) {{
+      const scale = this._map.getZoomScale(e.zoom);
+      const offset = this._map._latLngBoundsToNewLayerBounds(this._bounds, e.zoom, e.center).min;
+      L.DomUtil.setTransform(this._canvas, offset, scale);
+    }},
+    
+    _draw() {{
+      const ctx = this._canvas.getContext('2d');
+      const ratio = window.devicePixelRatio || 1;
+      const scale = this._scale;
+      const ox = this._origin.x;
+      const oy = this._origin.y;
+      const margin = 10 / scale;
+      const x0 = ox / scale - margin;
+      const y0 = oy / scale - margin;
+      const x1 = (ox + this._canvas.width / ratio) / scale + margin;
+      const y1 = (oy + this._canvas.height / ratio) / scale + margin;
+      ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+      ctx.clearRect(0, 0, this._canvas.width / ratio, this._canvas.height / ratio);
+      ctx.lineCap = 'round';
+      ctx.lineJoin = 'round';
+      
+      this._lines.forEach((features, style) => {{
+        ctx.beginPath();
+        features.forEach(({{ coords, bounds }}) => {{
+          if (bounds[2] < x0 || bounds[0] > x1 || bounds[3] < y0 || bounds[1] > y1) return;
+          ctx.moveTo(coords[0] * scale - ox, coords[1] * scale - oy);
+          for (let i = 2; i < coords.length; i += 2) ctx.lineTo(coords[i] * scale - ox, coords[i + 1] * scale - oy);
+        }});
+        ctx.setLineDash(style.dashArray || []);
+        ctx.globalAlpha = style.opacity;
+        ctx.strokeStyle = style.color;
+        ctx.lineWidth = style.weight;
+        ctx.stroke();
+      }});
+      
+      ctx.setLineDash([]);
+      this._nodes.forEach((features, style) => {{
+        ctx.beginPath();
+        features.forEach(({{ x, y }}) => {{
+          if (x < x0 || x > x1 || y < y0 || y > y1) return;
+          const px = x * scale - ox;
+          const py = y * scale - oy;
+          ctx.moveTo(px + style.radius, py);
+          ctx.arc(px, py, style.radius, 0, 2 * Math.PI);
+        }});
+        ctx.globalAlpha = style.fillOpacity;
+        ctx.fillStyle = style.fillColor;
+        ctx.fill();
+        ctx.globalAlpha = 1;
+        ctx.strokeStyle = style.color;
+        ctx.lineWidth = style.weight;
+        ctx.stroke();
+      }});
+      ctx.globalAlpha = 1;
+    }},
+    
+    // Lines go in every cell their segments pass through (sampled every half cell), nodes in
+    // their own cell
+    _buildIndex() {{
+      const index = new Map();
+      const put = (cell, feature) => {{
+        if (!index.has(cell)) index.set(cell, []);
+        index.get(cell).push(feature);
+      }};
+      const cellOf = (x, y) => Math.floor(y * NETWORK_INDEX_CELLS) * NETWORK_INDEX_CELLS + Math.floor(x * NETWORK_INDEX_CELLS);
+      this.eachLine(feature => {{
+        const c = feature.coords;
+        const cells = new Set();
+        for (let i = 0; i + 2 < c.length; i += 2) {{
+          const steps = Math.ceil(Math.max(Math.abs(c[i + 2] - c[i]), Math.abs(c[i + 3] - c[i + 1])) * NETWORK_INDEX_CELLS * 2);
+          for (let k = 0; k <= steps; k++) {{
+            const t = steps ? k / steps : 0;
+            cells.add(cellOf(c[i] + (c[i + 2] - c[i]) * t, c[i + 1] + (c[i + 3] - c[i + 1]) * t));
+          }}
+        }}
+        cells.forEach(cell => put(cell, feature));
+      }});
+      this._nodes.forEach(features => features.forEach(feature => put(cellOf(feature.x, feature.y), feature)));
+      return index;
+    }},
+    
+    // Nearest feature to world point (x, y) within its hit distance, as {{ feature, distance }}
+    // in pixels from its stroke; nodes (drawn on top) win over lines
+    _hit(x, y) {{
+      if (!this._index) this._index = this._buildIndex();
+      const scale = this._scale;
+      const reach = Math.ceil((NETWORK_HIT_TOLERANCE + 8) / scale * NETWORK_INDEX_CELLS) + 1;
+      const cx = Math.floor(x * NETWORK_INDEX_CELLS);
+      const cy = Math.floor(y * NETWORK_INDEX_CELLS);
+      let best = null;
+      const seen = new Set();
+      const test = features => features.forEach(feature => {{
+        if (seen.has(feature)) return;
+        seen.add(feature);
+        const node = feature.coords === undefined;
+        const d = node ? Math.hypot(feature.x - x, feature.y - y) * scale - feature.style.radius
+          : segmentsDistance(feature.coords, x, y) * scale - feature.style.weight / 2;
+        if (d > NETWORK_HIT_TOLERANCE) return;
+        if (!best || node > best.node || (node === best.node && d < best.distance)) best = {{ feature, node, distance: d }};
+      }});
+      if ((2 * reach + 1) ** 2 > this._index.size) {{
+        // Zoomed out the window spans more cells than are occupied: walk the occupied ones
+        this._index.forEach((features, cell) => {{
+          const j = Math.floor(cell / NETWORK_INDEX_CELLS);
+          const i = cell - j * NETWORK_INDEX_CELLS;
+          if (Math.abs(i - cx) <= reach && Math.abs(j - cy) <= reach) test(features);
+        }});
+        return best;
+      }}
+      for (let j = cy - reach; j <= cy + reach; j++) {{
+        for (let i = cx - reach; i <= cx + reach; i++) {{
+          const features = this._index.get(j * NETWORK_INDEX_CELLS + i);
+          if (features) test(features);
+        }}
+      }}
+      return best;
+    }}
+  }});
+  
+  // Distance from (x, y) to a polyline of flat coordinates
+  function segmentsDistance(c, x, y) {{
+    let best = Infinity;
+    for (let i = 0; i + 2 < c.length; i += 2) {{
+      const dx = c[i + 2] - c[i];
+      const dy = c[i + 3] - c[i + 1];
+      const len2 = dx * dx + dy * dy;
+      const t = len2 ? Math.max(0, Math.min(1, ((x - c[i]) * dx + (y - c[i + 1]) * dy) / len2)) : 0;
+      best = Math.min(best, Math.hypot(c[i] + t * dx - x, c[i + 1] + t * dy - y));
+    }}
+    return best;
+  }}
+  
+  // Best hit over all network canvases on the map for a map mouse event
+  function networkHit(e) {{
+    const p = map.project(e.latlng, map.getZoom());
+    const scale = 256 * 2 ** map.getZoom();
+    let best = null;
+    networkCanvases.forEach(layer => {{
+      const hit = layer._hit(p.x / scale, p.y / scale);
+      if (hit && (!best || hit.node > best.node || (hit.node === best.node && hit.distance < best.distance))) best = hit;
+    }});
+    return best;
+  }}
+  
+  // Map clicks that no site marker took open the popup of the network feature under them
+  function onNetworkClick(e) {{
+    const hit = networkHit(e);
+    if (!hit) return;
+    const {{ feature }} = hit;
+    const latlng = hit.node ? tileLatLng(0, 0, 0, 1, feature.x, feature.y) : e.latlng;
+    L.popup().setLatLng(latlng).setContent(feature.popup).openOn(map);
+  }}
+  
+  function onNetworkHover(e) {{
+    const hit = map.getZoom() >= NETWORK_HOVER_MIN_ZOOM && networkHit(e);
+    map.getContainer().style.cursor = hit ? 'pointer' : '';
+  }}
+  
+  // Network canvas showing the tiles of a dataset that cover the viewport. Tiles come from the
+  // coarsest pyramid zoom not above the map zoom; drawTile(layer, tile, z, x, y, owner) adds
+  // one tile's features to the layer under `owner`.
+  function createTiledNetworkLayer(dataset, index, drawTile) {{
+    const layer = new NetworkCanvas();
+    layer._tiled = true;
+    const available = new Set(index.tiles);
+    const shown = new Map();  // "z/x/y" -> owner token of that tile's features
+    
+    function tileZoom() {{
+      const zoom = map.getZoom();
+      let tileZ = index.zooms[0];
+      index.zooms.forEach(z => {{ if (z <= zoom) tileZ = z; }});
+      return tileZ;
+    }}
+    
+    function update() {{
+      if (!map.hasLayer(layer)) return;
+      const z = tileZoom();
+      const n = 2 ** z;
+      const tileX = lon => Math.floor((lon + 180) / 360 * n);
+      const tileY = lat => Math.floor(mercatorUnits(lat, 0)[1] * n);
+      const b = map.getBounds();
+      const wanted = new Set();
+      for (let x = Math.max(0, tileX(b.getWest())); x <= Math.min(n - 1, tileX(b.getEast())); x++) {{
+        for (let y = Math.max(0, tileY(b.getNorth())); y <= Math.min(n - 1, tileY(b.getSouth())); y++) {{
+          const key = `${{z}}/${{x}}/${{y}}`;
+          if (available.has(key)) wanted.add(key);
+        }}
+      }}
+      
+      // Tiles out of view are dropped with their payload, so memory follows the view
+      shown.forEach((owner, key) => {{
+        if (wanted.has(key)) return;
+        layer.removeOwner(owner);
+        shown.delete(key);
+        forgetFile(networkTileUrl(`${{dataset}}/${{key}}`));
+        layer.redraw();
+      }});
+      wanted.forEach(key => {{
+        if (shown.has(key)) return;
+        const owner = {{ key }};
+        shown.set(key, owner);
+        const [tz, tx, ty] = key.split('/').map(Number);
+        fetchJsonOnce(networkTileUrl(`${{dataset}}/${{key}}`))
+          .then(tile => {{
+            if (shown.get(key) !== owner) return;
+            drawTile(layer, tile, tz, tx, ty, owner);
+            layer.redraw();
+          }})
+          .catch(error => {{
+            console.error(`❌ Could not load ${{dataset}} tile ${{key}}:`, error);
+            if (shown.get(key) === owner) shown.delete(key);
+          }});
+      }});
+    }}
+    
+    layer.on('add', update);
+    map.on('moveend', update);
+    return layer;
+  }}
 
   const map = L.map('map', {{ zoomControl: true }});
   // Use CartoDB Light (light gray background) for a clean, uniform appearance
@@ -689,8 +2706,326 @@ def build_html(
   const bounds = L.latLngBounds([[{min_lat}, {min_lon}], [{max_lat}, {max_lon}]]);
   map.fitBounds(bounds.pad(0.1));
 
-  const markersLayer = L.layerGroup().addTo(map);
-  const allMarkers = [];
+  // Precomputed site clusters (see build_site_clusters), or null when clustering is off
+  const SITE_CLUSTERS = {json.dumps(site_clusters, separators=(",", ":"))};
+  const SITE_CLUSTER_METRICS = {json.dumps(list(SITE_CLUSTER_METRICS))};
+  // clusterOfSite[k][i]: cluster of site i at SITE_CLUSTERS.levels[k], -1 for unclustered sites
+  const clusterOfSite = [];
+  if (SITE_CLUSTERS) {{
+    const levels = SITE_CLUSTERS.levels;
+    clusterOfSite[levels.length - 1] = Int32Array.from(SITE_CLUSTERS.site);
+    for (let k = levels.length - 1; k > 0; k--) {{
+      const parent = levels[k].parent;
+      clusterOfSite[k - 1] = clusterOfSite[k].map(c => (c < 0 ? -1 : parent[c]));
+    }}
+  }}
+
+  // Cluster level drawn at `zoom`, or -1 when every site is drawn on its own
+  function siteClusterLevel(zoom) {{
+    if (!SITE_CLUSTERS || zoom > SITE_CLUSTERS.zooms[SITE_CLUSTERS.zooms.length - 1]) return -1;
+    return Math.max(0, SITE_CLUSTERS.zooms.indexOf(Math.floor(zoom)));
+  }}
+
+  function siteClusterIcon(count, color, totals, category) {{
+    const sz = Math.round(Math.min(48, 24 + 8 * Math.log10(count)));
+    const lines = [`${{count}} sites · ${{category}}`];
+    if (totals.capacity_gwh_year > 0) lines.push(`Capacity: ${{fmt(Math.round(totals.capacity_gwh_year))}} GWh/year`);
+    if (totals.co2_injection_potential_tpy > 0) lines.push(`CO₂: ${{fmt(Math.round(totals.co2_injection_potential_tpy))}} t/y`);
+    const title = lines.join('\\n').replace(/"/g, '&quot;');
+    const html = `<div class="site-cluster" style="border-color:${{color}};" title="${{title}}">${{count}}</div>`;
+    return L.divIcon({{ html: html, className: '', iconSize: [sz, sz], iconAnchor: [sz/2, sz/2] }});
+  }}
+
+  // Spatial grid over SITES: the site indices of each SITE_GRID_DEG degree cell, so the
+  // sites near a view are found without scanning every site
+  const SITE_GRID_DEG = 0.25;
+  const SITE_GRID_COLS = Math.ceil(360 / SITE_GRID_DEG) + 1;
+  const siteGrid = new Map();  // row * SITE_GRID_COLS + col -> site indices
+  function addGridSites(start, end) {{
+    for (let i = start; i < end; i++) {{
+      const s = SITES[i];
+      if (!isFinite(s.lat) || !isFinite(s.lon)) continue;
+      const key = Math.floor((s.lat + 90) / SITE_GRID_DEG) * SITE_GRID_COLS + Math.floor((s.lon + 180) / SITE_GRID_DEG);
+      const cell = siteGrid.get(key);
+      if (cell) cell.push(i);
+      else siteGrid.set(key, [i]);
+    }}
+  }}
+  if (!SITE_TILES) addGridSites(0, SITES.length);
+
+  // Call fn(i) for each site in the grid cells overlapping `bounds` (and so a few just outside)
+  function forEachSiteNear(bounds, fn) {{
+    const r0 = Math.max(0, Math.floor((bounds.getSouth() + 90) / SITE_GRID_DEG));
+    const r1 = Math.floor((Math.min(bounds.getNorth(), 90) + 90) / SITE_GRID_DEG);
+    const c0 = Math.max(0, Math.floor((bounds.getWest() + 180) / SITE_GRID_DEG));
+    const c1 = Math.min(SITE_GRID_COLS - 1, Math.floor((bounds.getEast() + 180) / SITE_GRID_DEG));
+    if ((r1 - r0 + 1) * (c1 - c0 + 1) > siteGrid.size) {{
+      // Wide views: walk the occupied cells rather than every cell of the view
+      siteGrid.forEach((sites, key) => {{
+        const r = Math.floor(key / SITE_GRID_COLS);
+        const c = key % SITE_GRID_COLS;
+        if (r >= r0 && r <= r1 && c >= c0 && c <= c1) sites.forEach(fn);
+      }});
+      return;
+    }}
+    for (let r = r0; r <= r1; r++) {{
+      for (let c = c0; c <= c1; c++) {{
+        const sites = siteGrid.get(r * SITE_GRID_COLS + c);
+        if (sites) sites.forEach(fn);
+      }}
+    }}
+  }}
+
+  // Idle-time callbacks, falling back to a short timeout where requestIdleCallback is missing
+  const requestIdle = window.requestIdleCallback
+    ? cb => requestIdleCallback(cb, {{ timeout: 200 }})
+    : cb => setTimeout(() => cb({{ didTimeout: true, timeRemaining: () => 0 }}), 16);
+  const SITE_MARKER_MIN_CHUNK = 50;  // markers created per idle callback even when out of idle time
+  const SITE_VIEW_PAD = 0.5;  // markers are kept for this fraction of the view around it
+
+  // Markers of the sites drawn on their own, by site index: created by createSiteMarker when
+  // their site is in the padded view and released when it leaves
+  const siteMarkers = new Map();
+
+  // The filtered sites, drawn as site markers and, up to the last cluster zoom, through their
+  // precomputed clusters: filters, search and zoom mode set the member sites, and only members
+  // count towards a cluster, so the filters reshape the clusters without clustering again in
+  // the browser. Membership changes are applied once per animation frame, touching only the
+  // changed sites and their clusters. Site markers are only materialized for the padded view,
+  // in idle-time chunks, so load and filtering cost does not grow with the total site count.
+  const SiteClusterLayer = L.Layer.extend({{
+    initialize() {{
+      this._bits = new Uint32Array(SITE_WORDS);  // members, by site index
+      this._count = 0;
+      this._clusterMarkers = new Map();
+      this._level = null;  // cluster level drawn, null until first drawn
+      this._view = null;  // padded view the markers are culled to
+      this._members = new Map();  // cluster id -> Set of member sites at _level
+      this._clusterShown = new Map();  // cluster id -> cluster marker on the map
+      this._changed = new Set();  // sites added or removed since the last frame
+      this._pending = new Set();  // sites waiting for their marker
+      this._frame = null;
+      this._idle = null;
+    }},
+    onAdd(map) {{
+      map.on('moveend', this._onMove, this);
+      this._rebuild(siteClusterLevel(map.getZoom()));
+    }},
+    onRemove(map) {{
+      map.off('moveend', this._onMove, this);
+      if (this._frame !== null) cancelAnimationFrame(this._frame);
+      this._frame = null;
+      siteMarkers.forEach(m => map.removeLayer(m));
+      siteMarkers.clear();
+      this._pending.clear();
+      this._clusterShown.forEach(m => map.removeLayer(m));
+      this._clusterShown = new Map();
+      this._level = null;
+    }},
+    getLayerCount() {{
+      return this._count;
+    }},
+    getSites() {{
+      return this._bits.slice();
+    }},
+    hasSite(i) {{
+      return (this._bits[i >>> 5] & (1 << (i & 31))) !== 0;
+    }},
+    // Make the sites set in `bits` the members, queueing only the sites that changed
+    setSites(bits) {{
+      for (let w = 0; w < SITE_WORDS; w++) {{
+        let diff = this._bits[w] ^ bits[w];
+        this._bits[w] = bits[w];
+        while (diff) {{
+          const bit = diff & -diff;
+          this._changed.add((w << 5) + 31 - Math.clz32(bit));
+          this._count += bits[w] & bit ? 1 : -1;
+          diff ^= bit;
+        }}
+      }}
+      if (this._map && this._changed.size && this._frame === null) {{
+        this._frame = requestAnimationFrame(() => {{
+          this._frame = null;
+          if (this._map) this._update(false);
+        }});
+      }}
+      return this;
+    }},
+    _forEachSite(fn) {{
+      for (let w = 0; w < SITE_WORDS; w++) {{
+        for (let bits = this._bits[w]; bits; bits &= bits - 1) fn((w << 5) + 31 - Math.clz32(bits & -bits));
+      }}
+    }},
+    _onMove() {{
+      this._update(true);
+    }},
+    _clusterOf(i, level) {{
+      return level < 0 ? -1 : clusterOfSite[level][i];
+    }},
+    // Members drawn as their own marker: unclustered ones and the only member of a cluster
+    _single(i) {{
+      if (!this.hasSite(i)) return false;
+      const c = this._clusterOf(i, this._level);
+      return c < 0 || this._members.get(c).size === 1;
+    }},
+    // Queue the marker of site i or release it, after a membership or view change
+    _syncSite(i) {{
+      const s = SITES[i];
+      if (this._single(i) && this._view.contains([s.lat, s.lon])) {{
+        if (!siteMarkers.has(i) && !this._pending.has(i)) {{
+          this._pending.add(i);
+          if (this._idle === null) this._idle = requestIdle(deadline => this._drain(deadline));
+        }}
+        return;
+      }}
+      this._pending.delete(i);
+      const m = siteMarkers.get(i);
+      if (m) {{
+        siteMarkers.delete(i);
+        this._map.removeLayer(m);
+      }}
+    }},
+    // Create queued markers while the browser is idle, a chunk per callback
+    _drain(deadline) {{
+      this._idle = null;
+      if (!this._map) return;
+      let created = 0;
+      for (const i of this._pending) {{
+        if (created >= SITE_MARKER_MIN_CHUNK && deadline.timeRemaining() < 1) break;
+        this._pending.delete(i);
+        const m = createSiteMarker(i);
+        siteMarkers.set(i, m);
+        this._map.addLayer(m);
+        created++;
+      }}
+      if (this._pending.size) this._idle = requestIdle(deadline => this._drain(deadline));
+    }},
+    // Apply the queued membership changes; `moved` also re-culls to the new view
+    _update(moved) {{
+      const level = siteClusterLevel(this._map.getZoom());
+      if (level !== this._level) {{
+        this._rebuild(level);
+        return;
+      }}
+      const dirty = new Set();
+      const touched = new Set();
+      this._changed.forEach(i => {{
+        touched.add(i);
+        const c = this._clusterOf(i, level);
+        if (c < 0) return;
+        let members = this._members.get(c);
+        if (!members) this._members.set(c, members = new Set());
+        if (this.hasSite(i)) members.add(i);
+        else members.delete(i);
+        dirty.add(c);
+      }});
+      this._changed.clear();
+      if (moved) {{
+        this._view = this._map.getBounds().pad(SITE_VIEW_PAD);
+        this._touchView(touched);
+        this._members.forEach((members, c) => {{ if (members.size > 1) dirty.add(c); }});
+      }}
+      // A cluster going between one and several members swaps its site marker and cluster marker
+      dirty.forEach(c => this._members.get(c).forEach(i => {{
+        if (siteMarkers.has(i) || this._pending.has(i) || this._members.get(c).size === 1) touched.add(i);
+      }}));
+      touched.forEach(i => this._syncSite(i));
+      dirty.forEach(c => this._updateCluster(c));
+    }},
+    // Add the sites whose markers may enter or leave the view to `touched`
+    _touchView(touched) {{
+      siteMarkers.forEach((m, i) => touched.add(i));
+      this._pending.forEach(i => touched.add(i));
+      forEachSiteNear(this._view, i => {{ if (this.hasSite(i)) touched.add(i); }});
+    }},
+    // Regroup every member for a new cluster level, keeping markers that stay on the map
+    _rebuild(level) {{
+      this._level = level;
+      this._view = this._map.getBounds().pad(SITE_VIEW_PAD);
+      this._members = new Map();
+      this._changed.clear();
+      this._forEachSite(i => {{
+        const c = this._clusterOf(i, level);
+        if (c < 0) return;
+        if (this._members.has(c)) this._members.get(c).add(i);
+        else this._members.set(c, new Set([i]));
+      }});
+      const touched = new Set();
+      this._touchView(touched);
+      touched.forEach(i => this._syncSite(i));
+      const previous = this._clusterShown;
+      this._clusterShown = new Map();
+      this._members.forEach((members, c) => {{
+        if (members.size < 2) return;
+        const cluster = this._clusterMarker(level, c, [...members]);
+        if (this._view.contains(cluster.getLatLng())) this._clusterShown.set(c, cluster);
+      }});
+      const shown = new Set(this._clusterShown.values());
+      previous.forEach(m => {{ if (!shown.has(m)) this._map.removeLayer(m); }});
+      const kept = new Set(previous.values());
+      shown.forEach(m => {{ if (!kept.has(m)) this._map.addLayer(m); }});
+    }},
+    _updateCluster(c) {{
+      const members = this._members.get(c);
+      const cluster = members.size > 1 ? this._clusterMarker(this._level, c, [...members]) : null;
+      const layer = cluster && this._view.contains(cluster.getLatLng()) ? cluster : null;
+      const old = this._clusterShown.get(c);
+      if (old !== layer) {{
+        if (old) this._map.removeLayer(old);
+        if (layer) this._map.addLayer(layer);
+      }}
+      if (layer) this._clusterShown.set(c, layer);
+      else this._clusterShown.delete(c);
+      if (members.size === 0) this._members.delete(c);
+    }},
+    _clusterMarker(level, c, list) {{
+      const info = SITE_CLUSTERS.levels[level];
+      const key = level + ':' + c;
+      let marker = this._clusterMarkers.get(key);
+      if (!marker) {{
+        marker = L.marker([info.lat[c], info.lon[c]], {{ zIndexOffset: 300 }});
+        marker.on('click', () => map.fitBounds(L.latLngBounds(marker._members.map(i => [SITES[i].lat, SITES[i].lon])).pad(0.2)));
+        this._clusterMarkers.set(key, marker);
+      }}
+      // A cluster with all its sites uses the precomputed centroid and totals,
+      // a filtered one those of its remaining sites
+      const totals = {{}};
+      let lat = info.lat[c];
+      let lon = info.lon[c];
+      if (list.length === info.count[c]) {{
+        SITE_CLUSTER_METRICS.forEach(k => {{ totals[k] = info[k][c]; }});
+      }} else {{
+        SITE_CLUSTER_METRICS.forEach(k => {{ totals[k] = 0; }});
+        lat = 0;
+        lon = 0;
+        list.forEach(i => {{
+          const s = SITES[i];
+          lat += s.lat;
+          lon += s.lon;
+          SITE_CLUSTER_METRICS.forEach(k => {{
+            const v = s[k];
+            if (typeof v === 'number' && !isNaN(v)) totals[k] += v;
+          }});
+        }});
+        lat /= list.length;
+        lon /= list.length;
+      }}
+      // Colored after the most common techno among its sites
+      const colorCounts = new Map();
+      list.forEach(i => colorCounts.set(SITES[i].color, (colorCounts.get(SITES[i].color) || 0) + 1));
+      const color = [...colorCounts].reduce((a, b) => (b[1] > a[1] ? b : a))[0];
+      const signature = [list.length, color, lat, lon].join('|');
+      if (marker._signature !== signature) {{
+        marker._signature = signature;
+        marker.setLatLng([lat, lon]);
+        marker.setIcon(siteClusterIcon(list.length, color, totals, SITES[list[0]].category));
+      }}
+      marker._members = list;
+      return marker;
+    }}
+  }});
+
+  const markersLayer = new SiteClusterLayer().addTo(map);
 
   function fmt(v) {{
     if (v === null || v === undefined || (typeof v === 'number' && isNaN(v))) return 'N/A';
@@ -698,6 +3033,25 @@ def build_html(
     return String(v);
   }}
 
+  // Popup content built when the popup opens rather than when its layer is created. The last
+  // POPUP_CACHE_SIZE popups built are cached, least recently opened evicted first (a Map keeps
+  // insertion order, so reinserting on use makes its first key the oldest).
+  const POPUP_CACHE_SIZE = 200;
+  const popupCache = new Map();
+  function lazyPopup(key, build) {{
+    return () => {{
+      let html = popupCache.get(key);
+      if (html === undefined) {{
+        html = build();
+        if (popupCache.size >= POPUP_CACHE_SIZE) popupCache.delete(popupCache.keys().next().value);
+      }} else {{
+        popupCache.delete(key);
+      }}
+      popupCache.set(key, html);
+      return html;
+    }};
+  }}
+
   function makePopup(p) {{
     const rows = [
       ['Municipality', p.municipality],
@@ -739,74 +3093,162 @@ def build_html(
       .join('');
   }}
 
+  // Site marker renderer: 'canvas' draws every site on one shared canvas (with hit-testing for
+  // popups); 'dom' creates one SVG path or divIcon element per site
+  const MARKER_RENDERER = {json.dumps(marker_renderer)};
+  
+  // Canvas renderer that also draws star, diamond and square site markers and the Eiffel glow
+  const SiteCanvas = L.Canvas.extend({{
+    _updateShapeMarker(layer) {{
+      if (!this._drawing || layer._empty()) return;
+      const p = layer._point;
+      const r = layer._radius;
+      const ctx = this._ctx;
+      const shape = layer.options.shape;
+      ctx.beginPath();
+      if (shape === 'star') {{
+        for (let i = 0; i < 10; i++) {{
+          const a = -Math.PI / 2 + i * Math.PI / 5;
+          const d = i % 2 === 0 ? r : r * 0.382;
+          ctx.lineTo(p.x + d * Math.cos(a), p.y + d * Math.sin(a));
+        }}
+      }} else if (shape === 'diamond') {{
+        ctx.moveTo(p.x, p.y - r);
+        ctx.lineTo(p.x + r, p.y);
+        ctx.lineTo(p.x, p.y + r);
+        ctx.lineTo(p.x - r, p.y);
+      }} else {{  // square; r is the half-diagonal
+        const h = r / Math.SQRT2;
+        ctx.rect(p.x - h, p.y - h, 2 * h, 2 * h);
+      }}
+      ctx.closePath();
+      if (layer.options.glow) {{
+        ctx.save();
+        ctx.shadowColor = layer.options.glow;
+        ctx.shadowBlur = 6;
+      }}
+      this._fillStroke(ctx, layer);
+      if (layer.options.glow) ctx.restore();
+    }}
+  }});
+  const siteRenderer = MARKER_RENDERER === 'canvas' ? new SiteCanvas({{ padding: 0.5 }}) : null;
+  
+  // Circle marker drawn as options.shape by SiteCanvas. The radius reaches the shape's outer
+  // vertices so hit-testing and redraw bounds cover it. Circles go to the back of the canvas,
+  // as they sit below the divIcon markers in the DOM path.
+  const ShapeMarker = L.CircleMarker.extend({{
+    onAdd(map) {{
+      L.CircleMarker.prototype.onAdd.call(this, map);
+      if (this.options.shape === 'circle') this.bringToBack();
+    }},
+    _updatePath() {{
+      if (this.options.shape === 'circle') this._renderer._updateCircle(this);
+      else this._renderer._updateShapeMarker(this);
+    }}
+  }});
+  
+  // Size and style per shape, matching the divIcon markers of the DOM path (sz is the icon size)
+  const CANVAS_SHAPES = {{
+    star: {{ radius: sz => sz * 0.45, style: {{ stroke: false, fillOpacity: 1 }} }},
+    diamond: {{ radius: sz => sz / Math.SQRT2, style: {{ weight: 2, opacity: 0.8, fillOpacity: 0.8 }} }},
+    square: {{ radius: sz => sz / Math.SQRT2, style: {{ weight: 2, opacity: 0.85, fillOpacity: 0.85 }} }}
+  }};
+  
+  function makeCanvasShapeMarker(shape, lat, lon, color, sz, popupContent, props) {{
+    const options = Object.assign({{
+      renderer: siteRenderer,
+      shape: shape,
+      radius: CANVAS_SHAPES[shape].radius(sz),
+      color: color,
+      fillColor: color
+    }}, CANVAS_SHAPES[shape].style);
+    const mk = new ShapeMarker([lat, lon], options).bindPopup(popupContent);
+    mk._props = props;
+    return mk;
+  }}
+  
+  function makeCircleMarker(lat, lon, color, radius, popupContent) {{
+    const options = {{
+      radius: radius,
+      color: color,
+      weight: 2,
+      fillColor: color,
+      fillOpacity: 0.7
+    }};
+    if (siteRenderer) {{
+      return new ShapeMarker([lat, lon], Object.assign({{ renderer: siteRenderer, shape: 'circle' }}, options)).bindPopup(popupContent);
+    }}
+    return L.circleMarker([lat, lon], options).bindPopup(popupContent);
+  }}
+
   // Create markers (hidden initially). Circles for gas, triangles for efuels, diamonds for demand sectors.
-  function makeDiamondMarker(lat, lon, color, sizePx, popupHtml, props) {{
+  function makeDiamondMarker(lat, lon, color, sizePx, popupContent, props) {{
     const sz = Math.max(10, Math.round((sizePx || 10) * 2));
+    if (siteRenderer) return makeCanvasShapeMarker('diamond', lat, lon, color, sz, popupContent, props);
     const html = `<div class="diamond-wrap" style="width:${{sz}}px;height:${{sz}}px;">
       <div class="diamond" style="background:${{color}}; border-color:${{color}};"></div>
     </div>`;
     const icon = L.divIcon({{ html: html, className: '', iconSize: [sz, sz], iconAnchor: [sz/2, sz/2] }});
-    const mk = L.marker([lat, lon], {{ icon: icon, zIndexOffset: 200 }}).bindPopup(popupHtml);
+    const mk = L.marker([lat, lon], {{ icon: icon, zIndexOffset: 200 }}).bindPopup(popupContent);
     mk._props = props;
     return mk;
   }}
 
-  function makeStarMarker(lat, lon, color, sizePx, popupHtml, props) {{
+  function makeStarMarker(lat, lon, color, sizePx, popupContent, props) {{
     const sz = Math.max(12, Math.round((sizePx || 10) * 2));
+    if (siteRenderer) return makeCanvasShapeMarker('star', lat, lon, color, sz, popupContent, props);
     const html = `<div style="width:${{sz}}px;height:${{sz}}px;display:flex;align-items:center;justify-content:center;">
       <span style="color:${{color}};font-size:${{sz}}px;line-height:1;">★</span>
     </div>`;
     const icon = L.divIcon({{ html: html, className: '', iconSize: [sz, sz], iconAnchor: [sz/2, sz/2] }});
-    const mk = L.marker([lat, lon], {{ icon: icon, zIndexOffset: 150 }}).bindPopup(popupHtml);
+    const mk = L.marker([lat, lon], {{ icon: icon, zIndexOffset: 150 }}).bindPopup(popupContent);
     mk._props = props;
     return mk;
   }}
 
-  function makeSquareMarker(lat, lon, color, sizePx, popupHtml, props) {{
+  function makeSquareMarker(lat, lon, color, sizePx, popupContent, props) {{
     const sz = Math.max(10, Math.round((sizePx || 10) * 2));
+    if (siteRenderer) return makeCanvasShapeMarker('square', lat, lon, color, sz, popupContent, props);
     const html = `<div style="width:${{sz}}px;height:${{sz}}px;background:${{color}};border:2px solid ${{color}};opacity:0.85;"></div>`;
     const icon = L.divIcon({{ html: html, className: '', iconSize: [sz, sz], iconAnchor: [sz/2, sz/2] }});
-    const mk = L.marker([lat, lon], {{ icon: icon, zIndexOffset: 100 }}).bindPopup(popupHtml);
+    const mk = L.marker([lat, lon], {{ icon: icon, zIndexOffset: 100 }}).bindPopup(popupContent);
     mk._props = props;
     return mk;
   }}
 
-  SITES.forEach(s => {{
+  // Marker of site i (see SiteClusterLayer)
+  function createSiteMarker(i) {{
+    const s = SITES[i];
     // Different shapes per layer: Circle for Supply, Star for Offtake, Diamond for Competitors
     let m;
     const radius = s.radius || 10;
     const color = s.color || '#000';
+    const popup = lazyPopup(s, () => makePopup(s));
     
     if (s.layer === 'Supply') {{
       // Circle marker for Supply
-      m = L.circleMarker([s.lat, s.lon], {{
-        radius: radius,
-        color: color,
-        weight: 2,
-        fillColor: color,
-        fillOpacity: 0.7
-      }}).bindPopup(makePopup(s));
+      m = makeCircleMarker(s.lat, s.lon, color, radius, popup);
     }} else if (s.layer === 'Offtake') {{
       // Star marker for Offtake
-      m = makeStarMarker(s.lat, s.lon, color, radius, makePopup(s), s);
+      m = makeStarMarker(s.lat, s.lon, color, radius, popup, s);
     }} else if (s.layer === 'Competitors') {{
       // Diamond marker for Competitors
-      m = makeDiamondMarker(s.lat, s.lon, color, radius, makePopup(s), s);
+      m = makeDiamondMarker(s.lat, s.lon, color, radius, popup, s);
     }} else {{
       // Default to circle for unknown layers
-      m = L.circleMarker([s.lat, s.lon], {{
-        radius: radius,
-        color: color,
-        weight: 2,
-        fillColor: color,
-        fillOpacity: 0.7
-      }}).bindPopup(makePopup(s));
+      m = makeCircleMarker(s.lat, s.lon, color, radius, popup);
     }}
     
     m._props = s;
+    m._siteIndex = i;
     m._originalStyle = {{ color: color, fillColor: color }};
-    allMarkers.push(m);
-  }});
+    m.on('click', (e) => enterZoomMode(s, e.latlng, m));
+    m.on('add', () => {{
+      if (eiffelHighlightActive && s.is_eiffel) setEiffelHighlight(m, true);
+      flashSearchHighlight(i, m);
+    }});
+    return m;
+  }}
 
   // Build Techno & Legend (grouped by Layer and Category)
   const layerContainers = {{
@@ -925,7 +3367,7 @@ def build_html(
 
   // Status filters
   const statusWrap = document.getElementById('status-filters');
-  const allStatuses = Array.from(new Set(SITES.map(s => s.status))).filter(Boolean);
+  const allStatuses = SITE_COLUMNS.columns.status.values.filter(Boolean);
   const preselectStatus = {"true" if preselect_status_all else "false"};
   allStatuses.forEach((s, i) => {{
     const row = document.createElement('label');
@@ -968,34 +3410,36 @@ def build_html(
   let gridLayerGroup = null;
   let gridVisible = false;
   
-  // Helper function to extract voltage from symbol string
-  function extractVoltage(symbol) {{
-    const match = symbol.match(/(\d+)-(\d+)\s*kV/i) || symbol.match(/(\d+)\s*kV/i);
-    if (match) {{
-      return parseInt(match[1]);
-    }}
-    // Check for specific high voltage patterns
-    if (symbol.includes('380') || symbol.includes('400') || symbol.includes('500') || symbol.includes('700')) {{
-      return 400; // High voltage
+  // Line style by voltage class (GRID_EDGES.voltage_class): green <380kV, orange ≥380kV
+  const GRID_EDGE_STYLES = [
+    {{ color: '#4CAF50', weight: 1.5, opacity: 0.7 }},
+    {{ color: '#FF6B00', weight: 2, opacity: 0.7 }}
+  ];
+  
+  // One node style object per color and size, so all nodes looking alike share a batch
+  const gridNodeStyles = new Map();
+  function gridNodeStyle(color, size) {{
+    const key = `${{color}}|${{size}}`;
+    if (!gridNodeStyles.has(key)) {{
+      gridNodeStyles.set(key, {{ radius: size, color, fillColor: color, fillOpacity: 0.8, opacity: 1, weight: 1 }});
     }}
-    return 150; // Default to medium voltage
+    return gridNodeStyles.get(key);
   }}
   
-  // Color scheme for nodes based on type
-  function getNodeColor(symbol) {{
-    if (symbol.includes('Hydro')) return '#2196F3';  // Blue for hydro
-    if (symbol.includes('Wind')) return '#006660';   // Cyan for wind
-    if (symbol.includes('Solar')) return '#FF69B4';  // Pink for solar
-    if (symbol.includes('Nuclear')) return '#9C27B0'; // Purple for nuclear
-    if (symbol.includes('Thermal') || symbol.includes('Gas') || symbol.includes('Coal')) return '#F44336'; // Red for thermal
-    if (symbol.includes('Substation')) return '#FF9800'; // Orange for substations
-    return '#9E9E9E'; // Gray for other/unknown
+  function gridEdgePopup(symbol, voltage) {{
+    return lazyPopup(`edge|${{symbol}}|${{voltage}}`, () => `<b>Transmission Line</b><br>${{symbol}}<br><b>Voltage:</b> ${{voltage}} kV`);
+  }}
+  
+  function gridNodePopup(symbol, lat, lon) {{
+    return lazyPopup(`node|${{symbol}}|${{lat}}|${{lon}}`, () => `<b>${{symbol}}</b><br>Lat: ${{lat.toFixed(4)}}, Lon: ${{lon.toFixed(4)}}`);
   }}
   
   function createGridLayer() {{
     try {{
-      console.log(`🔧 Creating grid layer with ${{GRID_NODES.length}} nodes and ${{GRID_EDGES.length}} edges...`);
-      const layerGroup = L.layerGroup();
+      const nNodes = GRID_NODES.lat.length;
+      const nEdges = GRID_EDGES.start_lat.length;
+      console.log(`🔧 Creating grid layer with ${{nNodes}} nodes and ${{nEdges}} edges...`);
+      const layer = new NetworkCanvas();
       
       // Statistics for legend
       const stats = {{
@@ -1004,86 +3448,109 @@ def build_html(
         nodeTypes: {{}}
       }};
       
-      // Add edges (transmission lines)
+      // Add edges (transmission lines); voltage and class come precomputed per distinct symbol
       let edgeCount = 0;
-      GRID_EDGES.forEach(edge => {{
+      for (let i = 0; i < nEdges; i++) {{
         try {{
-          const voltage = extractVoltage(edge.symbol);
-          const isHighVoltage = voltage >= 380;
+          const code = GRID_EDGES.symbol[i];
+          const voltageClass = GRID_EDGES.voltage_class[code];
           
-          // Color based on voltage: green <380kV, orange ≥380kV
-          const lineColor = isHighVoltage ? '#FF6B00' : '#4CAF50';
-          const lineWeight = isHighVoltage ? 2 : 1.5;
-          
-          if (isHighVoltage) stats.highVoltage++;
+          if (voltageClass) stats.highVoltage++;
           else stats.lowVoltage++;
           
-          const line = L.polyline(
-            [[edge.start_lat, edge.start_lon], [edge.end_lat, edge.end_lon]],
-            {{
-              color: lineColor,
-              weight: lineWeight,
-              opacity: 0.7,
-              interactive: true
-            }}
+          layer.addLine(
+            mercatorLine([[GRID_EDGES.start_lat[i], GRID_EDGES.start_lon[i]], [GRID_EDGES.end_lat[i], GRID_EDGES.end_lon[i]]]),
+            GRID_EDGE_STYLES[voltageClass],
+            gridEdgePopup(GRID_EDGES.symbols[code], GRID_EDGES.voltages[code])
           );
-          line.bindPopup(`<b>Transmission Line</b><br>${{edge.symbol}}<br><b>Voltage:</b> ${{voltage}} kV`);
-          layerGroup.addLayer(line);
           edgeCount++;
         }} catch (err) {{
-          console.error('Error creating edge:', err, edge);
+          console.error('Error creating edge:', err, i);
         }}
-      }});
+      }}
       console.log(`✅ Added ${{edgeCount}} transmission lines (${{stats.highVoltage}} high voltage, ${{stats.lowVoltage}} medium/low voltage)`);
       
+      // Node style per distinct symbol
+      const nodeStyles = GRID_NODES.symbols.map((_, code) => gridNodeStyle(GRID_NODES.colors[code], GRID_NODES.sizes[code]));
+      
       // Add nodes (substations, power plants)
       let nodeCount = 0;
-      GRID_NODES.forEach(node => {{
+      for (let i = 0; i < nNodes; i++) {{
         try {{
-          const nodeColor = getNodeColor(node.symbol);
-          const nodeSize = node.symbol.includes('Hydro') || node.symbol.includes('Nuclear') ? 5 : 3;
+          const code = GRID_NODES.symbol[i];
+          const symbol = GRID_NODES.symbols[code];
+          const lat = GRID_NODES.lat[i];
+          const lon = GRID_NODES.lon[i];
           
           // Track node types for legend
-          if (!stats.nodeTypes[node.symbol]) {{
-            stats.nodeTypes[node.symbol] = 0;
+          if (!stats.nodeTypes[symbol]) {{
+            stats.nodeTypes[symbol] = 0;
           }}
-          stats.nodeTypes[node.symbol]++;
+          stats.nodeTypes[symbol]++;
           
-          const marker = L.circleMarker([node.lat, node.lon], {{
-            radius: nodeSize,
-            color: nodeColor,
-            fillColor: nodeColor,
-            fillOpacity: 0.8,
-            weight: 1
-          }});
-          marker.bindPopup(`<b>${{node.symbol}}</b><br>Lat: ${{node.lat.toFixed(4)}}, Lon: ${{node.lon.toFixed(4)}}`);
-          layerGroup.addLayer(marker);
+          const [x, y] = mercatorUnits(lat, lon);
+          layer.addNode(x, y, nodeStyles[code], gridNodePopup(symbol, lat, lon));
           nodeCount++;
         }} catch (err) {{
-          console.error('Error creating node:', err, node);
+          console.error('Error creating node:', err, i);
         }}
-      }});
+      }}
       console.log(`✅ Added ${{nodeCount}} nodes`);
       
       console.log(`✅ Grid layer created successfully`);
-      return layerGroup;
+      return layer;
     }} catch (error) {{
       console.error('❌ Error in createGridLayer:', error);
       return null;
     }}
   }}
   
+  // Grid layer drawn from the tile pyramid (--network-data tiles)
+  async function createTiledGridLayer() {{
+    const index = await fetchJsonOnce(networkTileUrl('grid/index'));
+    const nodeStyles = index.node_symbols.map((_, code) => gridNodeStyle(index.node_colors[code], index.node_sizes[code]));
+    console.log(`🔧 Creating tiled grid layer (${{index.tiles.length}} tiles)...`);
+    return createTiledNetworkLayer('grid', index, (layer, tile, z, x, y, owner) => {{
+      const n = 2 ** z;
+      const unitX = lx => (x + lx / index.extent) / n;
+      const unitY = ly => (y + ly / index.extent) / n;
+      const edges = tile.edges;
+      for (let i = 0; i < edges.length; i += 5) {{
+        const code = edges[i];
+        const coords = [unitX(edges[i + 1]), unitY(edges[i + 2]), unitX(edges[i + 3]), unitY(edges[i + 4])];
+        const popup = gridEdgePopup(index.edge_symbols[code], index.edge_voltages[code]);
+        layer.addLine(coords, GRID_EDGE_STYLES[index.edge_voltage_class[code]], popup, owner);
+      }}
+      const nodes = tile.nodes;
+      for (let i = 0; i < nodes.length; i += 3) {{
+        const code = nodes[i];
+        const [lat, lon] = tileLatLng(z, x, y, index.extent, nodes[i + 1], nodes[i + 2]);
+        const popup = gridNodePopup(index.node_symbols[code], lat, lon);
+        layer.addNode(unitX(nodes[i + 1]), unitY(nodes[i + 2]), nodeStyles[code], popup, owner);
+      }}
+    }});
+  }}
+  
   const toggleGridCheckbox = document.getElementById('toggle-grid');
   console.log('🔍 Toggle grid checkbox:', toggleGridCheckbox);
   
   if (toggleGridCheckbox) {{
-    toggleGridCheckbox.addEventListener('change', (e) => {{
+    toggleGridCheckbox.addEventListener('change', async (e) => {{
       console.log('🖱️ Grid toggle checkbox changed!');
       gridVisible = e.target.checked;
       
       try {{
         if (gridVisible) {{
-          if (!gridLayerGroup) {{
+          if (!gridLayerGroup && NETWORK_TILES) {{
+            const layer = await createTiledGridLayer();
+            if (!gridVisible || gridLayerGroup) return;  // unticked or toggled again while loading
+            gridLayerGroup = layer;
+          }} else if (!gridLayerGroup) {{
+            [GRID_NODES, GRID_EDGES] = await Promise.all([
+              loadNetworkData('GRID_NODES', GRID_NODES),
+              loadNetworkData('GRID_EDGES', GRID_EDGES)
+            ]);
+            if (!gridVisible || gridLayerGroup) return;  // unticked or toggled again while loading
             console.log('🔌 Creating electricity grid layer...');
             gridLayerGroup = createGridLayer();
             if (!gridLayerGroup) {{
@@ -1095,7 +3562,11 @@ def build_html(
           // Show legend
           const legend = document.getElementById('grid-legend');
           if (legend) legend.style.display = 'block';
-          console.log(`✅ Electricity grid visible (${{GRID_NODES.length}} nodes, ${{GRID_EDGES.length}} edges)`);
+          if (NETWORK_TILES) {{
+            console.log('✅ Electricity grid visible (tiled)');
+          }} else {{
+            console.log(`✅ Electricity grid visible (${{GRID_NODES.lat.length}} nodes, ${{GRID_EDGES.start_lat.length}} edges)`);
+          }}
         }} else {{
           if (gridLayerGroup) {{
             map.removeLayer(gridLayerGroup);
@@ -1137,104 +3608,164 @@ def build_html(
     return 'other';  // cancelled, shelved, mothballed, retired, idle
   }}
   
+  // Simplification level for the current zoom (see GAS_LEVEL_ZOOMS)
+  function currentGasLevel() {{
+    const zoom = map.getZoom();
+    const level = GAS_LEVEL_ZOOMS.findIndex(z => zoom <= z);
+    return level === -1 ? GAS_LEVEL_ZOOMS.length : level;
+  }}
+  
+  // Vertices of a pipeline at a given level, cached per pipeline
+  function gasCoordsForLevel(pipeline, level) {{
+    if (!pipeline.levels || level >= GAS_LEVEL_ZOOMS.length) return pipeline.coordinates;
+    if (!pipeline._byLevel) pipeline._byLevel = [];
+    if (!pipeline._byLevel[level]) {{
+      pipeline._byLevel[level] = pipeline.coordinates.filter((_, i) => pipeline.levels.charCodeAt(i) - 48 <= level);
+    }}
+    return pipeline._byLevel[level];
+  }}
+  
+  // The same vertices in world units, as drawn by NetworkCanvas; pipelines of a binary sidecar
+  // have lat/lon/levels columns instead of coordinates and a levels string
+  function gasUnitsForLevel(pipeline, level) {{
+    if (!pipeline._unitsByLevel) pipeline._unitsByLevel = [];
+    if (!pipeline._unitsByLevel[level]) {{
+      pipeline._unitsByLevel[level] = pipeline.coordinates
+        ? mercatorLine(gasCoordsForLevel(pipeline, level))
+        : mercatorColumns(pipeline.lat, pipeline.lon, i => level >= GAS_LEVEL_ZOOMS.length || pipeline.levels[i] <= level);
+    }}
+    return pipeline._unitsByLevel[level];
+  }}
+
+  // Rows of lat/lon columns passing `keep(i)` as flat world units
+  function mercatorColumns(lat, lon, keep) {{
+    const coords = [];
+    for (let i = 0; i < lat.length; i++) {{
+      if (keep(i)) coords.push(...mercatorUnits(lat[i], lon[i]));
+    }}
+    return Float64Array.from(coords);
+  }}
+  
+  // Swap the drawn geometry of a gas layer to the current zoom level
+  function refreshGasLevel(layer) {{
+    const level = currentGasLevel();
+    if (!layer || layer._tiled || layer._gasLevel === level) return;
+    layer.eachLine(line => layer.setLineCoords(line, gasUnitsForLevel(line.owner, level)));
+    layer._gasLevel = level;
+    layer.redraw();
+  }}
+  
+  map.on('zoomend', () => {{
+    Object.values(gasLayerGroups).forEach(layerGroup => {{
+      if (layerGroup && map.hasLayer(layerGroup)) refreshGasLevel(layerGroup);
+    }});
+  }});
+  
+  // Pipeline line style by status and fuel, one object per combination so lines share batches
+  const gasLineStyles = new Map();
+  function gasLineStyle(statusCategory, fuel) {{
+    const key = `${{statusCategory}}|${{fuel}}`;
+    if (!gasLineStyles.has(key)) {{
+      gasLineStyles.set(key, {{
+        // Use gray color for "other" status, otherwise use fuel-based color
+        color: statusCategory === 'other' ? '#757575' : getGasPipelineColor(fuel),
+        weight: statusCategory === 'operating' ? 2.5 : 2,
+        opacity: statusCategory === 'operating' ? 0.8 : 0.6,
+        dashArray: statusCategory === 'proposed' ? [8, 4] : null
+      }});
+    }}
+    return gasLineStyles.get(key);
+  }}
+
+  function gasPipelinePopup(pipeline) {{
+    let popupContent = `<div style="max-width: 350px;">`;
+    popupContent += `<b style="font-size: 14px; color: #0D47A1;">${{pipeline.name}}</b>`;
+    if (pipeline.segment && pipeline.segment !== 'N/A') {{
+      popupContent += `<br><i style="color: #666;">${{pipeline.segment}}</i>`;
+    }}
+    popupContent += `<hr style="margin: 8px 0; border: none; border-top: 1px solid #ddd;">`;
+    
+    // Status and Fuel
+    popupContent += `<div style="margin: 6px 0;"><b>Status:</b> ${{pipeline.status}}</div>`;
+    popupContent += `<div style="margin: 6px 0;"><b>Fuel Type:</b> ${{pipeline.fuel}}</div>`;
+    
+    // Countries
+    if (pipeline.countries && pipeline.countries !== 'N/A') {{
+      popupContent += `<div style="margin: 6px 0;"><b>Countries:</b> ${{pipeline.countries}}</div>`;
+    }}
+    
+    // Ownership
+    if (pipeline.owner && pipeline.owner !== 'N/A') {{
+      popupContent += `<div style="margin: 6px 0;"><b>Owner:</b> ${{pipeline.owner}}</div>`;
+    }}
+    if (pipeline.parent && pipeline.parent !== 'N/A') {{
+      popupContent += `<div style="margin: 6px 0;"><b>Parent Company:</b> ${{pipeline.parent}}</div>`;
+    }}
+    
+    // Start Year
+    if (pipeline.start_year && pipeline.start_year !== 'N/A') {{
+      popupContent += `<div style="margin: 6px 0;"><b>Start Year:</b> ${{pipeline.start_year}}</div>`;
+    }}
+    
+    // Capacity
+    if (pipeline.capacity && pipeline.capacity !== 'N/A') {{
+      const capacityUnit = pipeline.capacity_units ? ` ${{pipeline.capacity_units}}` : '';
+      popupContent += `<div style="margin: 6px 0;"><b>Capacity:</b> ${{pipeline.capacity}}${{capacityUnit}}</div>`;
+    }}
+    
+    // Length
+    if (pipeline.length && pipeline.length !== 'N/A') {{
+      popupContent += `<div style="margin: 6px 0;"><b>Length:</b> ${{pipeline.length}} km</div>`;
+    }}
+    
+    // Diameter
+    if (pipeline.diameter && pipeline.diameter !== 'N/A') {{
+      const diameterUnit = pipeline.diameter_units ? ` ${{pipeline.diameter_units}}` : '';
+      popupContent += `<div style="margin: 6px 0;"><b>Diameter:</b> ${{pipeline.diameter}}${{diameterUnit}}</div>`;
+    }}
+    
+    // Fuel Source
+    if (pipeline.fuel_source && pipeline.fuel_source !== 'N/A') {{
+      popupContent += `<div style="margin: 6px 0;"><b>Fuel Source:</b> ${{pipeline.fuel_source}}</div>`;
+    }}
+    
+    // Start Location
+    if (pipeline.start_location && pipeline.start_location !== 'N/A') {{
+      let startText = pipeline.start_location;
+      if (pipeline.start_country && pipeline.start_country !== 'N/A') {{
+        startText += ` (${{pipeline.start_country}})`;
+      }}
+      popupContent += `<div style="margin: 6px 0;"><b>Start Location:</b> ${{startText}}</div>`;
+    }}
+    
+    // End Location
+    if (pipeline.end_location && pipeline.end_location !== 'N/A') {{
+      let endText = pipeline.end_location;
+      if (pipeline.end_country && pipeline.end_country !== 'N/A') {{
+        endText += ` (${{pipeline.end_country}})`;
+      }}
+      popupContent += `<div style="margin: 6px 0;"><b>End Location:</b> ${{endText}}</div>`;
+    }}
+    
+    popupContent += `</div>`;
+    
+    return popupContent;
+  }}
+  
   function createGasLayerByStatus(statusCategory) {{
     try {{
       console.log(`🔧 Creating gas network layer for status: ${{statusCategory}}...`);
-      const layerGroup = L.layerGroup();
+      const layer = new NetworkCanvas();
+      const level = currentGasLevel();
+      layer._gasLevel = level;
       
       let pipelineCount = 0;
       GAS_PIPELINES.forEach(pipeline => {{
         try {{
           if (getStatusCategory(pipeline.status) !== statusCategory) return;
           
-          // Use gray color for "other" status, otherwise use fuel-based color
-          const color = statusCategory === 'other' ? '#757575' : getGasPipelineColor(pipeline.fuel);
-          const weight = statusCategory === 'operating' ? 2.5 : 2;
-          const opacity = statusCategory === 'operating' ? 0.8 : 0.6;
-          const dashArray = statusCategory === 'proposed' ? '8, 4' : null;
-          
-          const line = L.polyline(pipeline.coordinates, {{
-            color: color,
-            weight: weight,
-            opacity: opacity,
-            dashArray: dashArray,
-            interactive: true
-          }});
-          
-          // Build popup content
-          let popupContent = `<div style="max-width: 350px;">`;
-          popupContent += `<b style="font-size: 14px; color: #0D47A1;">${{pipeline.name}}</b>`;
-          if (pipeline.segment && pipeline.segment !== 'N/A') {{
-            popupContent += `<br><i style="color: #666;">${{pipeline.segment}}</i>`;
-          }}
-          popupContent += `<hr style="margin: 8px 0; border: none; border-top: 1px solid #ddd;">`;
-          
-          // Status and Fuel
-          popupContent += `<div style="margin: 6px 0;"><b>Status:</b> ${{pipeline.status}}</div>`;
-          popupContent += `<div style="margin: 6px 0;"><b>Fuel Type:</b> ${{pipeline.fuel}}</div>`;
-          
-          // Countries
-          if (pipeline.countries && pipeline.countries !== 'N/A') {{
-            popupContent += `<div style="margin: 6px 0;"><b>Countries:</b> ${{pipeline.countries}}</div>`;
-          }}
-          
-          // Ownership
-          if (pipeline.owner && pipeline.owner !== 'N/A') {{
-            popupContent += `<div style="margin: 6px 0;"><b>Owner:</b> ${{pipeline.owner}}</div>`;
-          }}
-          if (pipeline.parent && pipeline.parent !== 'N/A') {{
-            popupContent += `<div style="margin: 6px 0;"><b>Parent Company:</b> ${{pipeline.parent}}</div>`;
-          }}
-          
-          // Start Year
-          if (pipeline.start_year && pipeline.start_year !== 'N/A') {{
-            popupContent += `<div style="margin: 6px 0;"><b>Start Year:</b> ${{pipeline.start_year}}</div>`;
-          }}
-          
-          // Capacity
-          if (pipeline.capacity && pipeline.capacity !== 'N/A') {{
-            const capacityUnit = pipeline.capacity_units ? ` ${{pipeline.capacity_units}}` : '';
-            popupContent += `<div style="margin: 6px 0;"><b>Capacity:</b> ${{pipeline.capacity}}${{capacityUnit}}</div>`;
-          }}
-          
-          // Length
-          if (pipeline.length && pipeline.length !== 'N/A') {{
-            popupContent += `<div style="margin: 6px 0;"><b>Length:</b> ${{pipeline.length}} km</div>`;
-          }}
-          
-          // Diameter
-          if (pipeline.diameter && pipeline.diameter !== 'N/A') {{
-            const diameterUnit = pipeline.diameter_units ? ` ${{pipeline.diameter_units}}` : '';
-            popupContent += `<div style="margin: 6px 0;"><b>Diameter:</b> ${{pipeline.diameter}}${{diameterUnit}}</div>`;
-          }}
-          
-          // Fuel Source
-          if (pipeline.fuel_source && pipeline.fuel_source !== 'N/A') {{
-            popupContent += `<div style="margin: 6px 0;"><b>Fuel Source:</b> ${{pipeline.fuel_source}}</div>`;
-          }}
-          
-          // Start Location
-          if (pipeline.start_location && pipeline.start_location !== 'N/A') {{
-            let startText = pipeline.start_location;
-            if (pipeline.start_country && pipeline.start_country !== 'N/A') {{
-              startText += ` (${{pipeline.start_country}})`;
-            }}
-            popupContent += `<div style="margin: 6px 0;"><b>Start Location:</b> ${{startText}}</div>`;
-          }}
-          
-          // End Location
-          if (pipeline.end_location && pipeline.end_location !== 'N/A') {{
-            let endText = pipeline.end_location;
-            if (pipeline.end_country && pipeline.end_country !== 'N/A') {{
-              endText += ` (${{pipeline.end_country}})`;
-            }}
-            popupContent += `<div style="margin: 6px 0;"><b>End Location:</b> ${{endText}}</div>`;
-          }}
-          
-          popupContent += `</div>`;
-          
-          line.bindPopup(popupContent);
-          layerGroup.addLayer(line);
+          const popup = lazyPopup(pipeline, () => gasPipelinePopup(pipeline));
+          layer.addLine(gasUnitsForLevel(pipeline, level), gasLineStyle(statusCategory, pipeline.fuel), popup, pipeline);
           pipelineCount++;
         }} catch (err) {{
           console.error('Error creating pipeline:', err, pipeline);
@@ -1242,20 +3773,46 @@ def build_html(
       }});
       console.log(`✅ Added ${{pipelineCount}} gas pipeline segments for ${{statusCategory}}`);
       
-      return layerGroup;
+      return layer;
     }} catch (error) {{
       console.error(`❌ Error in createGasLayerByStatus(${{statusCategory}}):`, error);
       return null;
     }}
   }}
   
-  function toggleGasStatus(statusCategory, checkbox) {{
+  // Gas layer for one status drawn from the tile pyramid (--network-data tiles)
+  async function createTiledGasLayer(statusCategory) {{
+    const index = await fetchJsonOnce(networkTileUrl('gas/index'));
+    console.log(`🔧 Creating tiled gas network layer for status: ${{statusCategory}}...`);
+    return createTiledNetworkLayer('gas', index, (layer, tile, z, x, y, owner) => {{
+      const n = 2 ** z;
+      tile.lines.forEach(line => {{
+        const pipeline = index.pipelines[line[0]];
+        if (getStatusCategory(pipeline.status) !== statusCategory) return;
+        const coords = new Float64Array(line.length - 1);
+        for (let i = 1; i < line.length; i += 2) {{
+          coords[i - 1] = (x + line[i] / index.extent) / n;
+          coords[i] = (y + line[i + 1] / index.extent) / n;
+        }}
+        const popup = lazyPopup(pipeline, () => gasPipelinePopup(pipeline));
+        layer.addLine(coords, gasLineStyle(statusCategory, pipeline.fuel), popup, owner);
+      }});
+    }});
+  }}
+  
+  async function toggleGasStatus(statusCategory, checkbox) {{
     try {{
       const isChecked = checkbox.checked;
       console.log(`🖱️ Gas ${{statusCategory}} toggle: ${{isChecked}}`);
       
       if (isChecked) {{
-        if (!gasLayerGroups[statusCategory]) {{
+        if (!gasLayerGroups[statusCategory] && NETWORK_TILES) {{
+          const layer = await createTiledGasLayer(statusCategory);
+          if (!checkbox.checked || gasLayerGroups[statusCategory]) return;  // unticked or toggled again while loading
+          gasLayerGroups[statusCategory] = layer;
+        }} else if (!gasLayerGroups[statusCategory]) {{
+          GAS_PIPELINES = await loadNetworkData('GAS_PIPELINES', GAS_PIPELINES);
+          if (!checkbox.checked || gasLayerGroups[statusCategory]) return;  // unticked or toggled again while loading
           console.log(`⛽ Creating gas network layer for ${{statusCategory}}...`);
           gasLayerGroups[statusCategory] = createGasLayerByStatus(statusCategory);
           if (!gasLayerGroups[statusCategory]) {{
@@ -1263,6 +3820,7 @@ def build_html(
             return;
           }}
         }}
+        refreshGasLevel(gasLayerGroups[statusCategory]);
         gasLayerGroups[statusCategory].addTo(map);
         console.log(`✅ Gas ${{statusCategory}} pipelines visible`);
       }} else {{
@@ -1317,8 +3875,16 @@ def build_html(
       .map(cb => cb.value);
   }}
 
+  // With --raster-tiles, greenhouse sites passing the filters are shown by the grid overlay
+  // instead of markers; gridSiteCount keeps them in the visible count
+  const GRID_SITE_BITS = RASTER_TILES && RASTER_TILES.layers.greenhouse_grid ? FACETS.techno.get('Greenhouses') || null : null;
+  const greenhouseGridLayer = GRID_SITE_BITS ? rasterTileLayer('greenhouse_grid') : null;
+  let gridSiteCount = 0;
+  let unloadedSiteCount = 0;  // sites of the selected technos in site tiles not fetched yet
+  let siteTilesAllPass = true;  // whether the filters keep every site, fetched or not (site tiles)
+
   function updateVisibleCount() {{
-    document.getElementById('visible-count').textContent = markersLayer.getLayers().length;
+    document.getElementById('visible-count').textContent = markersLayer.getLayerCount() + gridSiteCount + unloadedSiteCount;
   }}
 
   // Toggle collapsible sections
@@ -1354,35 +3920,40 @@ def build_html(
     // Check if all capacity filters are unchecked
     const allCapacityFiltersUnchecked = !capacitySmall && !capacityMedium && !capacityLarge && !capacityNA;
 
-    markersLayer.clearLayers();
+    const technoOk = facetUnion(FACETS.techno, selectedTechnos);
+    // For sites with no status (like Greenhouses), always consider statusOk as true if techno is selected
+    const statusOk = facetUnion(FACETS.status, ['', ...selectedStatuses]);
+    // Apply capacity filter only for Gas technos (bucket ''), and only if at least one capacity filter is checked
+    const capacityBuckets = allCapacityFiltersUnchecked ? null : [
+      '',
+      ...(capacitySmall ? ['small'] : []),
+      ...(capacityMedium ? ['medium'] : []),
+      ...(capacityLarge ? ['large'] : []),
+      ...(capacityNA ? ['na'] : [])
+    ];
+    const capacityOk = capacityBuckets && facetUnion(FACETS.capacity_bucket, capacityBuckets);
 
-    allMarkers.forEach(m => {{
-      const s = m._props;
-      const technoOk = selectedTechnos.length === 0 ? false : selectedTechnos.includes(s.techno);
-      // For sites with no status (like Greenhouses), always consider statusOk as true if techno is selected
-      const statusOk = s.status === '' ? true : (selectedStatuses.length === 0 ? false : selectedStatuses.includes(s.status));
+    const visible = new Uint32Array(SITE_WORDS);
+    for (let w = 0; w < SITE_WORDS; w++) {{
       {vis_logic}
-      
-      // Apply capacity filter only for Gas technos, and only if at least one capacity filter is checked
-      let capacityOk = true;
-      if (show && ['Bio-CNG', 'Bio-LNG', 'Biomethane', 'Biogas'].includes(s.techno) && !allCapacityFiltersUnchecked) {{
-        const capacity = parseFloat(s.capacity_gwh_year);
-        // Check if capacity is NaN, null, undefined, or 0 (treat as N/A)
-        if (isNaN(capacity) || capacity === 0 || s.capacity_gwh_year === null || s.capacity_gwh_year === undefined) {{
-          capacityOk = capacityNA;
-        }} else if (capacity < 20) {{
-          capacityOk = capacitySmall;
-        }} else if (capacity >= 20 && capacity <= 40) {{
-          capacityOk = capacityMedium;
-        }} else {{ // capacity > 40
-          capacityOk = capacityLarge;
-        }}
-      }}
-      
-      if (show && capacityOk) {{
-        markersLayer.addLayer(m);
-      }}
-    }});
+      visible[w] = capacityOk ? show & capacityOk[w] : show;
+    }}
+    let markerBits = visible;
+    if (GRID_SITE_BITS) {{
+      markerBits = visible.map((word, w) => word & ~GRID_SITE_BITS[w]);
+      gridSiteCount = 0;
+      visible.forEach((word, w) => {{
+        for (let bits = word & GRID_SITE_BITS[w]; bits; bits &= bits - 1) gridSiteCount++;
+      }});
+      if (gridSiteCount) greenhouseGridLayer.addTo(map);
+      else greenhouseGridLayer.remove();
+    }}
+    markersLayer.setSites(markerBits);
+    if (SITE_TILES) {{
+      siteTileFilter = {{ techno: selectedTechnos, status: ['', ...selectedStatuses], capacity_bucket: capacityBuckets }};
+      updateSiteTileSummaries();
+    }}
+    setHeatFilter(selectedTechnos.length ? visible : null);
 
     updateVisibleCount();
     
@@ -1397,36 +3968,42 @@ def build_html(
 
   // Eiffel investment highlighting
   let eiffelHighlightActive = false;
+  // Markers created later get the highlight as they are added (see createSiteMarker)
+  function setEiffelHighlight(m, on) {{
+    const canvasShape = m.options.shape && m.options.shape !== 'circle';
+    if (on) {{
+      // Highlight Eiffel investments with gold glow
+      if (canvasShape) {{
+        m.setStyle({{ glow: '#FFD700' }});
+      }} else if (m instanceof L.CircleMarker) {{
+        m.setStyle({{ color: '#FFD700', fillColor: '#FFD700', weight: 3, fillOpacity: 0.9 }});
+      }} else {{
+        // For DivIcon markers, add a wrapper highlight
+        const el = m.getElement();
+        if (el) el.style.filter = 'drop-shadow(0 0 6px #FFD700)';
+      }}
+    }} else {{
+      // Reset to original style
+      if (canvasShape) {{
+        m.setStyle({{ glow: null }});
+      }} else if (m instanceof L.CircleMarker) {{
+        m.setStyle({{ 
+          color: m._originalStyle.color, 
+          fillColor: m._originalStyle.fillColor, 
+          weight: 2, 
+          fillOpacity: 0.7 
+        }});
+      }} else {{
+        const el = m.getElement();
+        if (el) el.style.filter = '';
+      }}
+    }}
+  }}
+
   document.getElementById('toggle-eiffel').addEventListener('click', (e) => {{
     eiffelHighlightActive = !eiffelHighlightActive;
     e.target.classList.toggle('active', eiffelHighlightActive);
-    
-    allMarkers.forEach(m => {{
-      const s = m._props;
-      if (eiffelHighlightActive && s.is_eiffel) {{
-        // Highlight Eiffel investments with gold glow
-        if (m instanceof L.CircleMarker) {{
-          m.setStyle({{ color: '#FFD700', fillColor: '#FFD700', weight: 3, fillOpacity: 0.9 }});
-        }} else {{
-          // For DivIcon markers, add a wrapper highlight
-          const el = m.getElement();
-          if (el) el.style.filter = 'drop-shadow(0 0 6px #FFD700)';
-        }}
-      }} else {{
-        // Reset to original style
-        if (m instanceof L.CircleMarker) {{
-          m.setStyle({{ 
-            color: m._originalStyle.color, 
-            fillColor: m._originalStyle.fillColor, 
-            weight: 2, 
-            fillOpacity: 0.7 
-          }});
-        }} else {{
-          const el = m.getElement();
-          if (el) el.style.filter = '';
-        }}
-      }}
-    }});
+    siteMarkers.forEach(m => setEiffelHighlight(m, eiffelHighlightActive && m._props.is_eiffel));
   }});
 
   // OLD ZOOM MODE VARIABLES REMOVED - Now using isochrone mode
@@ -1438,38 +4015,175 @@ def build_html(
     opportunity: null,  // >>> OPPORTUNITY HEATMAP ADDITION <<<
     biomethane: null,
     biogas: null,
+    feedstock: null,
     foodprocessing: null,
     efuels: null,
     storage: null,
     greenhouses: null,
     bioco2: null,
     fossilco2: null,
-    capture: null
+    capture: null,
+    papeterie: null
   }};
 
-  // Helper function to create a heatmap from filtered sites
-  function createHeatmap(filterFunc, gradient, max = null) {{
-    const points = SITES.filter(filterFunc).map(s => [s.lat, s.lon, 1]);
-    const options = {{
-      radius: {heat_radius},
-      blur: {heat_blur},
-      maxZoom: 12,
-      gradient: gradient
+  // Site heatmaps (HEATMAP_DEFS in the generator): the layer/category/techno values of the
+  // sites feeding each one, its gradient, point weight, radius/blur factors and max
+  const HEAT_GRADIENTS = {json.dumps(HEAT_GRADIENTS)};
+  const HEATMAP_DEFS = {json.dumps(HEATMAP_DEFS)};
+
+  function heatmapMatches(def, s) {{
+    return Object.entries(def.match).every(([key, values]) => values.includes(s[key]));
+  }}
+
+  function heatOptions(def) {{
+    return {{
+      radius: {heat_radius} * (def.radius_scale || 1),
+      blur: {heat_blur} * (def.blur_scale || 1),
+      maxZoom: {HEAT_MAX_ZOOM},
+      max: def.max || 1,
+      gradient: HEAT_GRADIENTS[def.gradient]
     }};
-    if (max !== null) {{
-      options.max = max;
+  }}
+
+  // Site ids and [lat, lon, weight] points of each heatmap, collected once on first use
+  // (and again after site tiles are merged, see resetHeatmapSources)
+  const heatmapSources = {{}};
+  function heatmapSource(name) {{
+    if (!heatmapSources[name]) {{
+      const def = HEATMAP_DEFS[name];
+      const ids = [];
+      SITES.forEach((s, i) => {{ if (heatmapMatches(def, s)) ids.push(i); }});
+      heatmapSources[name] = {{ ids, points: ids.map(i => [SITES[i].lat, SITES[i].lon, def.weight || 1]) }};
     }}
-    return L.heatLayer(points, options);
+    return heatmapSources[name];
   }}
 
-  // Supply gradient
-  const supplyGradient = {{0.4: 'lime', 0.6: 'yellow', 0.8: 'orange', 1.0: 'red'}};
-  
-  // Offtake gradient
-  const offtakeGradient = {{0.4: 'yellow', 0.6: 'gold', 0.8: 'orange', 1.0: 'darkorange'}};
-  
-  // Competitors gradient
-  const competitorsGradient = {{0.2: 'cyan', 0.4: 'deepskyblue', 0.6: 'blue', 0.8: 'darkblue', 1.0: 'purple'}};
+  // Heatmaps follow the site filters (set by applyFilters); null shows every site,
+  // as before any techno is selected
+  let heatFilter = null;
+
+  // Whether the filters keep every site of a heatmap, so its unfiltered raster pyramid is exact
+  function heatFilterKeepsAll(name) {{
+    if (!heatFilter) return true;
+    if (SITE_TILES && !siteTilesAllPass) return false;
+    return heatmapSource(name).ids.every(i => heatFilter[i >>> 5] & (1 << (i & 31)));
+  }}
+
+  // Merged site tiles add sites to the heatmaps: collect their sources again on next use
+  function resetHeatmapSources() {{
+    Object.keys(heatmapSources).forEach(name => delete heatmapSources[name]);
+    Object.values(heatmaps).forEach(layer => {{
+      if (layer && layer._points) layer._filter = undefined;
+    }});
+  }}
+
+  function heatmapPoints(name) {{
+    const source = heatmapSource(name);
+    if (!heatFilter) return source.points;
+    return source.points.filter((_, k) => {{
+      const i = source.ids[k];
+      return heatFilter[i >>> 5] & (1 << (i & 31));
+    }});
+  }}
+
+  // Heat band of a zoom (see HEAT_BAND_ZOOMS), -1 above the last band
+  const HEAT_BAND_ZOOMS = {json.dumps(HEAT_BAND_ZOOMS)};
+  function heatBand(zoom) {{
+    return HEAT_BAND_ZOOMS.findIndex(z => zoom <= z);
+  }}
+
+  // Merge [lat, lon, weight] points into one weighted point per Web Mercator cell of
+  // radius / 2 px at the band's top zoom. leaflet.heat sums its points on a grid of
+  // that size when it redraws, so the heat looks the same from far fewer points.
+  function binHeatPoints(points, band, radius) {{
+    if (band < 0) return points;
+    const cell = 360 / (256 * Math.pow(2, HEAT_BAND_ZOOMS[band])) * radius / 2;
+    const cells = new Map();
+    points.forEach(([lat, lon, w]) => {{
+      const y = Math.log(Math.tan(Math.PI / 4 + lat * Math.PI / 360)) * 180 / Math.PI;
+      const key = Math.floor(lon / cell) * 1048576 + Math.floor(y / cell);
+      const c = cells.get(key);
+      if (c) {{
+        c[0] += lat * w;
+        c[1] += lon * w;
+        c[2] += w;
+      }} else {{
+        cells.set(key, [lat * w, lon * w, w]);
+      }}
+    }});
+    return Array.from(cells.values(), ([lat, lon, w]) => [lat / w, lon / w, w]);
+  }}
+
+  // Give a built heatmap the points of the current filter, binned for the current zoom band;
+  // binned sets are cached per band and the layer is only redrawn when its points change
+  function syncHeatmap(name) {{
+    const layer = heatmaps[name];
+    if (layer._filter !== heatFilter) {{
+      layer._filter = heatFilter;
+      const points = heatmapPoints(name);
+      if (points.length !== layer._points.length || points.some((pt, k) => pt !== layer._points[k])) {{
+        layer._points = points;
+        layer._bands = [];
+      }}
+    }}
+    const band = heatBand(map.getZoom());
+    if (!layer._bands[band + 1]) layer._bands[band + 1] = binHeatPoints(layer._points, band, layer.options.radius);
+    if (layer._drawn !== layer._bands[band + 1]) {{
+      layer._drawn = layer._bands[band + 1];
+      layer.setLatLngs(layer._drawn);
+    }}
+  }}
+
+  // With --raster-tiles a heatmap is its prerendered pyramid where that looks the same as the
+  // heat layer: up to the pyramid's last zoom (leaflet.heat keeps its radius in pixels, scaled
+  // tiles would not) and while the filters keep all of its sites. Elsewhere the heat layer is drawn.
+  const rasterHeatmaps = {{}};
+  const heatmapsOn = {{}};
+
+  function rasterHeatShown(name) {{
+    const raster = RASTER_TILES && RASTER_TILES.layers[name];
+    return !!raster && map.getZoom() <= raster.zooms[1] && heatFilterKeepsAll(name);
+  }}
+
+  // Show or hide a site heatmap; hidden heatmaps are kept and brought up to date when shown again
+  function showHeatmap(name, on) {{
+    heatmapsOn[name] = on;
+    const useRaster = on && rasterHeatShown(name);
+    if (useRaster && !rasterHeatmaps[name]) {{
+      rasterHeatmaps[name] = rasterTileLayer(name, RASTER_TILES.layers[name].zooms[1]);
+    }}
+    const raster = rasterHeatmaps[name];
+    if (useRaster && !map.hasLayer(raster)) raster.addTo(map);
+    else if (!useRaster && raster && map.hasLayer(raster)) map.removeLayer(raster);
+
+    let layer = heatmaps[name];
+    if (on && !useRaster) {{
+      if (!layer) {{
+        layer = heatmaps[name] = L.heatLayer([], heatOptions(HEATMAP_DEFS[name]));
+        layer._filter = undefined;
+        layer._points = [];
+        layer._bands = [];
+        layer._drawn = null;
+      }}
+      syncHeatmap(name);
+      if (!map.hasLayer(layer)) layer.addTo(map);
+    }} else if (layer && map.hasLayer(layer)) {{
+      map.removeLayer(layer);
+    }}
+  }}
+
+  function syncVisibleHeatmaps() {{
+    Object.keys(HEATMAP_DEFS).forEach(name => {{
+      if (heatmapsOn[name]) showHeatmap(name, true);
+    }});
+  }}
+
+  function setHeatFilter(bits) {{
+    heatFilter = bits;
+    syncVisibleHeatmaps();
+  }}
+
+  map.on('zoomend', syncVisibleHeatmaps);
 
   // >>> OPPORTUNITY HEATMAP ADDITION <<<
   // Opportunity Heatmap (composite: supply + offtake - competitors)
@@ -1518,47 +4232,17 @@ def build_html(
 
   // Biomethane heatmap
   document.getElementById('toggle-biomethane-heat').addEventListener('change', (e) => {{
-    if (heatmaps.biomethane) {{
-      map.removeLayer(heatmaps.biomethane);
-      heatmaps.biomethane = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.biomethane = createHeatmap(
-        s => s.layer === 'Supply' && ['Bio-CNG', 'Bio-LNG', 'Biomethane'].includes(s.techno),
-        supplyGradient
-      );
-      heatmaps.biomethane.addTo(map);
-    }}
+    showHeatmap('biomethane', e.target.checked);
   }});
 
   // Biogas heatmap
   document.getElementById('toggle-biogas-heat').addEventListener('change', (e) => {{
-    if (heatmaps.biogas) {{
-      map.removeLayer(heatmaps.biogas);
-      heatmaps.biogas = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.biogas = createHeatmap(
-        s => s.category === 'Biogas',
-        supplyGradient
-      );
-      heatmaps.biogas.addTo(map);
-    }}
+    showHeatmap('biogas', e.target.checked);
   }});
 
   // Feedstock heatmap
   document.getElementById('toggle-feedstock-heat').addEventListener('change', (e) => {{
-    if (heatmaps.feedstock) {{
-      map.removeLayer(heatmaps.feedstock);
-      heatmaps.feedstock = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.feedstock = createHeatmap(
-        s => s.category === 'Feedstock',
-        supplyGradient
-      );
-      heatmaps.feedstock.addTo(map);
-    }}
+    showHeatmap('feedstock', e.target.checked);
   }});
 
   // Offtake Heatmap parent toggle
@@ -1572,68 +4256,22 @@ def build_html(
 
   // Food Processing heatmap
   document.getElementById('toggle-foodprocessing-heat').addEventListener('change', (e) => {{
-    if (heatmaps.foodprocessing) {{
-      map.removeLayer(heatmaps.foodprocessing);
-      heatmaps.foodprocessing = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.foodprocessing = createHeatmap(
-        s => s.category === 'Food processing',
-        offtakeGradient
-      );
-      heatmaps.foodprocessing.addTo(map);
-    }}
+    showHeatmap('foodprocessing', e.target.checked);
   }});
 
   // E-fuels heatmap
   document.getElementById('toggle-efuels-heat').addEventListener('change', (e) => {{
-    if (heatmaps.efuels) {{
-      map.removeLayer(heatmaps.efuels);
-      heatmaps.efuels = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.efuels = createHeatmap(
-        s => ['E-methanol', 'E-SAF'].includes(s.techno),
-        offtakeGradient
-      );
-      heatmaps.efuels.addTo(map);
-    }}
+    showHeatmap('efuels', e.target.checked);
   }});
 
   // Storage heatmap - with higher intensity for better visibility
   document.getElementById('toggle-storage-heat').addEventListener('change', (e) => {{
-    if (heatmaps.storage) {{
-      map.removeLayer(heatmaps.storage);
-      heatmaps.storage = null;
-    }}
-    if (e.target.checked) {{
-      const storageSites = SITES.filter(s => s.category === 'Storage');
-      const points = storageSites.map(s => [s.lat, s.lon, 5]); // Increased intensity from 1 to 5
-      
-      heatmaps.storage = L.heatLayer(points, {{
-        radius: {heat_radius} * 1.5, // Increased radius for better visibility
-        blur: {heat_blur} * 1.2,
-        maxZoom: 12,
-        max: 10, // Set max for better color distribution
-        gradient: offtakeGradient
-      }});
-      heatmaps.storage.addTo(map);
-    }}
+    showHeatmap('storage', e.target.checked);
   }});
 
   // Greenhouses heatmap
   document.getElementById('toggle-greenhouses-heat').addEventListener('change', (e) => {{
-    if (heatmaps.greenhouses) {{
-      map.removeLayer(heatmaps.greenhouses);
-      heatmaps.greenhouses = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.greenhouses = createHeatmap(
-        s => s.techno === 'Greenhouses',
-        offtakeGradient
-      );
-      heatmaps.greenhouses.addTo(map);
-    }}
+    showHeatmap('greenhouses', e.target.checked);
   }});
 
   // Competitors Heatmap parent toggle
@@ -1647,66 +4285,22 @@ def build_html(
 
   // BioCO2 heatmap
   document.getElementById('toggle-bioco2-heat').addEventListener('change', (e) => {{
-    if (heatmaps.bioco2) {{
-      map.removeLayer(heatmaps.bioco2);
-      heatmaps.bioco2 = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.bioco2 = createHeatmap(
-        s => s.techno === 'BioCO2',
-        competitorsGradient,
-        3.0
-      );
-      heatmaps.bioco2.addTo(map);
-    }}
+    showHeatmap('bioco2', e.target.checked);
   }});
 
   // FossilCO2 heatmap
   document.getElementById('toggle-fossilco2-heat').addEventListener('change', (e) => {{
-    if (heatmaps.fossilco2) {{
-      map.removeLayer(heatmaps.fossilco2);
-      heatmaps.fossilco2 = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.fossilco2 = createHeatmap(
-        s => s.techno === 'FossilCO2',
-        competitorsGradient,
-        3.0
-      );
-      heatmaps.fossilco2.addTo(map);
-    }}
+    showHeatmap('fossilco2', e.target.checked);
   }});
 
   // Capture Projects heatmap
   document.getElementById('toggle-capture-heat').addEventListener('change', (e) => {{
-    if (heatmaps.capture) {{
-      map.removeLayer(heatmaps.capture);
-      heatmaps.capture = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.capture = createHeatmap(
-        s => s.category === 'Capture',
-        competitorsGradient,
-        3.0
-      );
-      heatmaps.capture.addTo(map);
-    }}
+    showHeatmap('capture', e.target.checked);
   }});
 
   // Papeterie heatmap
   document.getElementById('toggle-papeterie-heat').addEventListener('change', (e) => {{
-    if (heatmaps.papeterie) {{
-      map.removeLayer(heatmaps.papeterie);
-      heatmaps.papeterie = null;
-    }}
-    if (e.target.checked) {{
-      heatmaps.papeterie = createHeatmap(
-        s => s.category === 'Papeterie',
-        competitorsGradient,
-        3.0
-      );
-      heatmaps.papeterie.addTo(map);
-    }}
+    showHeatmap('papeterie', e.target.checked);
   }});
 
   // Collapse/expand controls
@@ -1725,7 +4319,7 @@ def build_html(
   let isochroneEnabled = false;  // True when user toggles isochrone ON
   let isochroneLayers = [];
   let currentFocusSite = null;  // The site currently zoomed in on
-  let savedFilteredMarkers = [];  // Store filtered markers before showing all
+  let savedFilteredSites = null;  // Filtered sites (bitset) before showing all
   
   // Fetch multiple isochrones in a single API call (Heavy Goods Vehicle profile)
   async function fetchTruckIsochronesMultiple(lat, lon, timeMinutesArray) {{
@@ -1967,9 +4561,8 @@ def build_html(
     currentFocusSite = site;
     console.log(`🔍 Zooming to site: ${{site.name}}`);
     
-    // Save current filtered markers
-    savedFilteredMarkers = [];
-    markersLayer.eachLayer(m => savedFilteredMarkers.push(m));
+    // Save current filtered sites
+    savedFilteredSites = markersLayer.getSites();
     
     // Zoom to site (zoom level 11 for close-up view)
     map.setView(latlng, 11, {{ animate: true, duration: 0.6 }});
@@ -1990,14 +4583,7 @@ def build_html(
     console.log(`🚛 Fetching isochrones for: ${{site.name}}`);
     
     // Show ALL sites (so user can explore neighbors)
-    // Don't clear - just add any missing markers to preserve click handlers
-    const currentMarkers = new Set();
-    markersLayer.eachLayer(m => currentMarkers.add(m));
-    allMarkers.forEach(m => {{
-      if (!currentMarkers.has(m)) {{
-        markersLayer.addLayer(m);
-      }}
-    }});
+    markersLayer.setSites(facetUnion(FACETS.techno, [...FACETS.techno.keys()]));
     updateVisibleCount();
     console.log(`   Showing all sites for exploration`);
     
@@ -2098,9 +4684,8 @@ def build_html(
     if (legend) legend.style.display = 'none';
     
     // Restore filtered markers (hide unselected categories)
-    if (savedFilteredMarkers.length > 0) {{
-      markersLayer.clearLayers();
-      savedFilteredMarkers.forEach(m => markersLayer.addLayer(m));
+    if (savedFilteredSites) {{
+      markersLayer.setSites(savedFilteredSites);
       updateVisibleCount();
     }}
     
@@ -2134,8 +4719,8 @@ def build_html(
     const toggle = document.getElementById('isochrone-toggle');
     if (toggle) toggle.style.display = 'none';
     
-    // Clear saved markers
-    savedFilteredMarkers = [];
+    // Clear saved sites
+    savedFilteredSites = null;
     
     // Restore filtered view
     applyFilters();
@@ -2174,15 +4759,6 @@ def build_html(
     }}
   }}
   
-  // Add click handlers to markers
-  allMarkers.forEach(m => {{
-    m.on('click', (e) => {{
-      const site = m._props;
-      const latlng = e.latlng;
-      enterZoomMode(site, latlng, m);
-    }});
-  }});
-  
   // Exit zoom mode when zooming out
   map.on('zoomend', () => {{
     if (zoomMode && map.getZoom() < 8) {{
@@ -2198,66 +4774,226 @@ def build_html(
   const searchInput = document.getElementById('operator-search');
   const searchResultsInfo = document.getElementById('search-results-info');
   let searchActive = false;
-  let matchingMarkers = [];
+  let matchingSites = [];
+  // Matching sites flash once when their markers are added (markers follow the view)
+  let searchHighlight = new Set();
+
+  function flashSearchHighlight(i, m) {{
+    if (!searchHighlight.delete(i)) return;
+    const element = m.getElement ? m.getElement() : m._icon;
+    if (element) {{
+      element.classList.add('search-highlight');
+      setTimeout(() => element.classList.remove('search-highlight'), 500);
+    }}
+  }}
+
+  // Trigram index over the distinct operator, municipality, site info and Eiffel project
+  // values (see build_search_index); value ids run field after field in dictionary order.
+  // With site tiles it is fetched on the first search, with the dictionaries of its fields.
+  let SEARCH_INDEX = SITE_TILES ? null : {json.dumps(search_index or {"fields": [], "trigrams": {}}, separators=(",", ":"))};
+  function searchKey(text) {{
+    return text.toLowerCase().normalize('NFD').replace(/[\\u0300-\\u036f]/g, '');
+  }}
+  let searchKeys = [];
+  let searchDictionaries = [];
+  let searchOffsets = [];
+  function setSearchIndex(index) {{
+    SEARCH_INDEX = index;
+    searchKeys = [];
+    searchDictionaries = index.fields.map(name => (index.values ? index.values[name] : SITE_COLUMNS.columns[name].values));
+    searchOffsets = searchDictionaries.map(values => {{
+      const offset = searchKeys.length;
+      values.forEach(v => searchKeys.push(typeof v === 'string' ? searchKey(v) : ''));
+      return offset;
+    }});
+  }}
+  if (SEARCH_INDEX) setSearchIndex(SEARCH_INDEX);
+  function loadSearchIndex() {{
+    return fetchJsonOnce(`${{SITE_TILES.url}}${{SITE_TILES.search}}?v=${{SITE_TILES.version}}`)
+      .then(index => {{ if (!SEARCH_INDEX) setSearchIndex(index); }});
+  }}
+  // Sites per dictionary code of each search field (counting sort of the chunks' codes, mapped
+  // to the full dictionary through "ids" in tiles), built on the first search and again after
+  // site tiles are merged
+  let searchFields = null;
+  function buildSearchFields() {{
+    return SEARCH_INDEX.fields.map((name, f) => {{
+      const size = searchDictionaries[f].length;
+      const eachSite = fn => siteChunks.forEach(chunk => {{
+        const {{ codes, ids }} = chunk.columns[name];
+        for (let k = 0; k < chunk.count; k++) fn(ids ? ids[codes[k]] : codes[k], chunk.start + k);
+      }});
+      const start = new Int32Array(size + 1);
+      eachSite(c => {{ start[c + 1]++; }});
+      for (let k = 0; k < size; k++) start[k + 1] += start[k];
+      const next = start.slice(0, -1);
+      const sites = new Int32Array(start[size]);
+      eachSite((c, i) => {{ sites[next[c]++] = i; }});
+      return {{ offset: searchOffsets[f], start, sites }};
+    }});
+  }}
+  const trigramCache = new Map();
+
+  function trigramPostings(gram) {{
+    let ids = trigramCache.get(gram);
+    if (!ids) {{
+      let id = 0;
+      ids = Int32Array.from(SEARCH_INDEX.trigrams[gram] || [], d => (id += d));
+      trigramCache.set(gram, ids);
+    }}
+    return ids;
+  }}
+
+  function trigrams(key) {{
+    const grams = new Set();
+    for (let i = 0; i + 3 <= key.length; i++) grams.add(key.slice(i, i + 3));
+    return [...grams];
+  }}
+
+  function intersectSorted(a, b) {{
+    const out = [];
+    for (let i = 0, j = 0; i < a.length && j < b.length;) {{
+      if (a[i] < b[j]) i++;
+      else if (a[i] > b[j]) j++;
+      else {{ out.push(a[i]); i++; j++; }}
+    }}
+    return out;
+  }}
+
+  // Ids of the values whose search key contains `q`
+  function matchingValueIds(q) {{
+    if (q.length < 3) {{
+      const ids = [];
+      searchKeys.forEach((key, id) => {{ if (key.includes(q)) ids.push(id); }});
+      return ids;
+    }}
+    const lists = trigrams(q).map(trigramPostings).sort((a, b) => a.length - b.length);
+    let ids = lists[0];
+    for (let k = 1; k < lists.length && ids.length; k++) ids = intersectSorted(ids, lists[k]);
+    return Array.from(ids).filter(id => searchKeys[id].includes(q));
+  }}
+
+  // Sellers' algorithm: does some substring of `text` lie within `k` edits of `q`?
+  function approxContains(text, q, k) {{
+    let prev = Int32Array.from({{ length: q.length + 1 }}, (_, j) => j);
+    let cur = new Int32Array(q.length + 1);
+    for (let i = 1; i <= text.length; i++) {{
+      for (let j = 1; j <= q.length; j++) {{
+        const substitution = prev[j - 1] + (text[i - 1] === q[j - 1] ? 0 : 1);
+        cur[j] = Math.min(prev[j] + 1, cur[j - 1] + 1, substitution);
+      }}
+      if (cur[q.length] <= k) return true;
+      [prev, cur] = [cur, prev];
+    }}
+    return false;
+  }}
+
+  // Ids of the values containing `q` with up to `k` typos; each typo breaks at most three
+  // of the query's trigrams, so candidates must share the rest
+  function fuzzyValueIds(q, k) {{
+    const grams = trigrams(q);
+    const shared = new Map();
+    grams.forEach(g => trigramPostings(g).forEach(id => shared.set(id, (shared.get(id) || 0) + 1)));
+    const needed = Math.max(1, grams.length - 3 * k);
+    const ids = [];
+    shared.forEach((n, id) => {{ if (n >= needed && approxContains(searchKeys[id], q, k)) ids.push(id); }});
+    return ids;
+  }}
+
+  // Sites matching `query` as a bitset; without exact matches, queries of 4+ characters
+  // fall back to typo-tolerant matching (`fuzzy` is then true)
+  function searchSites(query) {{
+    const q = searchKey(query);
+    let ids = matchingValueIds(q);
+    let fuzzy = false;
+    if (ids.length === 0 && q.length >= 4) {{
+      ids = fuzzyValueIds(q, q.length >= 8 ? 2 : 1);
+      fuzzy = ids.length > 0;
+    }}
+    const bits = new Uint32Array(SITE_WORDS);
+    if (!searchFields) searchFields = buildSearchFields();
+    ids.forEach(id => {{
+      let f = searchFields.length - 1;
+      while (searchFields[f].offset > id) f--;
+      const field = searchFields[f];
+      const code = id - field.offset;
+      for (let p = field.start[code]; p < field.start[code + 1]; p++) {{
+        const i = field.sites[p];
+        bits[i >>> 5] |= 1 << (i & 31);
+      }}
+    }});
+    return {{ bits, fuzzy }};
+  }}
   
-  function performSearch() {{
+  // `refit` is false when merged site tiles re-run the search: the view and highlights stay
+  function performSearch(refit = true) {{
     const query = searchInput.value.trim().toLowerCase();
     
     if (query === '') {{
       // Clear search - restore normal filtering
       searchActive = false;
-      matchingMarkers = [];
+      matchingSites = [];
+      searchHighlight = new Set();
       searchResultsInfo.textContent = '';
       applyFilters();
       return;
     }}
     
-    // Search for matching operators
+    if (!SEARCH_INDEX) {{
+      searchResultsInfo.textContent = '⏳ Loading search index...';
+      searchResultsInfo.style.color = '';
+      loadSearchIndex()
+        .then(() => performSearch(refit))
+        .catch(error => {{
+          console.error('❌ Could not load the search index:', error);
+          searchResultsInfo.innerHTML = '❌ Search unavailable';
+          searchResultsInfo.style.color = '#d32f2f';
+        }});
+      return;
+    }}
+    
+    // Search for matching sites
     searchActive = true;
-    matchingMarkers = allMarkers.filter(m => {{
-      const operator = (m._props.operator || '').toLowerCase();
-      return operator.includes(query);
-    }});
+    const result = searchSites(query);
+    matchingSites = [];
+    for (let w = 0; w < SITE_WORDS; w++) {{
+      for (let bits = result.bits[w]; bits; bits &= bits - 1) {{
+        matchingSites.push((w << 5) + 31 - Math.clz32(bits & -bits));
+      }}
+    }}
     
     // Update info
-    const count = matchingMarkers.length;
+    const count = matchingSites.length;
     if (count === 0) {{
       searchResultsInfo.innerHTML = '❌ No sites found';
       searchResultsInfo.style.color = '#d32f2f';
     }} else {{
       // Get unique operators
-      const operators = [...new Set(matchingMarkers.map(m => m._props.operator))].filter(o => o && o !== 'N/A');
+      const operators = [...new Set(matchingSites.map(i => SITES[i].operator))].filter(o => o && o !== 'N/A');
       const operatorCount = operators.length;
-      searchResultsInfo.innerHTML = `✅ Found ${{count}} site(s) from ${{operatorCount}} operator(s)`;
+      const closest = result.fuzzy ? ' (closest matches)' : '';
+      searchResultsInfo.innerHTML = `✅ Found ${{count}} site(s) from ${{operatorCount}} operator(s)${{closest}}`;
       searchResultsInfo.style.color = '#1b5e20';
     }}
     
-    // Show matching sites
-    allMarkers.forEach(m => {{
-      const matches = matchingMarkers.includes(m);
-      if (matches) {{
-        if (!markersLayer.hasLayer(m)) {{
-          markersLayer.addLayer(m);
-        }}
-        // Add highlight animation
-        const element = m.getElement ? m.getElement() : m._icon;
-        if (element) {{
-          element.classList.add('search-highlight');
-          setTimeout(() => element.classList.remove('search-highlight'), 500);
-        }}
-      }} else {{
-        if (markersLayer.hasLayer(m)) {{
-          markersLayer.removeLayer(m);
-        }}
-      }}
-    }});
-    
+    // Show matching sites, greenhouses included, as markers
+    if (greenhouseGridLayer) {{
+      gridSiteCount = 0;
+      greenhouseGridLayer.remove();
+    }}
+    markersLayer.setSites(result.bits);
+    if (SITE_TILES) updateSiteTileSummaries();
     updateVisibleCount();
+    if (!refit) return;
+    
+    // Add highlight animation to the markers already drawn, and to the others as they are drawn
+    const highlight = searchHighlight = new Set(matchingSites);
+    siteMarkers.forEach((m, i) => flashSearchHighlight(i, m));
+    setTimeout(() => {{ if (searchHighlight === highlight) searchHighlight = new Set(); }}, 2000);
     
     // Zoom to matching markers if found
-    if (matchingMarkers.length > 0) {{
-      const group = L.featureGroup(matchingMarkers);
-      map.fitBounds(group.getBounds().pad(0.1));
+    if (matchingSites.length > 0) {{
+      map.fitBounds(L.latLngBounds(matchingSites.map(i => [SITES[i].lat, SITES[i].lon])).pad(0.1));
     }}
   }}
   
@@ -2286,6 +5022,180 @@ def build_html(
     originalApplyFilters();
   }};
   // ========== END SEARCH FUNCTIONALITY ==========
+
+  // ========== SITE TILES (--site-data tiles) ==========
+  // From SITE_TILE_MIN_ZOOM up, the site tiles covering the padded view are fetched and merged
+  // into the site columns, facets, spatial grid and search; merged tiles stay. Below it, the
+  // tiles not merged yet are grouped by quadkey prefix (about 128 px cells) into markers
+  // counting their sites that pass the filters, from the facet combinations of the tile index.
+  const SITE_TILE_MIN_ZOOM = 7;
+  const siteTilesByKey = new Map((SITE_TILES ? SITE_TILES.tiles : []).map(t => [t.key, t]));
+  const siteTilesRequested = new Set();
+  const siteTilesMerged = new Set();
+  const siteTileSummaries = L.layerGroup();
+  let siteTileFilter = {{ techno: [], status: [], capacity_bucket: null }};  // set by applyFilters
+  let siteRefreshPending = false;
+
+  function quadkey(x, y, z) {{
+    let key = '';
+    for (let bit = z - 1; bit >= 0; bit--) key += ((x >> bit) & 1) + 2 * ((y >> bit) & 1);
+    return key;
+  }}
+
+  // Store a fetched tile's rows as a site chunk and index its sites as inline sites are. JSON
+  // tiles hold {{codes}} (with the tile's own {{values, ids}} for cut dictionaries) or
+  // {{values, none}} per column, binary ones a typed array per column with the dictionaries,
+  // none and null rows in their header.
+  function mergeSiteTile(record, tile) {{
+    const start = record.start;
+    const end = start + record.count;
+    const columns = {{}};
+    Object.entries(tile.columns).forEach(([name, part]) => {{
+      const binary = ArrayBuffer.isView(part);
+      if (SITE_COLUMNS.columns[name].type === 'dict') {{
+        const {{ values, ids }} = binary ? (tile.dicts && tile.dicts[name]) || {{}} : part;
+        columns[name] = {{ codes: binary ? part : Int32Array.from(part.codes), values, ids }};
+        return;
+      }}
+      let values = binary ? part
+        : SITE_COLUMNS.columns[name].type === 'flag' ? Uint8Array.from(part.values)
+        : Float64Array.from(part.values, v => (v === null ? NaN : v));
+      const nulls = tile.null && tile.null[name];
+      if (nulls) {{
+        values = Float64Array.from(values);
+        nulls.forEach(k => {{ values[k] = NaN; }});
+      }}
+      columns[name] = {{ values, none: (tile.none && tile.none[name]) || part.none }};
+    }});
+    const chunk = siteChunk(start, record.count, columns);
+    for (let i = start; i < end; i++) SITES[i] = siteRow(chunk, i);
+    addFacetSites(chunk);
+    addGridSites(start, end);
+    searchFields = null;
+    resetHeatmapSources();
+    siteTilesMerged.add(record.key);
+  }}
+
+  function loadSiteTile(record) {{
+    if (siteTilesRequested.has(record.key)) return;
+    siteTilesRequested.add(record.key);
+    const binary = SITE_TILES.format === 'binary';
+    const url = `${{SITE_TILES.url}}${{record.key}}.${{binary ? 'bin' : 'json'}}?v=${{SITE_TILES.version}}`;
+    const layout = binary && binaryLayout(SITE_TILES.columns, record.count);
+    (binary ? fetchBinaryOnce(url, buffer => unpackBinary(buffer, layout)) : fetchJsonOnce(url))
+      .then(tile => {{
+        mergeSiteTile(record, tile);
+        scheduleSiteRefresh();
+      }})
+      .catch(error => {{
+        console.error(`❌ Could not load site tile ${{record.key}}:`, error);
+        siteTilesRequested.delete(record.key);
+      }});
+  }}
+
+  // Re-apply the search or the filters once per frame while tiles arrive
+  function scheduleSiteRefresh() {{
+    if (siteRefreshPending) return;
+    siteRefreshPending = true;
+    requestAnimationFrame(() => {{
+      siteRefreshPending = false;
+      if (searchActive) performSearch(false);
+      else if (!zoomMode) applyFilters();
+      else updateSiteTileSummaries();
+      syncVisibleHeatmaps();
+    }});
+  }}
+
+  function siteTileIcon(count) {{
+    const sz = Math.round(Math.min(56, 28 + 8 * Math.log10(count)));
+    const html = `<div class="site-cluster" style="border-color:#607D8B;">${{fmt(count)}}</div>`;
+    return L.divIcon({{ html: html, className: '', iconSize: [sz, sz], iconAnchor: [sz/2, sz/2] }});
+  }}
+
+  // siteTileFilter as 0/1 per dictionary code of each facet (capacity null when not filtered)
+  function siteTileSelection() {{
+    const selected = name => {{
+      const values = new Set(siteTileFilter[name]);
+      return SITE_COLUMNS.columns[name].values.map(v => (values.has(v) ? 1 : 0));
+    }};
+    return {{
+      techno: selected('techno'),
+      status: selected('status'),
+      capacity: siteTileFilter.capacity_bucket && selected('capacity_bucket'),
+    }};
+  }}
+
+  // Sites of a tile index record passing the selection, with the visibility logic of applyFilters
+  function siteTileCount(record, {{ techno, status, capacity }}) {{
+    const technoOk = record.facets.map(f => techno[f[0]]);
+    const statusOk = record.facets.map(f => status[f[1]]);
+    const capacityOk = capacity && record.facets.map(f => capacity[f[2]]);
+    let count = 0;
+    for (let w = 0; w < record.facets.length; w++) {{
+      {vis_logic}
+      if (capacityOk ? show & capacityOk[w] : show) count += record.facets[w][3];
+    }}
+    return count;
+  }}
+
+  function updateSiteTileSummaries() {{
+    const showSummaries = !searchActive && map.getZoom() < SITE_TILE_MIN_ZOOM;
+    const selection = siteTileSelection();
+    siteTileSummaries.clearLayers();
+    unloadedSiteCount = 0;
+    siteTilesAllPass = SITE_TILES.tiles.every(record => siteTileCount(record, selection) === record.count);
+    if (!searchActive) {{
+      const level = Math.min(SITE_TILES.zoom, map.getZoom() + 1);
+      const groups = new Map();  // quadkey prefix -> [count, count-weighted lat and lon sums]
+      SITE_TILES.tiles.forEach(record => {{
+        if (siteTilesMerged.has(record.key)) return;
+        const count = siteTileCount(record, selection);
+        if (!count) return;
+        unloadedSiteCount += count;
+        if (!showSummaries || record.lat === undefined) return;
+        const group = groups.get(record.key.slice(0, level)) || [0, 0, 0];
+        group[0] += count;
+        group[1] += count * record.lat;
+        group[2] += count * record.lon;
+        groups.set(record.key.slice(0, level), group);
+      }});
+      groups.forEach(([count, lat, lon]) => {{
+        const center = [lat / count, lon / count];
+        const marker = L.marker(center, {{ icon: siteTileIcon(count), zIndexOffset: 300 }});
+        marker.on('click', () => map.setView(center, Math.min(map.getZoom() + 2, SITE_TILE_MIN_ZOOM)));
+        siteTileSummaries.addLayer(marker);
+      }});
+    }}
+    if (showSummaries) siteTileSummaries.addTo(map);
+    else siteTileSummaries.remove();
+    updateVisibleCount();
+  }}
+
+  function updateSiteTiles() {{
+    if (map.getZoom() >= SITE_TILE_MIN_ZOOM) {{
+      const n = 2 ** SITE_TILES.zoom;
+      const b = map.getBounds().pad(SITE_VIEW_PAD);
+      const tile = u => Math.max(0, Math.min(n - 1, Math.floor(u * n)));
+      const [x0, y0] = mercatorUnits(b.getNorth(), b.getWest()).map(tile);
+      const [x1, y1] = mercatorUnits(b.getSouth(), b.getEast()).map(tile);
+      for (let x = x0; x <= x1; x++) {{
+        for (let y = y0; y <= y1; y++) {{
+          const record = siteTilesByKey.get(quadkey(x, y, SITE_TILES.zoom));
+          if (record) loadSiteTile(record);
+        }}
+      }}
+    }}
+    updateSiteTileSummaries();
+  }}
+
+  if (SITE_TILES) {{
+    // Sites without coordinates are in no view: fetch them with the page
+    const unplaced = siteTilesByKey.get({json.dumps(SITE_TILE_UNPLACED)});
+    if (unplaced) loadSiteTile(unplaced);
+    map.on('moveend', updateSiteTiles);
+    updateSiteTiles();
+  }}
+  // ========== END SITE TILES ==========
   
   // Initialize collapsible sections to be collapsed by default
   ['opportunity', 'supply', 'offtake', 'competitors', 'grid', 'gas'].forEach(section => {{
@@ -2677,12 +5587,67 @@ def main():
     )
     ap.add_argument("--heat-radius", type=int, default=20, help="Heatmap radius")
     ap.add_argument("--heat-blur", type=int, default=15, help="Heatmap blur")
+    ap.add_argument(
+        "--marker-renderer",
+        choices=["canvas", "dom"],
+        default="canvas",
+        help="Draw site markers on one shared canvas, or as one SVG/divIcon element per site",
+    )
+    ap.add_argument(
+        "--site-clusters",
+        choices=["on", "off"],
+        default="on",
+        help=f"Group nearby sites of a category into precomputed clusters up to zoom {SITE_CLUSTER_ZOOMS[-1]}",
+    )
+    ap.add_argument(
+        "--network-data",
+        choices=["inline", "sidecar", "tiles"],
+        default="inline",
+        help="Embed grid/gas networks in the HTML, write them to content-hashed JSON files next to it "
+             "that the page fetches on first toggle, or cut them into a z/x/y tile pyramid in "
+             f"<page>.{NETWORK_TILE_DIR}/ fetched by viewport (sidecar and tiles need the page served over HTTP)",
+    )
+    ap.add_argument(
+        "--site-data",
+        choices=["inline", "tiles"],
+        default="inline",
+        help="Embed every site in the HTML, or cut them by quadkey into tiles in "
+             f"<page>.{SITE_TILE_DIR}/ fetched by viewport from zoom 7 (needs the page served over HTTP; "
+             "implies --raster-tiles and --site-clusters off)",
+    )
+    ap.add_argument(
+        "--data-format",
+        choices=["json", "binary"],
+        default="json",
+        help="Format of the network sidecars and site tiles: JSON, or binary files of little-endian "
+             "Float32/Int32 columns behind a JSON header that the page views as typed arrays "
+             "(network tiles stay JSON)",
+    )
+    ap.add_argument(
+        "--raster-tiles",
+        action="store_true",
+        help=f"Prerender the site heatmaps and greenhouse grid into PNG tile pyramids in <page>.{RASTER_TILE_DIR}/ "
+             "shown as tile overlays; heatmaps switch to the in-browser heat layer above the last prerendered "
+             "zoom and while the site filters leave out some of their sites",
+    )
+    ap.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Also write .br and .gz variants of the HTML, network sidecar/tile and site tile files, skipping files "
+             "whose content is unchanged or that are under 1 KB (.br needs the brotli package); without it, "
+             "variants left by an earlier build are removed",
+    )
     
     # OpenRouteService API key for isochrones
     default_ors_key = "eyJvcmciOiI1YjNjZTM1OTc4NTExMTAwMDFjZjYyNDgiLCJpZCI6IjJlZGRmYTM3NTExNzRmMmZhY2U5NWE4YzQ5ZjIwMjI5IiwiaCI6Im11cm11cjY0In0="
     ap.add_argument("--ors-api-key", default=default_ors_key, help="OpenRouteService API key for truck isochrones")
     
     args = ap.parse_args()
+    if args.site_data == "tiles":
+        # The page only knows the sites of the tiles it fetched: whole-map clusters are not
+        # possible and the heatmaps come from the raster pyramid
+        args.site_clusters = "off"
+        args.raster_tiles = True
 
     df = pd.read_csv(args.csv, encoding="latin-1", sep=None, engine="python")
 
@@ -2727,14 +5692,20 @@ def main():
     if not layer_col or not category_col:
         raise ValueError("CSV must contain 'Layer' and 'category' columns")
     
-    # Build the hierarchical structure
-    layer_category_map = {}
-    for layer in df[layer_col].dropna().unique():
-        layer_category_map[layer] = {}
-        layer_df = df[df[layer_col] == layer]
-        for category in layer_df[category_col].dropna().unique():
-            technos = sorted(layer_df[layer_df[category_col] == category][techno_col].dropna().unique().tolist())
-            layer_category_map[layer][category] = technos
+    def column(col, default):
+        """Column values as an object array, or `default` everywhere if the column is absent."""
+        if col and col in df.columns:
+            return df[col].to_numpy(dtype=object)
+        return np.full(len(df), default, dtype=object)
+
+    site_techno = column(techno_col, "")
+    site_layer = column(layer_col, "")
+    site_category = column(category_col, "")
+
+    # Index row positions by (layer, category, techno) once; the legend tree,
+    # heatmap point sets and opportunity grid all slice this index
+    site_index = build_site_index(site_layer, site_category, site_techno)
+    layer_category_map = layer_category_tree(site_index)
     
     # Colors - assign to all technos in order
     palette = [
@@ -2753,184 +5724,152 @@ def main():
     color_map['Greenhouses'] = '#FF6B35'  # Rainbow color (red-yellow mix) for greenhouses
 
     # Sizing strategy
-    cap_scaler = make_scaler(df[capacity_col], args.min_radius, args.max_radius) if capacity_col in df.columns else (lambda v: (args.min_radius + args.max_radius)/2)
-    co2_scaler = make_scaler(df[co2_col], args.min_radius, args.max_radius) if co2_col and (co2_col in df.columns) else (lambda v: (args.min_radius + args.max_radius)/2)
-    kt_scaler = make_scaler(df[capacity_kt_col], args.min_radius, args.max_radius) if capacity_kt_col and (capacity_kt_col in df.columns) else (lambda v: (args.min_radius + args.max_radius)/2)
-
-    def pick_radius(layer: str, category: str, cap_val, co2_val, kt_val):
-        if args.size_by == "capacity":
-            if category in ['E-methanol', 'E-SAF']:
-                return kt_scaler(kt_val)
-            else:
-                return cap_scaler(cap_val)
-        if args.size_by == "co2":
-            return co2_scaler(co2_val)
-        # auto
-        if layer == 'Supply':
-            return cap_scaler(cap_val)
-        elif layer == 'Offtake':
-            if category in ['E-methanol', 'E-SAF']:
-                return kt_scaler(kt_val)
-            else:
-                return co2_scaler(co2_val)
-        elif layer == 'Competitors':
-            return co2_scaler(co2_val)
-        else:
-            return cap_scaler(cap_val)
+    mid_radius = (args.min_radius + args.max_radius) / 2
+    cap_scaler = make_scaler(df[capacity_col], args.min_radius, args.max_radius) if capacity_col in df.columns else (lambda v: mid_radius)
+    co2_scaler = make_scaler(df[co2_col], args.min_radius, args.max_radius) if co2_col and (co2_col in df.columns) else (lambda v: mid_radius)
+    kt_scaler = make_scaler(df[capacity_kt_col], args.min_radius, args.max_radius) if capacity_kt_col and (capacity_kt_col in df.columns) else (lambda v: mid_radius)
+
+    cap = column(capacity_col, None)
+    co2 = column(co2_col, None)
+    kt = column(capacity_kt_col, None)
+
+    # Radii per metric, computed once for all rows
+    cap_radius = cap_scaler(cap)
+    co2_radius = co2_scaler(co2)
+    kt_radius = kt_scaler(kt)
+
+    # Pick the sizing metric per row: (condition, radius, label, value), first match wins
+    is_kt_category = np.isin(site_category, ['E-methanol', 'E-SAF'])
+    is_supply = site_layer == 'Supply'
+    is_offtake = site_layer == 'Offtake'
+    is_competitors = site_layer == 'Competitors'
+    if args.size_by == "capacity":
+        rules = [
+            (is_kt_category, kt_radius, "Capacity (kt/year)", kt),
+        ]
+        default = (cap_radius, "Capacity (GWh/year)", cap)
+    elif args.size_by == "co2":
+        rules = []
+        default = (co2_radius, "bioCO₂ injection potential (t/y)", co2)
+    else:  # auto
+        rules = [
+            (is_supply, cap_radius, "Capacity (GWh/year)", cap),
+            (is_offtake & is_kt_category, kt_radius, "Capacity (kt/year)", kt),
+            (is_offtake, co2_radius, "bioCO₂ injection potential (t/y)", co2),
+            (is_competitors, co2_radius, "CO₂ capacity (t/y)", co2),
+        ]
+        default = (cap_radius, "Capacity (GWh/year)", cap)
+    conditions = [np.asarray(r[0], dtype=bool) for r in rules]
+
+    def select(k, dtype):
+        choices = [np.broadcast_to(np.asarray(r[k], dtype=dtype), (len(df),)) for r in rules]
+        fallback = np.broadcast_to(np.asarray(default[k - 1], dtype=dtype), (len(df),))
+        if not conditions:
+            return fallback.copy()
+        return np.select(conditions, choices, default=fallback)
+
+    radius = select(1, float)
+    metric_label = select(2, object)
+    metric_value = select(3, object)
 
     # Compose site data
-    site_data = []
-    for r in df.to_dict(orient="records"):
-        t = r.get(techno_col, "")
-        layer = r.get(layer_col, "")
-        category = r.get(category_col, "")
-        cap = r.get(capacity_col, None) if capacity_col in r else None
-        co2 = r.get(co2_col, None) if co2_col and (co2_col in r) else None
-        kt = r.get(capacity_kt_col, None) if capacity_kt_col and (capacity_kt_col in r) else None
-        is_eiffel = bool(r.get(eiffel_col, 0)) if eiffel_col else False
-        eiffel_project = r.get(eiffel_project_col, "") if eiffel_project_col else ""
-
-        radius = float(pick_radius(layer, category, cap, co2, kt))
-        
-        if args.size_by == "capacity":
-            if category in ['E-methanol', 'E-SAF']:
-                metric_label = "Capacity (kt/year)"
-                metric_value = kt
-            else:
-                metric_label = "Capacity (GWh/year)"
-                metric_value = cap
-        elif args.size_by == "co2":
-            metric_label = "bioCO₂ injection potential (t/y)"
-            metric_value = co2
-        else:  # auto
-            if layer == 'Supply':
-                metric_label = "Capacity (GWh/year)"
-                metric_value = cap
-            elif layer == 'Offtake':
-                if category in ['E-methanol', 'E-SAF']:
-                    metric_label = "Capacity (kt/year)"
-                    metric_value = kt
-                else:
-                    metric_label = "bioCO₂ injection potential (t/y)"
-                    metric_value = co2
-            elif layer == 'Competitors':
-                metric_label = "CO₂ capacity (t/y)"
-                metric_value = co2
-            else:
-                metric_label = "Capacity (GWh/year)"
-                metric_value = cap
-
-        site_data.append({
-            "techno": t,
-            "layer": layer,
-            "category": category,
-            "status": r.get(status_col, ""),
-            "lat": float(r.get(lat_col)),
-            "lon": float(r.get(lon_col)),
-            "operator": r.get("operator", ""),
-            "production_demand": r.get("production/demand", ""),
-            "capacity_gwh_year": cap,
-            "capacity_kt_per_year": kt,
-            "co2_injection_potential_tpy": co2,
-            "site_info": r.get("site_info", ""),
-            "municipality": r.get(municipality_col, "") if municipality_col else "",
-            "color": color_map.get(t, "#000000"),
-            "radius": radius,
-            "size_metric_label": metric_label,
-            "size_metric_value": metric_value,
-            "is_eiffel": is_eiffel,
-            "eiffel_project_name": eiffel_project
-        })
+    site_columns = {
+        "techno": site_techno,
+        "layer": site_layer,
+        "category": site_category,
+        "status": column(status_col, ""),
+        "lat": df[lat_col].to_numpy(dtype=float),
+        "lon": df[lon_col].to_numpy(dtype=float),
+        "operator": column("operator", ""),
+        "production_demand": column("production/demand", ""),
+        "capacity_gwh_year": cap,
+        "capacity_kt_per_year": kt,
+        "co2_injection_potential_tpy": co2,
+        "site_info": column("site_info", ""),
+        "municipality": column(municipality_col, ""),
+        "color": pd.Series(site_techno, dtype=object).map(color_map).fillna("#000000").to_numpy(dtype=object),
+        "radius": radius,
+        "size_metric_label": metric_label,
+        "size_metric_value": metric_value,
+        "is_eiffel": column(eiffel_col, 0).astype(bool),
+        "eiffel_project_name": column(eiffel_project_col, ""),
+        "capacity_bucket": capacity_buckets(site_techno, cap),
+    }
 
     # Read Greenhouses data
-    greenhouses_data = []
+    site_lat = df[lat_col].to_numpy(dtype=float)
+    site_lon = df[lon_col].to_numpy(dtype=float)
+    greenhouse_df = None
     try:
-        greenhouse_df = pd.read_csv("ghg_intensity.csv", sep=";", encoding="latin-1")
-        # Create transformer from EPSG:3035 (ETRS89 / LAEA Europe) to WGS84 (EPSG:4326)
-        transformer = Transformer.from_crs("EPSG:3035", "EPSG:4326", always_xy=True)
+        greenhouse_df = load_greenhouses("ghg_intensity.csv")
+        n_greenhouses = len(greenhouse_df)
         
-        # Find min/max prob_mean for color scaling
-        prob_values = []
-        for _, row in greenhouse_df.iterrows():
-            prob_mean = float(str(row['prob_mean']).replace(',', '.'))
-            prob_values.append(prob_mean)
+        greenhouse_columns = {
+            "techno": np.full(n_greenhouses, "Greenhouses", dtype=object),
+            "layer": np.full(n_greenhouses, "Offtake", dtype=object),
+            "category": np.full(n_greenhouses, "Greenhouses", dtype=object),
+            "status": np.full(n_greenhouses, "", dtype=object),
+            "lat": greenhouse_df["lat"].to_numpy(),
+            "lon": greenhouse_df["lon"].to_numpy(),
+            "operator": np.full(n_greenhouses, "", dtype=object),
+            "production_demand": np.full(n_greenhouses, "", dtype=object),
+            "capacity_gwh_year": np.zeros(n_greenhouses, dtype=object),
+            "capacity_kt_per_year": np.zeros(n_greenhouses, dtype=object),
+            "co2_injection_potential_tpy": np.zeros(n_greenhouses, dtype=object),
+            "site_info": greenhouse_df["prob_mean"].map("Probability: {:.2f}".format).to_numpy(dtype=object),
+            "municipality": np.full(n_greenhouses, "", dtype=object),
+            "color": greenhouse_df["color"].to_numpy(dtype=object),
+            "radius": np.full(n_greenhouses, 6, dtype=object),
+            "size_metric_label": np.full(n_greenhouses, "Probability", dtype=object),
+            "size_metric_value": greenhouse_df["prob_mean"].to_numpy(dtype=object),
+            "is_eiffel": np.zeros(n_greenhouses, dtype=bool),
+            "eiffel_project_name": np.full(n_greenhouses, "", dtype=object),
+            "capacity_bucket": np.full(n_greenhouses, "", dtype=object),
+        }
         
-        min_prob = min(prob_values)
-        max_prob = max(prob_values)
-        
-        for idx, row in greenhouse_df.iterrows():
-            x_center = float(str(row['x_center_m']).replace(',', '.'))
-            y_center = float(str(row['y_center_m']).replace(',', '.'))
-            prob_mean = float(str(row['prob_mean']).replace(',', '.'))
-            
-            # Transform from EPSG:3035 to lat/lon (WGS84)
-            lon, lat = transformer.transform(x_center, y_center)
-            
-            # Calculate color based on prob_mean (higher = darker)
-            # Normalize prob_mean to 0-1 range
-            normalized = (prob_mean - min_prob) / (max_prob - min_prob) if max_prob > min_prob else 0.5
-            
-            # Generate color from light yellow to dark red
-            if normalized < 0.25:
-                color = '#FFEB3B'  # Light yellow
-            elif normalized < 0.5:
-                color = '#FFA726'  # Orange
-            elif normalized < 0.75:
-                color = '#FF5722'  # Deep orange
-            else:
-                color = '#B71C1C'  # Dark red
-            
-            greenhouses_data.append({
-                "techno": "Greenhouses",
-                "layer": "Offtake",
-                "category": "Greenhouses",
-                "status": "",
-                "lat": lat,
-                "lon": lon,
-                "operator": "",
-                "production_demand": "",
-                "capacity_gwh_year": 0,
-                "capacity_kt_per_year": 0,
-                "co2_injection_potential_tpy": 0,
-                "site_info": f"Probability: {prob_mean:.2f}",
-                "municipality": "",
-                "color": color,
-                "radius": 6,
-                "size_metric_label": "Probability",
-                "size_metric_value": prob_mean,
-                "is_eiffel": False,
-                "eiffel_project_name": ""
-            })
-        
-        # Add greenhouses to site_data
-        site_data.extend(greenhouses_data)
+        # Add greenhouses to the site columns and the site index
+        greenhouse_rows = np.arange(len(site_lat), len(site_lat) + n_greenhouses)
+        site_columns = concat_columns(site_columns, greenhouse_columns)
+        site_lat = np.concatenate([site_lat, greenhouse_df["lat"].to_numpy()])
+        site_lon = np.concatenate([site_lon, greenhouse_df["lon"].to_numpy()])
+        greenhouse_key = ("Offtake", "Greenhouses", "Greenhouses")
+        site_index[greenhouse_key] = np.concatenate([site_index.get(greenhouse_key, np.zeros(0, dtype=np.intp)), greenhouse_rows])
         
         # Add Greenhouses to layer_category_map
         if 'Offtake' not in layer_category_map:
             layer_category_map['Offtake'] = {}
         layer_category_map['Offtake']['Greenhouses'] = ['Greenhouses']
         
-        print(f"Loaded {len(greenhouses_data)} Greenhouses points")
+        print(f"Loaded {n_greenhouses} Greenhouses points")
     except Exception as e:
         print(f"Warning: Could not load Greenhouses data: {e}")
         import traceback
         traceback.print_exc()
-        greenhouses_data = []
 
-    # Heatmap datasets
-    biogaz_points = [[s["lat"], s["lon"], 1] for s in site_data if norm(s["techno"]) == "biogaz"]
-    biomethane_points = [[s["lat"], s["lon"], 1] for s in site_data if norm(s["techno"]) == "biomethane"]
-    
-    # Category-based heatmaps for Supply
-    feedstock_points = [[s["lat"], s["lon"], 1] for s in site_data if s["category"] == "Feedstock"]
-    
-    # Category-based heatmaps for Competitors
-    papeterie_points = [[s["lat"], s["lon"], 1] for s in site_data if s["category"] == "Papeterie"]
-    
-    # Layer-based heatmaps
-    supply_points = [[s["lat"], s["lon"], 1] for s in site_data if s["layer"] == "Supply"]
-    offtake_points = [[s["lat"], s["lon"], 1] for s in site_data if s["layer"] == "Offtake"]
-    competitors_points = [[s["lat"], s["lon"], 1] for s in site_data if s["layer"] == "Competitors"]
+    if args.site_data == "tiles":
+        # Each tile holds a contiguous run of sites, so sites are ordered by quadkey
+        site_quadkey = site_quadkeys(site_columns["lat"], site_columns["lon"])
+        order = np.argsort(site_quadkey, kind="stable")
+        site_columns = {k: np.asarray(v)[order] for k, v in site_columns.items()}
+        site_quadkey = site_quadkey[order]
+    site_data = encode_site_columns(site_columns)
+
+    site_clusters = None
+    if args.site_clusters == "on":
+        group, _ = pd.factorize(pd.Series(zip(site_columns["layer"], site_columns["category"])))
+        site_clusters = build_site_clusters(
+            pd.to_numeric(pd.Series(site_columns["lat"]), errors="coerce").to_numpy(dtype=float),
+            pd.to_numeric(pd.Series(site_columns["lon"]), errors="coerce").to_numpy(dtype=float),
+            group,
+            {k: pd.to_numeric(pd.Series(site_columns[k]), errors="coerce").to_numpy(dtype=float) for k in SITE_CLUSTER_METRICS},
+        )
+        level_sizes = ", ".join(f"z{level['zoom']}: {len(level['count'])}" for level in site_clusters["levels"])
+        print(f"Multi-site clusters per zoom: {level_sizes}")
+
+    # Layer point sets feeding the opportunity heatmap (site heatmaps are drawn from SITES)
+    supply_points = heat_points(site_lat, site_lon, select_rows(site_index, lambda l, c, t: l == "Supply"))
+    offtake_points = heat_points(site_lat, site_lon, select_rows(site_index, lambda l, c, t: l == "Offtake"))
+    competitors_points = heat_points(site_lat, site_lon, select_rows(site_index, lambda l, c, t: l == "Competitors"))
 
     ### >>> OPPORTUNITY HEATMAP ADDITION <<<
     # Compute opportunity heatmap: supply + offtake - competitors
@@ -2942,92 +5881,25 @@ def main():
 
     ### >>> ELECTRICITY NETWORK ADDITION <<<
     # Load electricity network nodes and edges
-    grid_nodes = []
-    grid_edges = []
     try:
-        # Load nodes
-        nodes_df = pd.read_csv("entsoe_Node.csv", encoding="latin-1")
-        for _, row in nodes_df.iterrows():
-            grid_nodes.append({
-                "lat": float(row["lat"]),
-                "lon": float(row["lon"]),
-                "symbol": row.get("Symbol", "Substation")
-            })
+        grid_nodes = load_grid_table("entsoe_Node.csv", GRID_NODE_COLUMNS, "Substation")
+        grid_edges = load_grid_table("entsoe_Edge.csv", GRID_EDGE_COLUMNS, "Transmission Line")
         
-        # Load edges
-        edges_df = pd.read_csv("entsoe_Edge.csv", encoding="latin-1")
-        for _, row in edges_df.iterrows():
-            grid_edges.append({
-                "start_lat": float(row["start_lat"]),
-                "start_lon": float(row["start_lon"]),
-                "end_lat": float(row["end_lat"]),
-                "end_lon": float(row["end_lon"]),
-                "symbol": row.get("Symbol", "Transmission Line")
-            })
-        
-        print(f"Loaded {len(grid_nodes)} electricity grid nodes")
-        print(f"Loaded {len(grid_edges)} electricity grid edges")
+        print(f"Loaded {len(grid_nodes['lat'])} electricity grid nodes")
+        print(f"Loaded {len(grid_edges['start_lat'])} electricity grid edges")
     except Exception as e:
         print(f"Warning: Could not load electricity network data: {e}")
-        grid_nodes = []
-        grid_edges = []
+        grid_nodes = empty_grid_table(GRID_NODE_COLUMNS)
+        grid_edges = empty_grid_table(GRID_EDGE_COLUMNS)
     ### <<< END ELECTRICITY NETWORK ADDITION <<<
 
     ### >>> GAS NETWORK ADDITION <<<
     # Load gas pipeline network from GeoJSON
     gas_pipelines = []
     try:
-        import json
         geojson_path = "Europe Gas Tracker/GEM-EGT-Gas-Hydrogen-Pipelines-2025-01.geojson"
-        with open(geojson_path, 'r', encoding='utf-8') as f:
-            gas_data = json.load(f)
-        
-        for feature in gas_data['features']:
-            props = feature['properties']
-            geom = feature['geometry']
-            geom_type = geom['type']
-            
-            # Skip features with no geometry
-            if geom_type == 'GeometryCollection' and not geom.get('geometries'):
-                continue
-            
-            # Extract coordinates based on geometry type
-            coords_list = []
-            if geom_type == 'LineString':
-                coords_list = [geom['coordinates']]
-            elif geom_type == 'MultiLineString':
-                coords_list = geom['coordinates']
-            elif geom_type == 'GeometryCollection':
-                for sub_geom in geom.get('geometries', []):
-                    if sub_geom['type'] == 'LineString':
-                        coords_list.append(sub_geom['coordinates'])
-                    elif sub_geom['type'] == 'MultiLineString':
-                        coords_list.extend(sub_geom['coordinates'])
-            
-            # Store pipeline data
-            for coords in coords_list:
-                if coords and len(coords) > 1:
-                    gas_pipelines.append({
-                        "coordinates": [[lat, lon] for lon, lat in coords],  # Swap to [lat, lon]
-                        "name": props.get('PipelineName', 'N/A'),
-                        "segment": props.get('SegmentName', 'N/A'),
-                        "status": props.get('Status', 'N/A'),
-                        "fuel": props.get('Fuel', 'N/A'),
-                        "countries": props.get('Countries', 'N/A'),
-                        "owner": props.get('Owner', 'N/A'),
-                        "parent": props.get('Parent', 'N/A'),
-                        "start_year": props.get('StartYear1', 'N/A'),
-                        "capacity": props.get('Capacity', 'N/A'),
-                        "capacity_units": props.get('CapacityUnits', ''),
-                        "length": props.get('LengthMergedKm', 'N/A'),
-                        "diameter": props.get('Diameter', 'N/A'),
-                        "diameter_units": props.get('DiameterUnits', ''),
-                        "fuel_source": props.get('FuelSource', 'N/A'),
-                        "start_location": props.get('StartLocation', 'N/A'),
-                        "start_country": props.get('StartCountry', 'N/A'),
-                        "end_location": props.get('EndLocation', 'N/A'),
-                        "end_country": props.get('EndCountry', 'N/A')
-                    })
+        gas_pipelines = load_gas_pipelines(geojson_path)
+        simplify_gas_pipelines(gas_pipelines)
         
         print(f"Loaded {len(gas_pipelines)} gas pipeline segments")
     except Exception as e:
@@ -3035,6 +5907,72 @@ def main():
         gas_pipelines = []
     ### <<< END GAS NETWORK ADDITION <<<
 
+    # Network sidecars / tile pyramid
+    out_dir = Path(args.out).parent
+    output_files = [Path(args.out)]
+    network_files = {}
+    network_tiles = None
+    if args.network_data == "sidecar":
+        binary = args.data_format == "binary"
+        for name, payload in network_payloads(grid_nodes, grid_edges, gas_pipelines, binary=binary).items():
+            # The page's name is part of the stem, so pages built into one directory keep their own sidecars
+            network_files[name] = write_sidecar(out_dir, f"{Path(args.out).stem}.{name.lower()}", payload)
+            output_files.append(out_dir / network_files[name])
+            print(f"Wrote {name} sidecar {network_files[name]} ({len(payload) / 1e6:.2f} MB)")
+    elif args.network_data == "tiles":
+        tile_files = network_tile_files(grid_nodes, grid_edges, gas_pipelines)
+        network_dir = page_tree_dir(args.out, NETWORK_TILE_DIR)
+        output_files += write_file_tree(out_dir / network_dir, tile_files)
+        digest = hashlib.sha256()
+        for rel in sorted(tile_files):
+            digest.update(rel.encode("utf-8") + b"\0" + tile_files[rel].encode("utf-8"))
+        network_tiles = {"url": network_dir + "/", "version": digest.hexdigest()[:SIDECAR_HASH_LENGTH]}
+        print(f"Wrote {len(tile_files)} network tile files to {out_dir / network_dir} "
+              f"({sum(map(len, tile_files.values())) / 1e6:.2f} MB)")
+
+    # Site tiles
+    site_tiles = None
+    # Tiled sites fetch their search index from the site tiles (see site_tile_files)
+    search_index = build_search_index(site_data) if args.site_data == "inline" else None
+    if args.site_data == "tiles":
+        site_files, site_meta, tile_list = site_tile_files(
+            site_data, site_quadkey, site_columns["lat"], site_columns["lon"], binary=args.data_format == "binary"
+        )
+        site_dir = page_tree_dir(args.out, SITE_TILE_DIR)
+        output_files += write_file_tree(out_dir / site_dir, site_files)
+        digest = hashlib.sha256()
+        for rel, payload in sorted(site_files.items()):
+            digest.update(rel.encode("utf-8") + b"\0" + (payload if isinstance(payload, bytes) else payload.encode("utf-8")))
+        site_data = {"n": site_data["n"], "columns": site_meta}
+        site_tiles = {"url": site_dir + "/", "version": digest.hexdigest()[:SIDECAR_HASH_LENGTH],
+                      "zoom": SITE_TILE_ZOOM, "format": args.data_format, "search": SITE_TILE_SEARCH,
+                      "tiles": tile_list}
+        if args.data_format == "binary":
+            # Column order and type of every binary tile (see site_tile_binary)
+            site_tiles["columns"] = [[name, SITE_BINARY_TYPES[col["type"]]] for name, col in site_meta.items()]
+        print(f"Wrote {len(site_files)} site tile files to {out_dir / site_dir} "
+              f"({sum(map(len, site_files.values())) / 1e6:.2f} MB)")
+
+    # Heat / greenhouse raster tile pyramids (PNGs are already compressed, so not precompressed)
+    raster_tiles = None
+    if args.raster_tiles:
+        try:
+            raster_files, raster_layers = raster_tile_files(site_columns, greenhouse_df, args.heat_radius, args.heat_blur)
+            raster_dir = page_tree_dir(args.out, RASTER_TILE_DIR)
+            write_file_tree(out_dir / raster_dir, raster_files)
+            digest = hashlib.sha256()
+            for rel in sorted(raster_files):
+                digest.update(rel.encode("utf-8") + b"\0" + raster_files[rel])
+            raster_tiles = {"url": raster_dir + "/", "version": digest.hexdigest()[:SIDECAR_HASH_LENGTH],
+                            "layers": raster_layers}
+            print(f"Wrote {len(raster_files)} raster tiles for {len(raster_layers)} layers to {out_dir / raster_dir} "
+                  f"({sum(map(len, raster_files.values())) / 1e6:.2f} MB)")
+        except Exception as e:
+            if args.site_data == "tiles":
+                # Tiled sites rely on the pyramids for heat below the fetched tiles: no fallback
+                raise RuntimeError("Could not render the raster tiles that --site-data tiles requires") from e
+            print(f"Warning: Could not render raster tiles: {e}")
+
     # Bounds
     min_lat, max_lat = float(df[lat_col].min()), float(df[lat_col].max())
     min_lon, max_lon = float(df[lon_col].min()), float(df[lon_col].max())
@@ -3044,10 +5982,6 @@ def main():
         color_map=color_map,
         layer_category_map=layer_category_map,
         bounds=(min_lat, min_lon, max_lat, max_lon),
-        biogaz_points=biogaz_points,
-        biomethane_points=biomethane_points,
-        feedstock_points=feedstock_points,  # >>> NEW FEEDSTOCK HEATMAP <<<
-        papeterie_points=papeterie_points,  # >>> NEW PAPETERIE HEATMAP <<<
         supply_points=supply_points,
         offtake_points=offtake_points,
         competitors_points=competitors_points,
@@ -3061,11 +5995,27 @@ def main():
         heat_radius=args.heat_radius,
         heat_blur=args.heat_blur,
         ors_api_key=args.ors_api_key,
+        marker_renderer=args.marker_renderer,
+        site_clusters=site_clusters,
+        search_index=search_index,
+        network_files=network_files,
+        network_tiles=network_tiles,
+        raster_tiles=raster_tiles,
+        site_tiles=site_tiles,
     )
 
     Path(args.out).write_text(html, encoding="utf-8")
     print(f"✅ Wrote {args.out}")
 
+    if args.precompress:
+        precompress_outputs(output_files)
+    else:
+        # Variants from an earlier --precompress build would be served instead of these outputs
+        removed = remove_precompressed(output_files)
+        (out_dir / PRECOMPRESS_MANIFEST).unlink(missing_ok=True)
+        if removed:
+            print(f"Removed {removed} precompressed file(s) left by an earlier build")
+
 
 if __name__ == "__main__":
     main()
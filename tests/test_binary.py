@@ -0,0 +1,93 @@
+"""`pack_binary` buffers, read back with np.frombuffer as the page's unpackBinary reads them."""
+import json
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from generate_map import (  # noqa: E402
+    BINARY_ALIGN, BINARY_TYPES, SITE_BINARY_TYPES, encode_site_columns, pack_binary, site_quadkeys, site_tile_files,
+)
+
+
+def unpack(buffer, layout=None, count=None):
+    """(header, {name: array}) of a pack_binary buffer.
+
+    Files without a column table (site tiles) are read as `count` rows of
+    each [name, type] of `layout`, as the page's binaryLayout lays them out.
+    """
+    (length,) = struct.unpack_from("<I", buffer)
+    header = json.loads(buffer[4:4 + length].decode("utf-8"))
+    start = -(-(4 + length) // BINARY_ALIGN) * BINARY_ALIGN
+    assert buffer[4 + length:start] == b"\0" * (start - 4 - length)
+    if layout is None:
+        table = header.pop("columns")
+    else:
+        table, offset = {}, 0
+        for name, kind in layout:
+            offset += -offset % BINARY_ALIGN
+            table[name] = {"type": kind, "offset": offset, "length": count}
+            offset += count * np.dtype(BINARY_TYPES[kind]).itemsize
+        assert start + offset == len(buffer)
+    columns = {}
+    for name, col in table.items():
+        assert col["offset"] % BINARY_ALIGN == 0
+        columns[name] = np.frombuffer(buffer, BINARY_TYPES[col["type"]], col["length"], start + col["offset"])
+    return header, columns
+
+
+def test_pack_binary_aligns_columns_after_the_header():
+    buffer = pack_binary(
+        {"flags": ("uint8", [1, 0, 1]), "x": ("float32", [0.5, -2.0]), "ids": ("int32", [7])},
+        {"name": "é"},  # non-ASCII: the header length counts bytes
+    )
+    header, columns = unpack(buffer)
+    assert header == {"name": "é"}
+    assert columns["flags"].tolist() == [1, 0, 1]
+    assert columns["x"].tolist() == [0.5, -2.0]
+    assert columns["ids"].tolist() == [7]
+
+
+def test_binary_site_tiles_match_the_json_tiles():
+    # Two sites near Paris, one in London and one without coordinates, sorted by quadkey
+    columns = {
+        "techno": ["A", "B", "A", "C"],
+        "status": ["x", "y", "x", "x"],
+        "capacity_bucket": ["s", "m", "s", "l"],
+        "lat": [48.85, 48.86, None, 51.5],
+        "lon": [2.35, 2.36, None, -0.12],
+        "operator": ["Op1", "Op2", "Op1", "Op3"],
+        "capacity_gwh_year": [1.5, None, float("nan"), 3.25],
+        "is_eiffel": [True, False, False, True],
+    }
+    keys = site_quadkeys(columns["lat"], columns["lon"])
+    order = np.argsort(keys, kind="stable")
+    columns = {name: [values[i] for i in order] for name, values in columns.items()}
+    site_data = encode_site_columns(columns)
+    json_files, meta, tiles = site_tile_files(site_data, keys[order], columns["lat"], columns["lon"])
+    bin_files, _, _ = site_tile_files(site_data, keys[order], columns["lat"], columns["lon"], binary=True)
+    layout = [[name, SITE_BINARY_TYPES[col["type"]]] for name, col in meta.items()]
+
+    nulls = 0
+    for record in tiles:
+        tile = json.loads(json_files[f"{record['key']}.json"])["columns"]
+        header, packed = unpack(bin_files[f"{record['key']}.bin"], layout, record["count"])
+        for name, part in tile.items():
+            kind = meta[name]["type"]
+            if kind == "dict":
+                assert packed[name].tolist() == part["codes"]
+                if "values" in part:
+                    assert header["dicts"][name] == {k: v for k, v in part.items() if k != "codes"}
+                continue
+            expected = np.array(part["values"], dtype=float)  # null metrics are NaN
+            if kind == "coord":
+                null = header.get("null", {}).get(name, [])
+                assert null == np.flatnonzero(np.isnan(expected)).tolist()
+                nulls += len(null)
+                expected[null] = 0
+            np.testing.assert_array_equal(packed[name], expected.astype(BINARY_TYPES[SITE_BINARY_TYPES[kind]]))
+            assert header.get("none", {}).get(name) == part.get("none")
+    assert nulls == 2  # lat and lon of the unplaced site
@@ -0,0 +1,90 @@
+"""Network tiles: polylines cut at tile edges and quantized to NETWORK_TILE_EXTENT units per tile."""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from generate_map import (  # noqa: E402
+    NETWORK_TILE_DIR, NETWORK_TILE_EXTENT, NETWORK_TILE_ZOOMS, network_tile_files, page_tree_dir, quantize_piece,
+    split_polyline_by_tile, write_file_tree,
+)
+
+E = NETWORK_TILE_EXTENT
+
+
+def pieces(points):
+    """split_polyline_by_tile of global pixel `points`, pieces as lists of [x, y]."""
+    split = split_polyline_by_tile(np.array(points, dtype=float))
+    return {tile: [piece.tolist() for piece in tile_pieces] for tile, tile_pieces in split.items()}
+
+
+def test_segment_crossing_a_tile_edge_is_cut_at_the_edge():
+    # x = E at t = (E - 1000) / 4000 = 0.774, so y = 500 + 0.774 * 200 = 654.8
+    split = pieces([(1000, 500), (E + 904, 700)])
+    assert split.keys() == {(0, 0), (1, 0)}
+    np.testing.assert_allclose(split[(0, 0)], [[[1000, 500], [E, 654.8]]])
+    np.testing.assert_allclose(split[(1, 0)], [[[E, 654.8], [E + 904, 700]]])
+    assert quantize_piece(np.array(split[(0, 0)][0]), (0, 0)) == [1000, 500, E, 655]
+    assert quantize_piece(np.array(split[(1, 0)][0]), (1, 0)) == [0, 655, 904, 700]
+
+
+def test_segment_on_a_tile_edge_stays_in_one_tile():
+    # Points on an edge belong to the tile starting there, so nothing is clipped
+    assert pieces([(E, 100), (E, 900)]) == {(1, 0): [[[E, 100], [E, 900]]]}
+    assert pieces([(100, E), (900, E)]) == {(0, 1): [[[100, E], [900, E]]]}
+
+
+def test_polyline_leaving_and_reentering_a_tile_gives_two_pieces():
+    # The way back crosses x = E at t = 904 / 4000 = 0.226, so y = 1000 + 0.226 * 1000 = 1226
+    split = pieces([(1000, 1000), (E + 904, 1000), (1000, 2000)])
+    assert split.keys() == {(0, 0), (1, 0)}
+    np.testing.assert_allclose(split[(0, 0)][0], [[1000, 1000], [E, 1000]])
+    np.testing.assert_allclose(split[(0, 0)][1], [[E, 1226], [1000, 2000]])
+    np.testing.assert_allclose(split[(1, 0)], [[[E, 1000], [E + 904, 1000], [E, 1226]]])
+
+
+def test_quantize_piece_drops_repeated_and_degenerate_points():
+    assert quantize_piece(np.array([[E, E], [E, E]], dtype=float), (1, 0)) == []
+    assert quantize_piece(np.array([[10.2, 5], [10.4, 5], [20, 5]]), (0, 0)) == [10, 5, 20, 5]
+
+
+def test_grid_edge_across_the_prime_meridian_is_split_into_two_tiles():
+    edges = {
+        "start_lat": np.array([10.0]), "start_lon": np.array([-0.01]),
+        "end_lat": np.array([10.0]), "end_lon": np.array([0.01]),
+        "symbols": ["Line 380 kV"], "symbol": np.array([0], dtype=np.int8),
+    }
+    files = network_tile_files(None, edges, None)
+    z = NETWORK_TILE_ZOOMS[-1]
+    half = 2 ** z // 2
+    # Longitude 0 is the edge between tiles half - 1 and half; 0.01 degrees is
+    # 0.01 / 360 * 2**z * E = 116.51 units at z10, rounded to 117
+    dx = round(0.01 / 360 * 2 ** z * E)
+    top = {path: json.loads(text) for path, text in files.items() if path.startswith(f"grid/{z}/")}
+    assert len(top) == 2
+    (left_path, left), (right_path, right) = sorted(top.items())
+    assert left_path.startswith(f"grid/{z}/{half - 1}/") and right_path.startswith(f"grid/{z}/{half}/")
+    code, x0, y0, x1, y1 = left["edges"]
+    assert (code, x0, x1) == (0, E - dx, E) and y0 == y1
+    assert right["edges"] == [0, 0, y0, dx, y0]
+    index = json.loads(files["grid/index.json"])
+    assert {f"{z}/{half - 1}", f"{z}/{half}"} <= {tile.rsplit("/", 1)[0] for tile in index["tiles"]}
+    assert not any(path.startswith("gas/") and path != "gas/index.json" for path in files)
+
+
+def test_pages_in_one_directory_keep_separate_tile_trees(tmp_path):
+    a_dir, b_dir = (page_tree_dir(tmp_path / page, NETWORK_TILE_DIR) for page in ("a.html", "b.html"))
+    assert (a_dir, b_dir) == ("a.network_tiles", "b.network_tiles")
+    write_file_tree(tmp_path / a_dir, {"grid/4/8/5.json": "a", "grid/index.json": "{}"})
+    (tmp_path / a_dir / "grid/index.json.gz").write_bytes(b"a")
+    # Rebuilding b prunes b's stale tiles, never a's
+    write_file_tree(tmp_path / b_dir, {"grid/4/8/6.json": "old"})
+    write_file_tree(tmp_path / b_dir, {"gas/4/8/6.json": "b"})
+    files = {p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*") if p.is_file()}
+    assert files == {
+        "a.network_tiles/grid/4/8/5.json", "a.network_tiles/grid/index.json", "a.network_tiles/grid/index.json.gz",
+        "b.network_tiles/gas/4/8/6.json",
+    }
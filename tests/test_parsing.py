@@ -0,0 +1,92 @@
+"""Input parsing: `to_num_series` must match the scalar `parse_num`, and the
+streaming `iter_geojson_features` must match `json.load`."""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from generate_map import NAN_TOKENS, iter_geojson_features, parse_num, to_num_series  # noqa: E402
+
+RANGES = ["370-450", "370–450", "370—450", "370−450", "370 à 450", "370à450", "1,5-2,5", " 10 - 20 "]
+DECIMAL_COMMAS = ["12,5", "0,75", "1 234,5", "-3,25"]
+NBSPS = ["1\xa0234", "1\xa0234,5", "\xa045\xa0"]
+PREFIXES_SUFFIXES = [">450", "~450", "450+", "<12,5", "+7", "-7", "≈ 30", ">450-500", "10+/-2"]
+UNITS = ["450 GWh/an", "12 MW", "3,5 kt/an", "1 200 tCO2/yr", "20 Nm3/h", "GWh 80", "kt"]
+EMPTY = ["", "   ", np.nan, None]
+TOKENS = sorted(NAN_TOKENS) + [t.upper() for t in sorted(NAN_TOKENS)] + [f" {t} " for t in sorted(NAN_TOKENS)]
+MIXED = ["abc", "12", "12.0", "12.5.3", "1-2-3", "--5", "0", "3e5"]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [RANGES, DECIMAL_COMMAS, NBSPS, PREFIXES_SUFFIXES, UNITS, EMPTY, TOKENS, MIXED],
+    ids=["ranges", "decimal-commas", "nbsp", "prefixes-suffixes", "units", "empty", "nan-tokens", "mixed"],
+)
+def test_to_num_series_matches_parse_num(values):
+    s = pd.Series(values, dtype=object)
+    expected = s.map(parse_num).astype(float)
+    pd.testing.assert_series_equal(to_num_series(s), expected, check_names=False)
+
+
+def test_to_num_series_repeated_values_and_index():
+    values = RANGES + DECIMAL_COMMAS + UNITS + EMPTY + TOKENS
+    s = pd.Series(values * 3, index=np.arange(len(values) * 3)[::-1], dtype=object)
+    pd.testing.assert_series_equal(to_num_series(s), s.map(parse_num).astype(float), check_names=False)
+
+
+def test_to_num_series_all_missing():
+    s = pd.Series([np.nan, None], dtype=object)
+    assert to_num_series(s).isna().all()
+
+
+GEOJSON = {
+    "type": "FeatureCollection",
+    "name": "pipes \\ \"features\": [ {not} ]",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"Name": "Nord–Süd \"Ost\" {Ø} [dn 900] ✓", "Owner": "Gaz réseau €", "Capacity": None},
+            "geometry": {"type": "MultiLineString", "coordinates": [[[2.35, 48.85], [4.83, 45.76]], [[-1.5, 43.4], [0, 0]]]},
+        },
+        {"type": "Feature", "properties": {}, "geometry": None},
+        {
+            "type": "Feature",
+            "properties": {"Name": "}]{\\", "Tags": [["a", ["b"]], []], "Nested": {"x": {"y": [1, 2.5e-3, True]}}},
+            "geometry": {"type": "GeometryCollection", "geometries": [{"type": "LineString", "coordinates": [[10, 50], [11, 51]]}]},
+        },
+    ],
+}
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 8))
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_geojson_features_matches_json_load(tmp_path, chunk_size, indent):
+    path = tmp_path / "pipes.geojson"
+    path.write_text(json.dumps(GEOJSON, ensure_ascii=False, indent=indent), encoding="utf-8")
+    with open(path, encoding="utf-8") as f:
+        expected = json.load(f)["features"]
+    assert list(iter_geojson_features(path, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 16])
+def test_iter_geojson_features_skips_nested_features_keys(tmp_path, chunk_size):
+    collection = {
+        "type": "FeatureCollection",
+        "metadata": {"source": "GEM", "features": [{"type": "Feature", "properties": {"decoy": 1}}]},
+        "crs": {"properties": {"name": "features"}},
+        "features": GEOJSON["features"],
+    }
+    path = tmp_path / "pipes.geojson"
+    path.write_text(json.dumps(collection, ensure_ascii=False), encoding="utf-8")
+    assert list(iter_geojson_features(path, chunk_size=chunk_size)) == GEOJSON["features"]
+
+
+def test_iter_geojson_features_empty_collection(tmp_path):
+    path = tmp_path / "empty.geojson"
+    path.write_text('{"type": "FeatureCollection", "features": [ ]}', encoding="utf-8")
+    assert list(iter_geojson_features(path, chunk_size=3)) == []
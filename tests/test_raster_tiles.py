@@ -0,0 +1,64 @@
+"""Raster heat tiles: the PNG encoder and the tiling of heat_tiles."""
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from generate_map import encode_png, heat_tiles, tile_lonlat  # noqa: E402
+
+PALETTE = np.full((256, 3), 255, dtype=np.uint8)
+ZOOM = 5
+RADIUS, BLUR = 25, 15  # stamps of 2 * (25 + 15) = 80 px, opaque up to about 25 + 3 * 7.5 px from the point
+
+
+def decode_png(data):
+    """(height, width, 4) array of an encode_png image, undoing the Sub filter of each row."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, pos = {}, 8
+    while pos < len(data):
+        (length,) = struct.unpack_from(">I", data, pos)
+        tag, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        assert struct.unpack_from(">I", data, pos + 8 + length)[0] == zlib.crc32(tag + body)
+        chunks[tag] = body
+        pos += 12 + length
+    width, height, depth, color_type, _, _, _ = struct.unpack(">IIBBBBB", chunks[b"IHDR"])
+    assert (depth, color_type) == (8, 6)  # 8-bit RGBA
+    rows = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, 1 + width * 4)
+    assert (rows[:, 0] == 1).all()  # Sub filter
+    # Sub stores each byte minus the byte 4 to its left: a running sum per channel restores it
+    pixels = rows[:, 1:].reshape(height, width, 4).astype(np.uint64)
+    return (np.cumsum(pixels, axis=1) % 256).astype(np.uint8)
+
+
+def test_encode_png_round_trips_through_zlib_and_the_sub_filter():
+    rgba = np.random.default_rng(0).integers(0, 256, size=(7, 5, 4), dtype=np.uint8)
+    rgba[:, 2:] = rgba[:, :1]  # flat runs, as in heat tiles
+    np.testing.assert_array_equal(decode_png(encode_png(rgba)), rgba)
+
+
+def heat_at(x, y):
+    """heat_tiles of one full-weight point at global pixel (x, y) of ZOOM, decoded."""
+    lon, lat = tile_lonlat(np.array([x]), np.array([y]), ZOOM)
+    tiles = heat_tiles(lat, lon, [2.0 ** 12], ZOOM, RADIUS, BLUR, 1.0, PALETTE)
+    return {tile: decode_png(png) for tile, png in tiles.items()}
+
+
+def test_heat_tiles_skips_tiles_the_stamp_leaves_empty():
+    # The stamp box reaches 5 px into the diagonal tile (17, 11), about 50 px from the point:
+    # beyond the blurred disc, so that tile is not written
+    tiles = heat_at(16 * 256 + 221, 10 * 256 + 221)
+    assert set(tiles) == {(16, 10), (17, 10), (16, 11)}
+    assert all(image[..., 3].any() for image in tiles.values())
+
+
+def test_heat_tiles_join_seamlessly_across_a_tile_edge():
+    # A point on the edge between tiles 16 and 17: the two tiles side by side mirror each other
+    tiles = heat_at(17 * 256, 10 * 256 + 128)
+    assert set(tiles) == {(16, 10), (17, 10)}
+    joined = np.concatenate([tiles[(16, 10)], tiles[(17, 10)]], axis=1)[..., 3]
+    assert joined[128, 255] > 0
+    np.testing.assert_array_equal(joined, joined[:, ::-1])
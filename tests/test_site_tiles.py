@@ -0,0 +1,77 @@
+"""Site tiles: quadkey order, tile ranges and tile-local dictionaries of site_tile_files."""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from generate_map import (  # noqa: E402
+    SITE_TILE_SEARCH, SITE_TILE_SHARED_VALUES, SITE_TILE_UNPLACED, encode_site_columns, site_quadkeys,
+    site_tile_files,
+)
+
+
+def test_site_quadkeys_follow_z_order():
+    # Quadrants at zoom 1: 0 north-west, 1 north-east, 2 south-west, 3 south-east
+    keys = site_quadkeys([45, 45, -45, -45, None], [-90, 90, -90, 90, 10], zoom=1)
+    assert keys.tolist() == ["0", "1", "2", "3", SITE_TILE_UNPLACED]
+    # Zoom 2 refines each key, so sorting by key keeps a parent's tiles together
+    keys = site_quadkeys([80, 10, 80, 10], [-170, -10, 10, 170], zoom=2)
+    assert keys.tolist() == ["00", "03", "10", "13"]
+
+
+def test_site_tile_files_round_trip():
+    many = SITE_TILE_SHARED_VALUES + 1
+    lat = [48.85, None, 51.5, 48.86, 40.4, 51.51] + [10.0 + k / 100 for k in range(many)]
+    lon = [2.35, None, -0.12, 2.36, -3.7, -0.13] + [20.0] * many
+    n = len(lat)
+    columns = {
+        "techno": ["A", "B", "A", "C", "B", "A"] + ["A"] * many,
+        "status": ["x", "y", "x", "x", "y", "x"] + ["x"] * many,
+        "capacity_bucket": ["s", "m", "s", "l", "m", "s"] + ["s"] * many,
+        "lat": lat,
+        "lon": lon,
+        "operator": ["Op1", "Op2", "Op1", "Op3", "Op2", "Op3"] + ["Op1"] * many,
+        "color": [f"#{k:06x}" for k in range(n)],  # over SITE_TILE_SHARED_VALUES values
+        "layer": ["L"] * n,
+    }
+    keys = site_quadkeys(lat, lon)
+    order = np.argsort(keys, kind="stable")
+    columns = {name: [values[i] for i in order] for name, values in columns.items()}
+    site_data = encode_site_columns(columns)
+    files, meta, tiles = site_tile_files(site_data, keys[order], columns["lat"], columns["lon"])
+
+    # Tiles come in quadkey order and cover the sites in consecutive, non-overlapping ranges
+    assert [t["key"] for t in tiles] == sorted(set(keys))
+    assert [t["start"] for t in tiles] == np.cumsum([0] + [t["count"] for t in tiles[:-1]]).tolist()
+    assert sum(t["count"] for t in tiles) == n
+    unplaced = [t for t in tiles if t["key"] == SITE_TILE_UNPLACED]
+    assert len(unplaced) == 1 and unplaced[0]["count"] == 1 and "lat" not in unplaced[0]
+    paris = next(t for t in tiles if t["count"] == 2 and abs(t["lat"] - 48.855) < 1e-3)
+    assert abs(paris["lon"] - 2.355) < 1e-3
+
+    # Search fields and large dictionaries are cut per tile; facets and small ones stay shared
+    assert meta["operator"] == {"type": "dict", "local": True}
+    assert meta["color"] == {"type": "dict", "local": True}
+    assert meta["techno"]["values"] == site_data["columns"]["techno"]["values"]
+    assert meta["layer"]["values"] == ["L"]
+
+    search = json.loads(files[SITE_TILE_SEARCH])
+    assert search["values"]["operator"] == site_data["columns"]["operator"]["values"]
+    for t in tiles:
+        tile = json.loads(files[f"{t['key']}.json"])["columns"]
+        rows = slice(t["start"], t["start"] + t["count"])
+        for name in ("operator", "color"):
+            part = tile[name]
+            assert len(part["values"]) == len(set(part["values"]))
+            decoded = [part["values"][c] for c in part["codes"]]
+            assert decoded == columns[name][rows]
+        # "ids" place the tile's values in the full dictionary, for search fields only
+        full = site_data["columns"]["operator"]["values"]
+        assert [full[i] for i in tile["operator"]["ids"]] == tile["operator"]["values"]
+        assert "ids" not in tile["color"]
+        assert tile["techno"]["codes"] == site_data["columns"]["techno"]["codes"][rows]
+        facets = {tuple(f[:3]): f[3] for f in t["facets"]}
+        assert sum(facets.values()) == t["count"]